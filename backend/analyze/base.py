@@ -1,12 +1,25 @@
 """Pipeline 기본 인터페이스 및 추상 클래스."""
 
+import asyncio
 from abc import ABC, abstractmethod
+from functools import partial
+from typing import Any, Callable, Dict, Optional, Tuple
+from analyze.executor import PipelineExecutor
+from analyze.metrics import StepMeasurement
 from analyze.models import PipelineContext
 
 
 class PipelineStep(ABC):
     """Pipeline 단계 추상 클래스."""
 
+    # Pipeline이 주입하는 executor (None이면 이벤트 루프 기본 thread pool)
+    executor: Optional[PipelineExecutor] = None
+
+    # 이 단계가 읽고 쓰는 PipelineContext 필드 이름
+    # 둘 다 비어 있으면 앞뒤 모든 단계와 순서대로 실행 (배리어)
+    inputs: Tuple[str, ...] = ()
+    outputs: Tuple[str, ...] = ()
+
     @abstractmethod
     async def execute(self, context: PipelineContext) -> PipelineContext:
         """
@@ -25,30 +38,180 @@ class PipelineStep(ABC):
         """단계 이름 반환."""
         ...
 
+    def get_config(self) -> dict:
+        """
+        결과에 영향을 주는 설정 값 (분석 결과 캐시 키에 사용).
+
+        Returns:
+            JSON 직렬화 가능한 dict (기본값: 설정 없음)
+        """
+        return {}
+
+    async def run_blocking(self, func: Callable, *args: Any) -> Any:
+        """
+        CPU/IO blocking 작업을 이벤트 루프 밖에서 실행합니다.
+
+        Args:
+            func: 실행할 함수 (process pool 사용 시 모듈 수준 함수여야 함)
+            *args: func 인자
+
+        Returns:
+            func의 반환값
+        """
+        if self.executor is not None:
+            return await self.executor.run(func, *args)
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, partial(func, *args))
+
+    async def run_local(self, func: Callable, *args: Any) -> Any:
+        """
+        이 프로세스 안에서 결과를 남기는 blocking 작업을 executor의 thread에서 실행합니다.
+
+        공유 이미지 버퍼의 plane 계산처럼 process pool로 보낼 수 없는 작업도
+        executor의 동시 실행 수 제한 안에서 실행됩니다.
+
+        Args:
+            func: 실행할 함수
+            *args: func 인자
+
+        Returns:
+            func의 반환값
+        """
+        if self.executor is not None:
+            return await self.executor.run_local(func, *args)
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, partial(func, *args))
+
+    async def load_plane(self, context: PipelineContext, plane: str):
+        """공유 이미지 버퍼의 plane을 executor에서 계산하거나 캐시에서 가져옵니다."""
+        return await context.get_image().load(plane, run=self.run_local)
+
+
+# 단계 진행 상황 콜백: {"step", "status", "index", "total"[, "error"]}
+ProgressCallback = Callable[[Dict[str, Any]], None]
+
 
 class Pipeline(ABC):
     """Pipeline 추상 클래스."""
 
-    def __init__(self, steps: list[PipelineStep]):
+    def __init__(
+        self,
+        steps: list[PipelineStep],
+        executor: Optional[PipelineExecutor] = None,
+    ):
         """
         Pipeline 초기화.
 
         Args:
             steps: 실행할 단계 리스트
+            executor: 단계의 blocking 작업을 실행할 executor
+                      (None이면 이벤트 루프 기본 thread pool)
         """
         self.steps = steps
+        self.executor = executor
+        for step in steps:
+            if step.executor is None:
+                step.executor = executor
 
-    async def run(self, context: PipelineContext) -> PipelineContext:
+    def get_config(self) -> list:
+        """모든 단계의 이름과 설정 (분석 결과 캐시 키에 사용)."""
+        return [[step.get_name(), step.get_config()] for step in self.steps]
+
+    async def run(
+        self,
+        context: PipelineContext,
+        on_progress: Optional[ProgressCallback] = None,
+    ) -> PipelineContext:
         """
         Pipeline 실행.
 
+        단계들이 선언한 inputs/outputs로 의존 관계(DAG)를 만들고,
+        서로 의존하지 않는 단계는 동시에 실행합니다.
+        한 단계가 실패하면 나머지 단계를 취소하고 예외를 그대로 올립니다.
+        각 단계의 실행 시간/자원 사용량은 metadata["steps"][단계 이름]에 기록됩니다.
+
         Args:
             context: 초기 Pipeline 컨텍스트
+            on_progress: 단계 시작/완료/실패 시 호출할 콜백 (선택)
 
         Returns:
             최종 Pipeline 컨텍스트
         """
-        current_context = context
-        for step in self.steps:
-            current_context = await step.execute(current_context)
-        return current_context
+        dependencies = self._dependencies()
+        state = {"context": context}
+        tasks: list[asyncio.Task] = []
+        total = len(self.steps)
+        steps_metadata = context.metadata.setdefault("steps", {})
+
+        def report(index: int, step: PipelineStep, status: str, **extra) -> None:
+            if on_progress is not None:
+                on_progress(
+                    {
+                        "step": step.get_name(),
+                        "status": status,
+                        "index": index,
+                        "total": total,
+                        **extra,
+                    }
+                )
+
+        async def run_step(index: int, step: PipelineStep) -> None:
+            if dependencies[index]:
+                await asyncio.gather(*(tasks[i] for i in dependencies[index]))
+            shared = state["context"]
+            name = step.get_name()
+            report(index, step, "started")
+            measurement = StepMeasurement(name, shared)
+            try:
+                result = await step.execute(shared)
+            except Exception as e:
+                steps_metadata[name] = measurement.finish("failed")
+                report(index, step, "failed", error=str(e))
+                raise
+            steps_metadata[name] = measurement.finish()
+            report(index, step, "completed")
+            if result is not shared:
+                if step.outputs:
+                    # 새 컨텍스트를 돌려준 경우 선언된 출력만 병합
+                    for field in step.outputs:
+                        setattr(shared, field, getattr(result, field))
+                else:
+                    # 배리어 단계는 동시에 실행 중인 단계가 없으므로 교체해도 안전
+                    state["context"] = result
+
+        try:
+            for index, step in enumerate(self.steps):
+                tasks.append(asyncio.create_task(run_step(index, step)))
+            await asyncio.gather(*tasks)
+        except BaseException:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            raise
+
+        # 단계가 컨텍스트를 교체했어도 측정값은 최종 컨텍스트에 남김
+        state["context"].metadata["steps"] = steps_metadata
+        return state["context"]
+
+    def _dependencies(self) -> list[list[int]]:
+        """
+        각 단계가 기다려야 하는 앞 단계들의 인덱스를 계산합니다.
+
+        뒤 단계 B는 앞 단계 A가 B의 입력을 쓰거나(읽기-쓰기),
+        같은 필드를 쓰거나(쓰기-쓰기), B가 A의 입력을 덮어쓸 때(쓰기-읽기)
+        A를 기다립니다. 입출력을 선언하지 않은 단계는 모든 단계와 순서를 지킵니다.
+        """
+        dependencies = []
+        for index, step in enumerate(self.steps):
+            waits = []
+            for prev_index, prev in enumerate(self.steps[:index]):
+                undeclared = not (step.inputs or step.outputs) or not (
+                    prev.inputs or prev.outputs
+                )
+                conflict = set(prev.outputs) & (
+                    set(step.inputs) | set(step.outputs)
+                ) or set(prev.inputs) & set(step.outputs)
+                if undeclared or conflict:
+                    waits.append(prev_index)
+            dependencies.append(waits)
+        return dependencies
@@ -0,0 +1,184 @@
+"""분석 결과 캐시 - 이미지 내용 해시 + 단계 설정으로 키를 만든다.
+
+같은 이미지(같은 bytes)를 같은 설정(remover, tesseract 설정 등)으로 다시
+분석하면 pipeline을 실행하지 않고 저장된 PipelineResult를 돌려줍니다.
+
+- 메모리: 항목 수로 크기를 제한한 LRU
+- 디스크(선택): `<key>.json` 파일, 재시작 후에도 유지
+  (문제 이미지는 이미 업로드 저장소에 file_id로 저장되어 있으므로
+  결과에는 problem_file_id만 기록)
+"""
+
+import asyncio
+import hashlib
+import json
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Optional
+
+from analyze.models import AnalyzeResult, PipelineResult
+
+# 분석 알고리즘이 바뀌면 올려서 기존 캐시를 무효화
+CACHE_VERSION = 1
+
+
+def make_cache_key(content_hash: str, config: Any) -> str:
+    """
+    캐시 키를 만듭니다.
+
+    Args:
+        content_hash: 이미지 내용 해시 (sha256 hex)
+        config: pipeline 설정 (JSON 직렬화 가능한 값)
+
+    Returns:
+        sha256 hex 키
+    """
+    payload = json.dumps(
+        [CACHE_VERSION, content_hash, config],
+        sort_keys=True,
+        ensure_ascii=False,
+        default=str,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def region_hash(content_hash: str, crop: dict) -> str:
+    """
+    원본 내용 해시와 crop 사각형으로 영역의 내용 해시를 만듭니다 (영역 decode 없음).
+
+    Args:
+        content_hash: 원본 이미지 내용 해시 (sha256 hex)
+        crop: 원본 기준 사각형 {"x", "y", "w", "h"}
+
+    Returns:
+        sha256 hex
+    """
+    rect = [crop["x"], crop["y"], crop["w"], crop["h"]]
+    payload = json.dumps([content_hash, rect])
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def compute_file_hash(path: Path, chunk_size: int = 1024 * 1024) -> str:
+    """파일 내용의 sha256 hex를 계산합니다."""
+    hasher = hashlib.sha256()
+    with open(path, "rb") as f:
+        while chunk := f.read(chunk_size):
+            hasher.update(chunk)
+    return hasher.hexdigest()
+
+
+class AnalysisCache:
+    """PipelineResult 캐시 (메모리 LRU + 선택적 디스크)."""
+
+    def __init__(self, max_entries: int = 256, disk_dir: Optional[Path] = None):
+        """
+        Args:
+            max_entries: 메모리에 보관할 최대 결과 수
+            disk_dir: 디스크 캐시 디렉토리 (None이면 메모리만 사용)
+        """
+        self.max_entries = max_entries
+        self.disk_dir = Path(disk_dir) if disk_dir is not None else None
+        self._memory: "OrderedDict[str, PipelineResult]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[PipelineResult]:
+        """캐시된 결과를 반환합니다 (없으면 None). 반환값은 복사본입니다."""
+        with self._lock:
+            result = self._memory.get(key)
+            if result is not None:
+                self._memory.move_to_end(key)
+                return result.model_copy(deep=True)
+
+        result = self._read_disk(key)
+        if result is None:
+            return None
+        self._remember(key, result)
+        return result.model_copy(deep=True)
+
+    def put(self, key: str, result: PipelineResult) -> None:
+        """결과를 캐시에 저장합니다."""
+        # 디코딩된 이미지 버퍼는 캐시하지 않음 (복사 전에 잠시 떼어 둠)
+        image = result.context.image if result.context is not None else None
+        if image is not None:
+            result.context.image = None
+        try:
+            stored = result.model_copy(deep=True)
+        finally:
+            if image is not None:
+                result.context.image = image
+        self._remember(key, stored)
+        self._write_disk(key, stored)
+
+    async def aget(self, key: str) -> Optional[PipelineResult]:
+        """get()의 비동기 버전 (디스크 읽기는 이벤트 루프 밖에서)."""
+        if self.disk_dir is None or key in self._memory:
+            return self.get(key)
+        return await asyncio.to_thread(self.get, key)
+
+    async def aput(self, key: str, result: PipelineResult) -> None:
+        """put()의 비동기 버전 (디스크 쓰기는 이벤트 루프 밖에서)."""
+        if self.disk_dir is None:
+            self.put(key, result)
+        else:
+            await asyncio.to_thread(self.put, key, result)
+
+    def discard(self, key: str) -> None:
+        """항목을 메모리와 디스크에서 제거합니다."""
+        with self._lock:
+            self._memory.pop(key, None)
+        if self.disk_dir is not None:
+            try:
+                os.unlink(self._disk_path(key))
+            except FileNotFoundError:
+                pass
+
+    def clear(self) -> None:
+        """메모리 캐시를 비웁니다 (디스크는 유지)."""
+        with self._lock:
+            self._memory.clear()
+
+    def __len__(self) -> int:
+        return len(self._memory)
+
+    def _remember(self, key: str, result: PipelineResult) -> None:
+        with self._lock:
+            self._memory[key] = result
+            self._memory.move_to_end(key)
+            while len(self._memory) > self.max_entries:
+                self._memory.popitem(last=False)
+
+    def _disk_path(self, key: str) -> Path:
+        return self.disk_dir / key[:2] / f"{key}.json"
+
+    def _read_disk(self, key: str) -> Optional[PipelineResult]:
+        if self.disk_dir is None:
+            return None
+        try:
+            data = self._disk_path(key).read_text(encoding="utf-8")
+            result = PipelineResult.model_validate_json(data)
+        except (OSError, ValueError):
+            return None
+        # JSON으로 저장되며 dict가 된 postprocess 결과를 모델로 되돌림
+        context = result.context
+        if context is not None and context.postprocessed:
+            raw = context.postprocessed.get("result")
+            if isinstance(raw, dict):
+                context.postprocessed["result"] = AnalyzeResult.model_validate(raw)
+        return result
+
+    def _write_disk(self, key: str, result: PipelineResult) -> None:
+        if self.disk_dir is None:
+            return
+        path = self._disk_path(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                f.write(result.model_dump_json())
+            os.replace(tmp_path, path)
+        finally:
+            if os.path.exists(tmp_path):
+                os.unlink(tmp_path)
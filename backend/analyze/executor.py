@@ -0,0 +1,168 @@
+"""Pipeline 단계의 CPU 작업을 이벤트 루프 밖에서 실행하는 executor.
+
+OpenCV / PIL / pytesseract 호출은 동기(blocking) 함수라서 async 단계에서
+그대로 호출하면 uvicorn 이벤트 루프 전체가 멈춥니다. 각 단계는 무거운
+작업을 모듈 수준 함수로 분리하고 `PipelineExecutor.run()`으로 실행합니다.
+
+- "thread": ThreadPoolExecutor (OpenCV, tesseract 대기는 GIL을 놓음)
+- "process": ProcessPoolExecutor, numpy 배열 인자는 shared memory로 전달
+  (pickle 복사 없이 worker가 같은 버퍼를 attach 해서 읽음)
+"""
+
+import asyncio
+import os
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from functools import partial
+from multiprocessing import shared_memory
+from typing import Any, Callable, List, Optional
+
+import numpy as np
+
+EXECUTOR_KINDS = ("thread", "process")
+
+
+class SharedArray:
+    """Shared memory에 올린 numpy 배열의 pickle 가능한 핸들."""
+
+    def __init__(self, name: str, shape: tuple, dtype: str):
+        self.name = name
+        self.shape = shape
+        self.dtype = dtype
+
+    @classmethod
+    def create(cls, array: np.ndarray) -> "tuple[SharedArray, Any]":
+        """
+        배열을 shared memory에 복사합니다.
+
+        Returns:
+            (핸들, SharedMemory) - 호출한 쪽에서 작업 후 close/unlink 해야 함
+        """
+        shm = shared_memory.SharedMemory(create=True, size=max(array.nbytes, 1))
+        view = np.ndarray(array.shape, dtype=array.dtype, buffer=shm.buf)
+        view[...] = array
+        del view
+        return cls(shm.name, array.shape, array.dtype.str), shm
+
+    def attach(self) -> "tuple[np.ndarray, Any]":
+        """Worker 쪽에서 배열 view를 엽니다. (view, SharedMemory) 반환."""
+        shm = shared_memory.SharedMemory(name=self.name)
+        return np.ndarray(self.shape, dtype=self.dtype, buffer=shm.buf), shm
+
+
+def _invoke_with_shared(func: Callable, args: tuple) -> Any:
+    """Worker 프로세스에서 SharedArray 인자를 배열로 바꿔 func를 호출합니다."""
+    opened = []
+    real_args = []
+    for arg in args:
+        if isinstance(arg, SharedArray):
+            array, shm = arg.attach()
+            opened.append(shm)
+            real_args.append(array)
+        else:
+            real_args.append(arg)
+    try:
+        result = func(*real_args)
+        # 결과가 shared buffer를 가리키면 close 전에 복사
+        if isinstance(result, np.ndarray) and any(
+            np.shares_memory(result, a) for a in real_args if isinstance(a, np.ndarray)
+        ):
+            result = result.copy()
+        return result
+    finally:
+        del real_args
+        for shm in opened:
+            shm.close()
+
+
+def _release_segments(segments: List[Any]) -> None:
+    """호출한 쪽에서 만든 shared memory segment를 닫고 삭제합니다."""
+    for shm in segments:
+        shm.close()
+        shm.unlink()
+
+
+class PipelineExecutor:
+    """크기가 제한된 thread/process pool 위에서 blocking 함수를 실행."""
+
+    def __init__(self, kind: str = "thread", max_workers: Optional[int] = None):
+        """
+        Args:
+            kind: "thread" 또는 "process"
+            max_workers: 동시에 실행할 최대 작업 수 (None이면 CPU 수)
+        """
+        if kind not in EXECUTOR_KINDS:
+            raise ValueError(
+                f"Invalid executor kind: {kind}. Must be one of {EXECUTOR_KINDS}"
+            )
+        self.kind = kind
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self._executor: Optional[Executor] = None
+        self._local_executor: Optional[ThreadPoolExecutor] = None
+
+    @property
+    def executor(self) -> Executor:
+        """실제 pool (처음 사용할 때 생성)."""
+        if self._executor is None:
+            if self.kind == "process":
+                self._executor = ProcessPoolExecutor(max_workers=self.max_workers)
+            else:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.max_workers, thread_name_prefix="pipeline"
+                )
+        return self._executor
+
+    async def run(self, func: Callable, *args: Any) -> Any:
+        """
+        func(*args)를 pool에서 실행하고 결과를 기다립니다.
+
+        process pool이면 numpy 배열 인자를 shared memory로 전달합니다.
+        """
+        loop = asyncio.get_running_loop()
+        if self.kind != "process":
+            return await loop.run_in_executor(self.executor, partial(func, *args))
+
+        segments: List[Any] = []
+        packed = []
+        try:
+            for arg in args:
+                if isinstance(arg, np.ndarray):
+                    handle, shm = SharedArray.create(arg)
+                    segments.append(shm)
+                    packed.append(handle)
+                else:
+                    packed.append(arg)
+            future = self.executor.submit(_invoke_with_shared, func, tuple(packed))
+        except BaseException:
+            _release_segments(segments)
+            raise
+
+        # worker가 끝난 뒤에만 segment를 해제 (기다리던 task가 취소되어도
+        # 이미 실행 중인 worker는 계속 attach / 읽기를 할 수 있음)
+        future.add_done_callback(lambda _: _release_segments(segments))
+        return await asyncio.wrap_future(future)
+
+    async def run_local(self, func: Callable, *args: Any) -> Any:
+        """
+        func(*args)를 이 프로세스 안의 크기가 제한된 thread pool에서 실행합니다.
+
+        결과를 이 프로세스의 객체에 남겨야 하는 작업(공유 이미지 버퍼의 plane
+        계산 등)용입니다. thread pool이면 run()과 같은 pool을 쓰고, process pool이면
+        같은 크기의 별도 thread pool을 씁니다.
+        """
+        loop = asyncio.get_running_loop()
+        if self.kind != "process":
+            return await loop.run_in_executor(self.executor, partial(func, *args))
+        if self._local_executor is None:
+            self._local_executor = ThreadPoolExecutor(
+                max_workers=self.max_workers, thread_name_prefix="pipeline-local"
+            )
+        return await loop.run_in_executor(self._local_executor, partial(func, *args))
+
+    def shutdown(self, wait: bool = True) -> None:
+        """Pool 종료."""
+        if self._executor is not None:
+            self._executor.shutdown(wait=wait)
+            self._executor = None
+        if self._local_executor is not None:
+            self._local_executor.shutdown(wait=wait)
+            self._local_executor = None
@@ -0,0 +1,157 @@
+"""분석 1회 동안 공유되는 디코딩된 이미지 버퍼.
+
+여러 단계가 같은 파일을 각자 `Image.open` → numpy → BGR → Gray 로 변환하던
+것을 대신합니다. 각 표현(plane)은 처음 요청될 때 한 번만 계산되고
+이후에는 캐시된 배열을 그대로 돌려줍니다.
+
+기본 plane:
+- "original": 디코딩 결과 (RGB 또는 Grayscale numpy array)
+- "bgr": OpenCV용 3채널 BGR
+- "gray": Grayscale
+
+그 밖의 파생 plane은 `derive(name, func)`로 같은 방식으로 캐시합니다.
+"""
+
+import asyncio
+import threading
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+import cv2
+import numpy as np
+from PIL import Image
+
+# Grayscale로 디코딩할 PIL 모드 (나머지는 RGB로 변환)
+_GRAY_MODES = {"1", "L", "LA", "I", "I;16", "F"}
+
+
+def image_to_array(img: Image.Image) -> np.ndarray:
+    """PIL 이미지를 RGB 또는 Grayscale numpy array로 변환합니다."""
+    target = "L" if img.mode in _GRAY_MODES else "RGB"
+    if img.mode != target:
+        img = img.convert(target)
+    return np.asarray(img)
+
+
+def decode_image(path: Path) -> np.ndarray:
+    """이미지 파일을 RGB 또는 Grayscale numpy array로 디코딩합니다."""
+    with Image.open(path) as img:
+        return image_to_array(img)
+
+
+class ImageBuffer:
+    """지연 디코딩 + plane 캐시 (thread-safe, plane당 1회 계산, plane별 lock)."""
+
+    def __init__(self, path: Path, original: Optional[np.ndarray] = None):
+        """
+        Args:
+            path: 이미지 파일 경로
+            original: 이미 디코딩된 배열 (있으면 디코딩 생략)
+        """
+        self.path = Path(path)
+        self._planes: Dict[str, np.ndarray] = {}
+        self._lock = threading.Lock()
+        self._plane_locks: Dict[str, Any] = {}  # plane 이름 → RLock
+        if original is not None:
+            self._planes["original"] = original
+
+    @property
+    def original(self) -> np.ndarray:
+        """디코딩된 원본 (RGB 또는 Grayscale)."""
+        return self.derive("original", lambda buf: decode_image(buf.path))
+
+    @property
+    def bgr(self) -> np.ndarray:
+        """OpenCV용 BGR 3채널 이미지."""
+        return self.derive("bgr", _to_bgr)
+
+    @property
+    def gray(self) -> np.ndarray:
+        """Grayscale 이미지 (원본이 Grayscale이면 복사 없이 공유)."""
+        return self.derive("gray", _to_gray)
+
+    @property
+    def width(self) -> int:
+        return self.original.shape[1]
+
+    @property
+    def height(self) -> int:
+        return self.original.shape[0]
+
+    def get(self, plane: str) -> np.ndarray:
+        """이름으로 plane을 가져옵니다 ("original", "bgr", "gray" 또는 파생 plane)."""
+        if plane in ("original", "bgr", "gray"):
+            return getattr(self, plane)
+        with self._lock:
+            if plane not in self._planes:
+                raise KeyError(f"Unknown image plane: {plane}")
+            return self._planes[plane]
+
+    def derive(
+        self, name: str, func: Callable[["ImageBuffer"], np.ndarray]
+    ) -> np.ndarray:
+        """
+        파생 plane을 계산하거나 캐시에서 반환합니다.
+
+        Args:
+            name: plane 이름
+            func: 이 버퍼를 받아 plane을 계산하는 함수 (처음 1회만 호출)
+
+        Returns:
+            plane 배열 (읽기 전용으로 취급해야 함)
+        """
+        plane = self._planes.get(name)
+        if plane is not None:
+            return plane
+        # plane마다 따로 lock - 다른 plane을 계산하는 thread는 기다리지 않음
+        with self._lock:
+            plane_lock = self._plane_locks.setdefault(name, threading.RLock())
+        with plane_lock:
+            plane = self._planes.get(name)
+            if plane is None:
+                plane = func(self)
+                self._planes[name] = plane
+            return plane
+
+    async def load(
+        self, plane: str, run: Optional[Callable[..., Awaitable[Any]]] = None
+    ) -> np.ndarray:
+        """
+        plane을 이벤트 루프 밖에서 계산합니다 (이미 있으면 즉시 반환).
+
+        Args:
+            plane: plane 이름
+            run: `run(func, *args)`로 blocking 함수를 실행할 코루틴 함수
+                (Pipeline 단계는 `run_local`을 넘겨 executor의 동시 실행 제한을 따름,
+                None이면 이벤트 루프 기본 thread pool)
+        """
+        cached = self._planes.get(plane)
+        if cached is not None:
+            return cached
+        if run is not None:
+            return await run(self.get, plane)
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, self.get, plane)
+
+    def has(self, plane: str) -> bool:
+        """plane이 이미 계산되었는지 여부."""
+        return plane in self._planes
+
+    def clear(self) -> None:
+        """캐시된 plane을 모두 해제합니다."""
+        with self._lock:
+            self._planes.clear()
+
+
+def _to_bgr(buf: ImageBuffer) -> np.ndarray:
+    original = buf.original
+    if original.ndim == 2:
+        return cv2.cvtColor(original, cv2.COLOR_GRAY2BGR)
+    return cv2.cvtColor(original, cv2.COLOR_RGB2BGR)
+
+
+def _to_gray(buf: ImageBuffer) -> np.ndarray:
+    original = buf.original
+    if original.ndim == 2:
+        return original
+    return cv2.cvtColor(original, cv2.COLOR_RGB2GRAY)
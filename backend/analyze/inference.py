@@ -0,0 +1,290 @@
+"""CPU 전용 ONNX 모델 추론 backend.
+
+Level 3 필기 제거(AIBasedRemover)가 쓰는 segmentation / inpainting 모델을
+CPU에서 실행합니다.
+
+- backend: onnxruntime이 있으면 사용, 없으면 OpenCV DNN (opencv-python에 포함)
+- 모델은 프로세스마다 한 번만 로드 (`load_model` 캐시). process executor의
+  각 worker도 처음 호출될 때 한 번 로드하고 이후 계속 재사용
+- int8 (QDQ / QOperator) / fp16으로 양자화된 모델 파일을 그대로 로드
+  (fp16 입력 모델이면 입력을 fp16으로 변환해서 넘김)
+- thread 수 제어 (onnxruntime: intra-op thread 수, OpenCV: cv2.setNumThreads)
+- 큰 이미지는 겹치는 tile로 잘라 batch 단위로 추론하고 다시 이어 붙임
+
+모델 입출력 규약:
+- 입력: N x C x H x W float (0~1), C는 1 (Grayscale) 또는 3 (RGB)
+- 출력: N x 1 x H x W (또는 N x H x W) float (0~1)
+"""
+
+import threading
+from abc import ABC, abstractmethod
+from pathlib import Path
+from typing import Dict, Optional, Union
+
+import cv2
+import numpy as np
+
+BACKEND_KINDS = ("onnxruntime", "opencv")
+
+
+class InferenceError(RuntimeError):
+    """모델 로드 / 추론 실패."""
+
+
+class InferenceBackend(ABC):
+    """ONNX 모델 추론 backend 추상 클래스."""
+
+    # 모델 입력 채널 수 / 고정 tile 크기 / 고정 batch 크기 (모르면 None)
+    channels: Optional[int] = None
+    tile_size: Optional[int] = None
+    max_batch: Optional[int] = None
+
+    @abstractmethod
+    def run(self, batch: np.ndarray) -> np.ndarray:
+        """
+        batch 하나를 추론합니다.
+
+        Args:
+            batch: N x C x H x W float32 (0~1)
+
+        Returns:
+            N x 1 x H x W 또는 N x H x W float 배열
+        """
+        ...
+
+    @abstractmethod
+    def get_name(self) -> str:
+        """backend 이름."""
+        ...
+
+
+class OnnxRuntimeBackend(InferenceBackend):
+    """onnxruntime CPUExecutionProvider backend."""
+
+    def __init__(self, model_path: Union[str, Path], threads: Optional[int] = None):
+        """
+        Args:
+            model_path: ONNX 모델 경로
+            threads: intra-op thread 수 (None이면 onnxruntime 기본값 = 물리 코어 수)
+        """
+        import onnxruntime
+
+        options = onnxruntime.SessionOptions()
+        options.graph_optimization_level = (
+            onnxruntime.GraphOptimizationLevel.ORT_ENABLE_ALL
+        )
+        options.execution_mode = onnxruntime.ExecutionMode.ORT_SEQUENTIAL
+        options.inter_op_num_threads = 1
+        if threads:
+            options.intra_op_num_threads = threads
+
+        self._session = onnxruntime.InferenceSession(
+            str(model_path), sess_options=options, providers=["CPUExecutionProvider"]
+        )
+        model_input = self._session.get_inputs()[0]
+        self._input_name = model_input.name
+        self._dtype = np.float16 if "float16" in model_input.type else np.float32
+
+        shape = model_input.shape
+        if len(shape) != 4:
+            raise InferenceError(f"Expected NCHW model input, got shape {shape}")
+        batch, channels, height, width = (
+            dim if isinstance(dim, int) else None for dim in shape
+        )
+        self.channels = channels
+        self.max_batch = batch
+        if height is not None and height == width:
+            self.tile_size = height
+
+    def run(self, batch: np.ndarray) -> np.ndarray:
+        output = self._session.run(None, {self._input_name: batch.astype(self._dtype)})
+        return output[0]
+
+    def get_name(self) -> str:
+        return "onnxruntime"
+
+
+class OpenCVDnnBackend(InferenceBackend):
+    """OpenCV DNN backend (추가 패키지 없이 사용 가능).
+
+    OpenCV의 thread 수는 프로세스 전체 설정(cv2.setNumThreads)입니다.
+    cv2.dnn.Net은 thread-safe하지 않으므로 추론은 lock 안에서 실행합니다.
+    """
+
+    def __init__(
+        self,
+        model_path: Union[str, Path],
+        threads: Optional[int] = None,
+        fp16: bool = False,
+    ):
+        """
+        Args:
+            model_path: ONNX 모델 경로
+            threads: OpenCV thread 수 (None이면 변경하지 않음)
+            fp16: CPU fp16 target 사용 (OpenCV가 지원할 때만)
+        """
+        try:
+            self._net = cv2.dnn.readNetFromONNX(str(model_path))
+        except cv2.error as e:
+            raise InferenceError(f"Failed to load model: {model_path}: {e}") from e
+        self._net.setPreferableBackend(cv2.dnn.DNN_BACKEND_OPENCV)
+        target = cv2.dnn.DNN_TARGET_CPU
+        if fp16 and hasattr(cv2.dnn, "DNN_TARGET_CPU_FP16"):
+            target = cv2.dnn.DNN_TARGET_CPU_FP16
+        self._net.setPreferableTarget(target)
+        if threads:
+            cv2.setNumThreads(threads)
+        self._lock = threading.Lock()
+
+    def run(self, batch: np.ndarray) -> np.ndarray:
+        with self._lock:
+            self._net.setInput(np.ascontiguousarray(batch, dtype=np.float32))
+            return self._net.forward()
+
+    def get_name(self) -> str:
+        return "opencv"
+
+
+# 프로세스별 로드된 모델 캐시: (경로, 수정 시각, backend, threads, fp16) → backend
+_MODELS: Dict[tuple, InferenceBackend] = {}
+_MODELS_LOCK = threading.Lock()
+
+
+def load_model(
+    model_path: Union[str, Path],
+    threads: Optional[int] = None,
+    backend: Optional[str] = None,
+    fp16: bool = False,
+) -> InferenceBackend:
+    """
+    모델을 로드합니다 (같은 프로세스에서는 한 번만 로드하고 재사용).
+
+    Args:
+        model_path: ONNX 모델 경로
+        threads: 추론 thread 수 (None이면 backend 기본값)
+        backend: "onnxruntime" / "opencv" / None (onnxruntime이 있으면 사용)
+        fp16: OpenCV backend의 CPU fp16 target 사용 여부
+
+    Returns:
+        InferenceBackend
+
+    Raises:
+        InferenceError: 모델 파일이 없거나 로드할 수 없음
+    """
+    if backend is not None and backend not in BACKEND_KINDS:
+        raise ValueError(
+            f"Invalid inference backend: {backend}. "
+            f"Must be one of {', '.join(BACKEND_KINDS)}"
+        )
+    path = Path(model_path)
+    try:
+        mtime = path.stat().st_mtime_ns
+    except OSError as e:
+        raise InferenceError(f"Model not found: {model_path}") from e
+
+    key = (str(path.resolve()), mtime, backend, threads, fp16)
+    model = _MODELS.get(key)
+    if model is not None:
+        return model
+    with _MODELS_LOCK:
+        model = _MODELS.get(key)
+        if model is None:
+            model = _create_backend(path, threads, backend, fp16)
+            _MODELS[key] = model
+        return model
+
+
+def _create_backend(
+    path: Path, threads: Optional[int], backend: Optional[str], fp16: bool
+) -> InferenceBackend:
+    if backend in (None, "onnxruntime"):
+        try:
+            return OnnxRuntimeBackend(path, threads)
+        except ImportError:
+            if backend == "onnxruntime":
+                raise InferenceError("onnxruntime is not installed")
+        except InferenceError:
+            raise
+        except Exception as e:
+            raise InferenceError(f"Failed to load model: {path}: {e}") from e
+    return OpenCVDnnBackend(path, threads, fp16)
+
+
+def clear_models() -> None:
+    """로드된 모델을 모두 해제합니다 (테스트, 모델 교체용)."""
+    with _MODELS_LOCK:
+        _MODELS.clear()
+
+
+def predict_tiled(
+    image: np.ndarray,
+    model: InferenceBackend,
+    tile_size: int = 256,
+    overlap: int = 16,
+    batch_size: int = 8,
+) -> np.ndarray:
+    """
+    이미지를 겹치는 tile로 나눠 batch 추론하고 결과를 이어 붙입니다.
+
+    각 tile의 가장자리 overlap 픽셀은 버리고 가운데만 사용하므로
+    tile 경계에 이음새가 생기지 않습니다. 이미지 가장자리는 반사 padding.
+
+    Args:
+        image: H x W 또는 H x W x C float32 (0~1)
+        model: 추론 backend
+        tile_size: tile 한 변 (모델 입력이 고정 크기면 그 크기를 사용)
+        overlap: tile 가장자리에서 버리는 폭
+        batch_size: 한 번에 추론할 tile 수 (모델 batch가 고정이면 그 크기)
+
+    Returns:
+        H x W float32 예측 결과
+    """
+    tile = model.tile_size or tile_size
+    batch_size = model.max_batch or batch_size
+    stride = tile - 2 * overlap
+    if stride <= 0:
+        raise ValueError(f"overlap {overlap} is too large for tile size {tile}")
+
+    if image.ndim == 2:
+        image = image[:, :, None]
+    height, width, channels = image.shape
+    rows = -(-height // stride)
+    cols = -(-width // stride)
+    padded = cv2.copyMakeBorder(
+        image,
+        overlap,
+        rows * stride - height + overlap,
+        overlap,
+        cols * stride - width + overlap,
+        cv2.BORDER_REFLECT_101,
+    )
+    if padded.ndim == 2:
+        padded = padded[:, :, None]
+
+    # tile view (복사 없음): (rows, cols, C, tile, tile)
+    windows = np.lib.stride_tricks.sliding_window_view(
+        padded, (tile, tile), axis=(0, 1)
+    )[::stride, ::stride]
+    output = np.empty((rows * stride, cols * stride), dtype=np.float32)
+    # 결과를 tile 단위로 쓰기 위한 view: (rows, cols, stride, stride)
+    output_tiles = output.reshape(rows, stride, cols, stride).transpose(0, 2, 1, 3)
+
+    batch = np.empty((batch_size, channels, tile, tile), dtype=np.float32)
+    count = rows * cols
+    for start in range(0, count, batch_size):
+        index = np.arange(start, min(start + batch_size, count))
+        row_index, col_index = np.divmod(index, cols)
+        size = len(index)
+        batch[:size] = windows[row_index, col_index]
+        if model.max_batch:
+            # 고정 batch 모델은 남는 칸을 채워서 넘김
+            batch[size:] = 0
+            prediction = model.run(batch)
+        else:
+            prediction = model.run(batch[:size])
+        prediction = prediction.reshape(-1, tile, tile)[:size]
+        output_tiles[row_index, col_index] = prediction[
+            :, overlap : overlap + stride, overlap : overlap + stride
+        ]
+
+    return output[:height, :width]
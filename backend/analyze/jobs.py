@@ -0,0 +1,204 @@
+"""비동기 분석 작업(job) 큐.
+
+`/analyze`는 pipeline이 끝날 때까지 HTTP 요청을 붙잡고 있어서, 큰 사진이
+몰리면 reverse proxy 제한 시간에 걸립니다. 작업 큐는 요청을 즉시 job id로
+돌려주고, 고정된 수의 worker task가 순서대로 실행합니다.
+
+- 대기 중인 job 수는 max_queue로 제한 (넘치면 JobQueueFull)
+- 각 job은 단계 진행 이벤트를 기록하고, 구독자는 `events()`로 받아봄
+- 끝난 job은 최근 max_finished개만 보관
+"""
+
+import asyncio
+import uuid
+from collections import OrderedDict
+from datetime import datetime
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional
+
+# job 상태
+QUEUED = "queued"
+RUNNING = "running"
+COMPLETED = "completed"
+FAILED = "failed"
+FINISHED_STATUSES = (COMPLETED, FAILED)
+
+
+class JobQueueFull(Exception):
+    """대기 중인 job이 너무 많아 새 job을 받을 수 없음."""
+
+
+class AnalysisJob:
+    """분석 작업 하나의 상태와 진행 이벤트."""
+
+    def __init__(self, job_id: str, params: Optional[Dict[str, Any]] = None):
+        self.job_id = job_id
+        self.params = params or {}
+        self.status = QUEUED
+        self.result: Optional[Dict[str, Any]] = None
+        self.error: Optional[str] = None
+        self.created_at = datetime.now().isoformat()
+        self.started_at: Optional[str] = None
+        self.finished_at: Optional[str] = None
+        self.events: List[Dict[str, Any]] = []
+        self._changed = asyncio.Event()
+
+    @property
+    def finished(self) -> bool:
+        return self.status in FINISHED_STATUSES
+
+    def publish(self, event: Dict[str, Any]) -> None:
+        """진행 이벤트를 기록하고 기다리는 구독자를 깨웁니다."""
+        self.events.append(event)
+        changed, self._changed = self._changed, asyncio.Event()
+        changed.set()
+
+    def set_status(self, status: str, **extra) -> None:
+        """상태를 바꾸고 상태 이벤트를 발행합니다."""
+        self.status = status
+        now = datetime.now().isoformat()
+        if status == RUNNING:
+            self.started_at = now
+        elif status in FINISHED_STATUSES:
+            self.finished_at = now
+        self.publish({"type": "status", "status": status, **extra})
+
+    async def stream(self) -> AsyncIterator[Dict[str, Any]]:
+        """
+        지금까지의 이벤트부터 시작하여 job이 끝날 때까지 이벤트를 내보냅니다.
+
+        Yields:
+            이벤트 dict ({"type": "status" | "progress", ...})
+        """
+        sent = 0
+        while True:
+            changed = self._changed
+            while sent < len(self.events):
+                yield self.events[sent]
+                sent += 1
+            if self.finished:
+                return
+            await changed.wait()
+
+    def to_dict(self) -> Dict[str, Any]:
+        """API 응답용 dict."""
+        return {
+            "job_id": self.job_id,
+            "status": self.status,
+            **self.params,
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+            "progress": [e for e in self.events if e["type"] == "progress"],
+            "result": self.result,
+            "error": self.error,
+        }
+
+
+# job 실행 함수: func(*args, on_progress=콜백) -> 결과 dict
+JobFunc = Callable[..., Awaitable[Dict[str, Any]]]
+
+
+class JobQueue:
+    """크기가 제한된 in-process 분석 작업 큐."""
+
+    def __init__(self, workers: int = 2, max_queue: int = 64, max_finished: int = 1000):
+        """
+        Args:
+            workers: 동시에 실행할 job 수
+            max_queue: 실행을 기다릴 수 있는 최대 job 수
+            max_finished: 조회용으로 보관할 끝난 job 수
+        """
+        self.workers = workers
+        self.max_queue = max_queue
+        self.max_finished = max_finished
+        self._jobs: "OrderedDict[str, AnalysisJob]" = OrderedDict()
+        self._queue: Optional[asyncio.Queue] = None
+        self._tasks: List[asyncio.Task] = []
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def submit(self, func: JobFunc, *args: Any, **params: Any) -> AnalysisJob:
+        """
+        job을 큐에 넣고 바로 반환합니다.
+
+        Args:
+            func: 실행할 코루틴 함수 (on_progress 키워드 인자를 받아야 함)
+            *args: func 인자
+            **params: job 조회 응답에 함께 보여줄 값 (file_id 등)
+
+        Returns:
+            생성된 job (status: queued)
+
+        Raises:
+            JobQueueFull: 대기 중인 job이 max_queue개 이상일 때
+        """
+        self._ensure_workers()
+        if self._queue.qsize() >= self.max_queue:
+            raise JobQueueFull(f"Too many queued jobs (max {self.max_queue})")
+
+        job = AnalysisJob(str(uuid.uuid4()), params)
+        self._jobs[job.job_id] = job
+        self._queue.put_nowait((job, func, args))
+        job.set_status(QUEUED)
+        return job
+
+    def get(self, job_id: str) -> Optional[AnalysisJob]:
+        """job id로 job을 찾습니다 (없으면 None)."""
+        return self._jobs.get(job_id)
+
+    def queued(self) -> int:
+        """실행을 기다리는 job 수."""
+        return self._queue.qsize() if self._queue is not None else 0
+
+    async def close(self) -> None:
+        """worker task를 멈춥니다 (실행 중인 job은 취소)."""
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        self._queue = None
+        self._loop = None
+
+    def _ensure_workers(self) -> None:
+        """현재 이벤트 루프에서 worker task를 띄웁니다 (처음 submit 시)."""
+        loop = asyncio.get_running_loop()
+        if self._loop is loop:
+            return
+        # 이벤트 루프가 바뀌었으면(앱 재시작, 테스트) 이전 큐는 버림
+        self._loop = loop
+        self._queue = asyncio.Queue()
+        self._tasks = [
+            loop.create_task(self._worker(self._queue)) for _ in range(self.workers)
+        ]
+
+    async def _worker(self, queue: asyncio.Queue) -> None:
+        while True:
+            job, func, args = await queue.get()
+            try:
+                await self._run(job, func, args)
+            finally:
+                queue.task_done()
+
+    async def _run(self, job: AnalysisJob, func: JobFunc, args: tuple) -> None:
+        job.set_status(RUNNING)
+
+        def on_progress(event: Dict[str, Any]) -> None:
+            job.publish({"type": "progress", **event})
+
+        try:
+            job.result = await func(*args, on_progress=on_progress)
+        except asyncio.CancelledError:
+            job.error = "cancelled"
+            job.set_status(FAILED, error=job.error)
+            raise
+        except Exception as e:
+            job.error = str(e)
+            job.set_status(FAILED, error=job.error)
+        else:
+            job.set_status(COMPLETED)
+        self._forget_old_jobs()
+
+    def _forget_old_jobs(self) -> None:
+        """끝난 job이 max_finished개를 넘으면 오래된 것부터 제거합니다."""
+        finished = [job_id for job_id, job in self._jobs.items() if job.finished]
+        for job_id in finished[: max(len(finished) - self.max_finished, 0)]:
+            del self._jobs[job_id]
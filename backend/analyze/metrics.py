@@ -0,0 +1,234 @@
+"""Pipeline 단계 계측 및 Prometheus 텍스트 형식 export.
+
+`Pipeline.run`은 각 단계 실행을 `StepMeasurement`로 감싸서
+wall time, CPU time, 입력 이미지 크기를 측정하고 단계가 끝난 시점의
+프로세스 최대 RSS(high-water mark)를 기록합니다.
+측정값은 `PipelineContext.metadata["steps"]`에 기록되고,
+단계 이름 / remover 방식별 histogram으로 누적되어 `/metrics`로 노출됩니다.
+
+외부 의존성 없이 필요한 만큼만 구현한 histogram/counter입니다.
+(CPU time은 프로세스 전체 값이라 단계가 동시에 실행되면 겹쳐 집계됨.
+최대 RSS는 프로세스 시작 이후의 최댓값이라 단계별 메모리 사용량이 아님)
+"""
+
+import threading
+import time
+from typing import Dict, Optional, Sequence, Tuple
+
+from analyze.models import PipelineContext
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+# 초 단위 기본 bucket (수 ms ~ 수십 초)
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+
+
+def _format_labels(labelnames: Sequence[str], values: Sequence[str], **extra) -> str:
+    pairs = list(zip(labelnames, values)) + list(extra.items())
+    if not pairs:
+        return ""
+    escaped = (
+        str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+        for _, value in pairs
+    )
+    return (
+        "{"
+        + ",".join(f'{name}="{value}"' for (name, _), value in zip(pairs, escaped))
+        + "}"
+    )
+
+
+class Histogram:
+    """label별 누적 histogram."""
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # label 값 → (bucket별 count, sum, count)
+        self._series: Dict[Tuple[str, ...], list] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, **labels: str) -> None:
+        """값을 하나 기록합니다."""
+        key = tuple(str(labels[name]) for name in self.labelnames)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [[0] * len(self.buckets), 0.0, 0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[0][i] += 1
+            series[1] += value
+            series[2] += 1
+
+    def render(self) -> str:
+        """Prometheus 텍스트 형식으로 변환합니다."""
+        lines = [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} histogram",
+        ]
+        with self._lock:
+            for key, (counts, total, count) in sorted(self._series.items()):
+                for bound, bucket_count in zip(self.buckets, counts):
+                    labels = _format_labels(self.labelnames, key, le=f"{bound:g}")
+                    lines.append(f"{self.name}_bucket{labels} {bucket_count}")
+                labels = _format_labels(self.labelnames, key, le="+Inf")
+                lines.append(f"{self.name}_bucket{labels} {count}")
+                labels = _format_labels(self.labelnames, key)
+                lines.append(f"{self.name}_sum{labels} {total:g}")
+                lines.append(f"{self.name}_count{labels} {count}")
+        return "\n".join(lines)
+
+
+class Counter:
+    """label별 누적 counter."""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1, **labels: str) -> None:
+        key = tuple(str(labels[name]) for name in self.labelnames)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def render(self) -> str:
+        lines = [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} counter",
+        ]
+        with self._lock:
+            for key, value in sorted(self._values.items()):
+                labels = _format_labels(self.labelnames, key)
+                lines.append(f"{self.name}{labels} {value:g}")
+        return "\n".join(lines)
+
+
+class MetricsRegistry:
+    """metric 모음."""
+
+    def __init__(self):
+        self._metrics = []
+
+    def register(self, metric):
+        self._metrics.append(metric)
+        return metric
+
+    def render(self) -> str:
+        """등록된 모든 metric을 Prometheus 텍스트 형식으로 변환합니다."""
+        return "\n".join(metric.render() for metric in self._metrics) + "\n"
+
+
+REGISTRY = MetricsRegistry()
+
+STEP_SECONDS = REGISTRY.register(
+    Histogram(
+        "analyze_step_duration_seconds",
+        "Wall time of pipeline step execution.",
+        ["step"],
+    )
+)
+STEP_CPU_SECONDS = REGISTRY.register(
+    Histogram(
+        "analyze_step_cpu_seconds",
+        "Process CPU time consumed during pipeline step execution.",
+        ["step"],
+    )
+)
+STEP_FAILURES = REGISTRY.register(
+    Counter(
+        "analyze_step_failures_total",
+        "Pipeline step executions that raised an exception.",
+        ["step"],
+    )
+)
+REMOVER_SECONDS = REGISTRY.register(
+    Histogram(
+        "analyze_remover_duration_seconds",
+        "Wall time of handwriting removal per remover method.",
+        ["method"],
+    )
+)
+
+
+def _peak_rss_bytes() -> Optional[int]:
+    """프로세스 시작 이후 최대 RSS (byte, 측정할 수 없으면 None)."""
+    if resource is None:
+        return None
+    # Linux는 KB 단위
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+def image_size(context: PipelineContext) -> Tuple[Optional[int], Optional[int]]:
+    """
+    단계 입력 이미지의 (width, height)를 반환합니다.
+
+    이벤트 루프에서 호출되므로 파일을 열지 않고 컨텍스트에 이미 있는 값만
+    사용합니다 (디코딩된 공유 버퍼 → 전처리 결과 크기 순서, 없으면 (None, None)).
+    """
+    buffer = context.image
+    if buffer is not None:
+        for plane in ("original", "bgr", "gray"):
+            if buffer.has(plane):
+                height, width = buffer.get(plane).shape[:2]
+                return width, height
+
+    preprocessed = context.preprocessed or {}
+    return preprocessed.get("width"), preprocessed.get("height")
+
+
+class StepMeasurement:
+    """단계 한 번의 실행 시간/자원 사용량 측정."""
+
+    def __init__(self, step_name: str, context: PipelineContext):
+        self.step_name = step_name
+        self.input_width, self.input_height = image_size(context)
+        self._wall = time.perf_counter()
+        self._cpu = time.process_time()
+
+    def finish(self, status: str = "completed") -> dict:
+        """
+        측정을 끝내고 histogram에 기록합니다.
+
+        Args:
+            status: 단계 결과 ("completed" 또는 "failed")
+
+        Returns:
+            metadata["steps"]에 저장할 측정값 dict
+        """
+        wall_time = time.perf_counter() - self._wall
+        cpu_time = time.process_time() - self._cpu
+
+        STEP_SECONDS.observe(wall_time, step=self.step_name)
+        STEP_CPU_SECONDS.observe(cpu_time, step=self.step_name)
+        if status == "failed":
+            STEP_FAILURES.inc(step=self.step_name)
+
+        return {
+            "status": status,
+            "wall_time": wall_time,
+            "cpu_time": cpu_time,
+            # 프로세스 high-water mark (이 단계만의 사용량이 아님)
+            "process_peak_rss": _peak_rss_bytes(),
+            "input_width": self.input_width,
+            "input_height": self.input_height,
+        }
+
+
+def observe_remover(method: str, seconds: float) -> None:
+    """필기 제거 시간을 remover 방식별로 기록합니다."""
+    REMOVER_SECONDS.observe(seconds, method=method)
@@ -2,7 +2,8 @@
 
 from pathlib import Path
 from typing import Any, Dict, Optional
-from pydantic import BaseModel, ConfigDict
+from pydantic import BaseModel, ConfigDict, Field
+from analyze.image_buffer import ImageBuffer
 
 
 class PipelineContext(BaseModel):
@@ -13,6 +14,8 @@ class PipelineContext(BaseModel):
     file_id: str
     file_path: Path
     original_filename: Optional[str] = None
+    # 사용자가 잘라낸 영역인지 (페이지 전체 사진이 아님)
+    is_crop: bool = False
 
     # 각 단계의 결과를 저장
     preprocessed: Optional[Dict[str, Any]] = None
@@ -23,6 +26,22 @@ class PipelineContext(BaseModel):
     # 메타데이터
     metadata: Dict[str, Any] = {}
 
+    # 디코딩된 이미지 공유 버퍼 (직렬화 대상 아님)
+    image: Optional[ImageBuffer] = Field(default=None, exclude=True, repr=False)
+
+    def get_image(self) -> ImageBuffer:
+        """
+        처리 대상 이미지의 공유 버퍼를 반환합니다.
+
+        전처리 결과의 processed_path(없으면 file_path)에 대한 버퍼를
+        처음 호출될 때 만들고, 이후 단계들은 같은 버퍼를 재사용합니다.
+        """
+        preprocessed = self.preprocessed or {}
+        path = Path(preprocessed.get("processed_path", self.file_path))
+        if self.image is None or self.image.path != path:
+            self.image = ImageBuffer(path)
+        return self.image
+
 
 class AnswerResult(BaseModel):
     """답안 추출 결과."""
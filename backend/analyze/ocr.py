@@ -0,0 +1,489 @@
+"""OCR 엔진 추상화와 상주(long-lived) OCR worker pool.
+
+pytesseract는 호출마다 tesseract 바이너리를 새로 실행하고 traineddata를
+다시 읽으며 임시 파일을 씁니다. 부하 상황에서는 이 프로세스 시작 비용이
+OCR 시간의 대부분을 차지합니다.
+
+`OCRWorkerPool`은 미리 띄워 둔 worker 프로세스들을 재사용합니다.
+- 각 worker는 시작 시 OCR backend를 한 번 초기화 (tesserocr가 있으면
+  traineddata를 메모리에 올린 PyTessBaseAPI를 계속 사용)
+- 이미지는 pipe로 raw bytes를 전달 (임시 파일 없음)
+- 동시에 기다릴 수 있는 호출 수 제한 (초과 시 OCRQueueFull)
+- 호출별 timeout (초과한 worker는 종료 후 다시 띄움)
+
+tesserocr가 설치되어 있지 않으면 공용 엔진은 worker pool 없이 pytesseract를
+호출한 thread에서 바로 실행합니다 (경고 로그).
+"""
+
+import atexit
+import logging
+import multiprocessing
+import os
+import queue
+import shlex
+import threading
+import time
+from abc import ABC, abstractmethod
+from typing import Callable, Dict, Optional, Tuple, Union
+
+import numpy as np
+from PIL import Image
+
+ImageLike = Union[Image.Image, np.ndarray]
+
+logger = logging.getLogger(__name__)
+
+
+class OCRError(RuntimeError):
+    """OCR 실행 실패."""
+
+
+class OCRTimeout(OCRError):
+    """OCR 호출이 제한 시간 안에 끝나지 않음."""
+
+
+class OCRQueueFull(OCRError):
+    """대기 중인 OCR 호출이 너무 많음."""
+
+
+class OCREngine(ABC):
+    """OCR 엔진 추상 클래스 (pytesseract와 같은 입출력)."""
+
+    @abstractmethod
+    def image_to_data(
+        self, image: ImageLike, config: str, timeout: Optional[float] = None
+    ) -> Dict[str, list]:
+        """
+        단어 단위 인식 결과를 반환합니다.
+
+        Args:
+            image: 인식할 이미지
+            config: tesseract 명령행 설정
+            timeout: 이 호출의 제한 시간 (초, None이면 엔진 기본값)
+                넘으면 인식을 중단하고 예외를 냄 (중단할 수 없는 엔진은 무시)
+
+        Returns:
+            pytesseract.Output.DICT 형식
+            ("text", "conf", "left", "top", "width", "height" 리스트)
+        """
+        ...
+
+    @abstractmethod
+    def image_to_string(
+        self, image: ImageLike, config: str, timeout: Optional[float] = None
+    ) -> str:
+        """인식된 전체 텍스트를 반환합니다 (timeout은 image_to_data와 같음)."""
+        ...
+
+    def start(self) -> None:
+        """미리 준비할 자원이 있으면 준비합니다 (pre-warm)."""
+
+    def close(self) -> None:
+        """엔진이 가진 자원을 해제합니다."""
+
+
+class PytesseractEngine(OCREngine):
+    """pytesseract를 그대로 호출하는 엔진 (호출마다 프로세스 생성).
+
+    timeout을 넘기면 pytesseract가 tesseract 프로세스를 종료합니다.
+    """
+
+    def image_to_data(
+        self, image: ImageLike, config: str, timeout: Optional[float] = None
+    ) -> Dict[str, list]:
+        import pytesseract
+
+        return pytesseract.image_to_data(
+            image,
+            config=config,
+            output_type=pytesseract.Output.DICT,
+            timeout=timeout or 0,
+        )
+
+    def image_to_string(
+        self, image: ImageLike, config: str, timeout: Optional[float] = None
+    ) -> str:
+        import pytesseract
+
+        return pytesseract.image_to_string(image, config=config, timeout=timeout or 0)
+
+
+def parse_tesseract_config(config: str) -> Tuple[str, Optional[int], int, dict]:
+    """
+    tesseract 명령행 설정을 API 설정으로 변환합니다.
+
+    Args:
+        config: 예) "--psm 6 -c tessedit_char_whitelist=0123456789"
+
+    Returns:
+        (lang, psm, oem, variables)
+    """
+    lang = "eng"
+    psm = None
+    oem = 3
+    variables = {}
+    tokens = iter(shlex.split(config or ""))
+    for token in tokens:
+        if token == "--psm":
+            psm = int(next(tokens))
+        elif token == "--oem":
+            oem = int(next(tokens))
+        elif token == "-l":
+            lang = next(tokens)
+        elif token == "-c":
+            key, _, value = next(tokens).partition("=")
+            variables[key] = value
+    return lang, psm, oem, variables
+
+
+class TesserocrEngine(OCREngine):
+    """libtesseract API를 직접 사용하는 엔진 (traineddata를 한 번만 로드)."""
+
+    def __init__(self, lang: str = "eng"):
+        import tesserocr
+
+        self._tesserocr = tesserocr
+        # 설정(lang, oem, 변수)마다 초기화된 API를 하나씩 유지
+        self._apis: Dict[tuple, object] = {}
+        # 미리 로드 (pre-warm)
+        self._get_api(lang, 3, {})
+
+    def _get_api(self, lang: str, oem: int, variables: dict):
+        key = (lang, oem, tuple(sorted(variables.items())))
+        api = self._apis.get(key)
+        if api is None:
+            api = self._tesserocr.PyTessBaseAPI(lang=lang, oem=self._tesserocr.OEM(oem))
+            for name, value in variables.items():
+                api.SetVariable(name, value)
+            self._apis[key] = api
+        return api
+
+    def _prepare(self, image: ImageLike, config: str):
+        lang, psm, oem, variables = parse_tesseract_config(config)
+        api = self._get_api(lang, oem, variables)
+        api.SetPageSegMode(self._tesserocr.PSM.SINGLE_BLOCK if psm is None else psm)
+        api.SetImage(_to_pil(image))
+        return api
+
+    # timeout: libtesseract 호출은 중간에 멈출 수 없으므로 무시
+    # (OCRWorkerPool 안에서 쓰면 pool이 제한 시간을 넘긴 worker를 종료)
+    def image_to_data(
+        self, image: ImageLike, config: str, timeout: Optional[float] = None
+    ) -> Dict[str, list]:
+        api = self._prepare(image, config)
+        api.Recognize()
+        data = {k: [] for k in ("text", "conf", "left", "top", "width", "height")}
+        level = self._tesserocr.RIL.WORD
+        iterator = api.GetIterator()
+        if iterator is not None:
+            for word in self._tesserocr.iterate_level(iterator, level):
+                text = word.GetUTF8Text(level)
+                box = word.BoundingBox(level)
+                if text is None or box is None:
+                    continue
+                left, top, right, bottom = box
+                data["text"].append(text)
+                data["conf"].append(word.Confidence(level))
+                data["left"].append(left)
+                data["top"].append(top)
+                data["width"].append(right - left)
+                data["height"].append(bottom - top)
+        return data
+
+    def image_to_string(
+        self, image: ImageLike, config: str, timeout: Optional[float] = None
+    ) -> str:
+        return self._prepare(image, config).GetUTF8Text()
+
+    def close(self) -> None:
+        for api in self._apis.values():
+            api.End()
+        self._apis.clear()
+
+
+def tesserocr_available() -> bool:
+    """tesserocr(libtesseract binding)를 import할 수 있는지 확인합니다."""
+    try:
+        import tesserocr  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def default_backend() -> OCREngine:
+    """Worker 안에서 쓸 backend (tesserocr가 있으면 사용, 없으면 pytesseract)."""
+    try:
+        return TesserocrEngine()
+    except ImportError:
+        logger.warning(
+            "tesserocr is not installed; OCR falls back to pytesseract "
+            "(one tesseract process per call)"
+        )
+        return PytesseractEngine()
+
+
+def _to_pil(image: ImageLike) -> Image.Image:
+    if isinstance(image, np.ndarray):
+        return Image.fromarray(image)
+    return image
+
+
+def _worker_main(conn, backend_factory: Callable[[], OCREngine]) -> None:
+    """OCR worker 프로세스 본체 - backend를 한 번 만들고 요청을 반복 처리."""
+    try:
+        backend = backend_factory()
+    except Exception as e:
+        conn.send(("error", f"{type(e).__name__}: {e}"))
+        return
+    conn.send(("ready", os.getpid()))
+
+    while True:
+        try:
+            message = conn.recv()
+        except (EOFError, OSError):
+            break
+        if message is None:
+            break
+        op, mode, size, config = message
+        data = conn.recv_bytes()
+        try:
+            image = Image.frombytes(mode, size, data)
+            result = getattr(backend, op)(image, config)
+            conn.send(("ok", result))
+        except Exception as e:
+            conn.send(("error", f"{type(e).__name__}: {e}"))
+    backend.close()
+
+
+class _Worker:
+    """Pool 안의 worker 프로세스 하나와 pipe."""
+
+    def __init__(self, context, backend_factory, start_timeout: float):
+        self.conn, child_conn = context.Pipe()
+        self.process = context.Process(
+            target=_worker_main,
+            args=(child_conn, backend_factory),
+            daemon=True,
+        )
+        self.process.start()
+        child_conn.close()
+        if not self.conn.poll(start_timeout):
+            self.kill()
+            raise OCRTimeout("OCR worker did not start in time")
+        status, value = self.conn.recv()
+        if status != "ready":
+            self.kill()
+            raise OCRError(f"OCR worker failed to start: {value}")
+        self.pid = value
+
+    def kill(self) -> None:
+        if self.process.is_alive():
+            self.process.kill()
+        self.process.join(timeout=1)
+        self.conn.close()
+
+    def stop(self) -> None:
+        try:
+            self.conn.send(None)
+        except (OSError, ValueError):
+            pass
+        self.process.join(timeout=1)
+        self.kill()
+
+
+class OCRWorkerPool(OCREngine):
+    """미리 띄워 둔 OCR worker 프로세스 pool."""
+
+    def __init__(
+        self,
+        workers: Optional[int] = None,
+        max_queue: Optional[int] = None,
+        timeout: float = 30.0,
+        start_timeout: float = 60.0,
+        backend_factory: Callable[[], OCREngine] = default_backend,
+        mp_context: str = "spawn",
+    ):
+        """
+        Args:
+            workers: worker 프로세스 수 (None이면 min(4, CPU 수))
+            max_queue: 모든 worker가 바쁠 때 기다릴 수 있는 호출 수
+                       (None이면 workers * 4)
+            timeout: 호출당 제한 시간 (대기 시간 포함, 초)
+            start_timeout: worker 시작 제한 시간 (초)
+            backend_factory: worker 안에서 OCR backend를 만드는 함수
+                             (spawn 시 pickle 가능해야 함)
+            mp_context: multiprocessing start method
+        """
+        self.workers = workers or min(4, os.cpu_count() or 1)
+        self.max_queue = self.workers * 4 if max_queue is None else max_queue
+        self.timeout = timeout
+        self.start_timeout = start_timeout
+        self.backend_factory = backend_factory
+        self.mp_context = mp_context
+        self._reset()
+
+    def _reset(self) -> None:
+        self._pid = os.getpid()
+        self._context = multiprocessing.get_context(self.mp_context)
+        # LIFO: 살아 있는 worker를 먼저 재사용, None은 아직 띄우지 않은 자리
+        self._idle: "queue.LifoQueue[Optional[_Worker]]" = queue.LifoQueue()
+        for _ in range(self.workers):
+            self._idle.put(None)
+        self._slots = threading.BoundedSemaphore(self.workers + self.max_queue)
+        self._live: set = set()
+        self._lock = threading.Lock()
+
+    def __getstate__(self):
+        # 다른 프로세스로 넘어가면 설정만 복사하고 worker는 그쪽에서 새로 띄움
+        return {
+            "workers": self.workers,
+            "max_queue": self.max_queue,
+            "timeout": self.timeout,
+            "start_timeout": self.start_timeout,
+            "backend_factory": self.backend_factory,
+            "mp_context": self.mp_context,
+        }
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._reset()
+
+    def start(self) -> None:
+        """모든 worker를 미리 띄웁니다 (pre-warm)."""
+        self._check_pid()
+        slots = [self._idle.get() for _ in range(self.workers)]
+        try:
+            for i, worker in enumerate(slots):
+                if worker is None:
+                    slots[i] = self._spawn()
+        finally:
+            for worker in slots:
+                self._idle.put(worker)
+
+    def image_to_data(
+        self, image: ImageLike, config: str, timeout: Optional[float] = None
+    ) -> Dict[str, list]:
+        return self._call("image_to_data", image, config, timeout)
+
+    def image_to_string(
+        self, image: ImageLike, config: str, timeout: Optional[float] = None
+    ) -> str:
+        return self._call("image_to_string", image, config, timeout)
+
+    def close(self) -> None:
+        """모든 worker를 종료합니다."""
+        with self._lock:
+            workers = list(self._live)
+            self._live.clear()
+        for worker in workers:
+            worker.stop()
+        self._reset()
+
+    @property
+    def worker_pids(self) -> list:
+        """살아 있는 worker 프로세스 pid 목록."""
+        with self._lock:
+            return [worker.pid for worker in self._live]
+
+    def _check_pid(self) -> None:
+        # fork된 자식 프로세스에서는 부모의 worker/pipe를 쓰지 않음
+        if self._pid != os.getpid():
+            self._reset()
+
+    def _spawn(self) -> _Worker:
+        worker = _Worker(self._context, self.backend_factory, self.start_timeout)
+        with self._lock:
+            self._live.add(worker)
+        return worker
+
+    def _discard(self, worker: _Worker) -> None:
+        with self._lock:
+            self._live.discard(worker)
+        worker.kill()
+
+    def _call(
+        self, op: str, image: ImageLike, config: str, timeout: Optional[float] = None
+    ):
+        self._check_pid()
+        # 호출별 제한 시간은 pool 기본값보다 길어질 수 없음
+        limit = self.timeout if timeout is None else min(timeout, self.timeout)
+        deadline = time.monotonic() + limit
+
+        if not self._slots.acquire(blocking=False):
+            raise OCRQueueFull(
+                f"Too many pending OCR calls (workers={self.workers}, "
+                f"max_queue={self.max_queue})"
+            )
+        try:
+            try:
+                worker = self._idle.get(timeout=max(deadline - time.monotonic(), 0))
+            except queue.Empty:
+                raise OCRTimeout("Timed out waiting for an OCR worker") from None
+
+            try:
+                if worker is None:
+                    worker = self._spawn()
+                pil_image = _to_pil(image)
+                worker.conn.send((op, pil_image.mode, pil_image.size, config))
+                worker.conn.send_bytes(pil_image.tobytes())
+
+                if not worker.conn.poll(max(deadline - time.monotonic(), 0)):
+                    # 멈춘 worker는 종료하고 자리를 비워 둠 (다음 호출 때 새로 띄움)
+                    self._discard(worker)
+                    worker = None
+                    raise OCRTimeout(f"OCR call exceeded {limit}s")
+                status, value = worker.conn.recv()
+            except (EOFError, OSError) as e:
+                # worker가 죽은 경우
+                if worker is not None:
+                    self._discard(worker)
+                worker = None
+                raise OCRError(f"OCR worker crashed: {e}") from e
+            finally:
+                self._idle.put(worker)
+        finally:
+            self._slots.release()
+
+        if status != "ok":
+            raise OCRError(value)
+        return value
+
+
+_default_engine: Optional[OCREngine] = None
+_default_engine_pid: Optional[int] = None
+_default_engine_lock = threading.Lock()
+
+
+def _create_default_engine() -> OCREngine:
+    if tesserocr_available():
+        return OCRWorkerPool()
+    # pytesseract는 호출마다 tesseract 프로세스를 띄우므로 worker pool을 거치면
+    # spawn / pickle / IPC 비용만 늘어남 → 호출한 thread에서 바로 실행
+    logger.warning(
+        "tesserocr is not installed; OCR worker pool disabled, "
+        "calling pytesseract directly (one tesseract process per call)"
+    )
+    return PytesseractEngine()
+
+
+def get_default_ocr_engine() -> OCREngine:
+    """
+    프로세스 공용 OCR 엔진을 반환합니다 (처음 호출 시 생성).
+
+    tesserocr가 있으면 상주 OCR worker pool, 없으면 pytesseract 직접 호출.
+    """
+    global _default_engine, _default_engine_pid
+    if _default_engine is None or _default_engine_pid != os.getpid():
+        with _default_engine_lock:
+            if _default_engine is None or _default_engine_pid != os.getpid():
+                _default_engine = _create_default_engine()
+                _default_engine_pid = os.getpid()
+    return _default_engine
+
+
+def _close_default_engine() -> None:
+    if _default_engine is not None and _default_engine_pid == os.getpid():
+        _default_engine.close()
+
+
+atexit.register(_close_default_engine)
@@ -1,13 +1,20 @@
 """이미지 분석 Pipeline 구현."""
 
+import asyncio
 from pathlib import Path
-from analyze.base import Pipeline
+from typing import Optional
+import numpy as np
+from analyze.base import Pipeline, ProgressCallback
+from analyze.cache import AnalysisCache, compute_file_hash, make_cache_key
+from analyze.executor import PipelineExecutor
+from analyze.image_buffer import ImageBuffer
 from analyze.models import (
     PipelineContext,
     PipelineResult,
     AnalyzeResult,
     AnswerResult,
 )
+from services.file_storage import get_file_path_by_id
 from analyze.steps import (
     PreprocessStep,
     ExtractProblemStep,
@@ -24,37 +31,106 @@ class AnalyzePipeline(Pipeline):
     2. ExtractProblem: 손글씨 제거하고 문제만 남기기 (인쇄물만 추출)
     3. ExtractAnswer: 손글씨에서 정답만 텍스트로 추출 (OCR)
     4. Postprocess: frontend가 쓰기 좋은 JSON으로 정리
+
+    2와 3은 모두 전처리 결과만 읽으므로 동시에 실행됩니다.
     """
 
-    def __init__(self):
-        """Pipeline 초기화 - 단계들을 순서대로 설정."""
+    def __init__(
+        self,
+        executor: Optional[PipelineExecutor] = None,
+        cache: Optional[AnalysisCache] = None,
+    ):
+        """
+        Pipeline 초기화 - 단계들을 순서대로 설정.
+
+        Args:
+            executor: blocking 작업용 executor (None이면 CPU 수 크기의 thread pool)
+            cache: 분석 결과 캐시 (None이면 캐시 사용 안 함)
+        """
         steps = [
             PreprocessStep(),
             ExtractProblemStep(),
             ExtractAnswerStep(),
             PostprocessStep(),
         ]
-        super().__init__(steps)
+        super().__init__(steps, executor=executor or PipelineExecutor())
+        self.cache = cache
 
-    async def analyze(self, file_id: str, file_path: Path) -> PipelineResult:
+    async def analyze(
+        self,
+        file_id: str,
+        file_path: Path,
+        content_hash: Optional[str] = None,
+        on_progress: Optional[ProgressCallback] = None,
+        image: Optional[np.ndarray] = None,
+        is_crop: bool = False,
+    ) -> PipelineResult:
         """
         이미지 분석 실행.
 
+        캐시가 설정되어 있으면 같은 내용 + 같은 설정의 이전 결과를 재사용합니다.
+
         Args:
             file_id: 파일 ID
-            file_path: 파일 경로
+            file_path: 파일 경로 (image를 주면 아직 없는 경로여도 됨)
+            content_hash: 파일 내용 sha256 (None이면 캐시 사용 시 직접 계산)
+            on_progress: 단계 진행 상황 콜백 (캐시 hit이면 호출되지 않음)
+            image: 이미 디코딩된 이미지 (RGB 또는 Grayscale, 있으면 파일을 읽지 않음)
+            is_crop: 사용자가 잘라낸 영역인지 (기본 설정에서는 기하 보정을 하지 않음)
 
         Returns:
             Pipeline 결과
         """
-        # 초기 컨텍스트 생성
+        if self.cache is not None and image is None:
+            # 파일 확인과 해시 계산을 한 번에 이벤트 루프 밖에서 (파일이 없으면 None)
+            content_hash = await asyncio.to_thread(
+                _file_content_hash, file_path, content_hash
+            )
+        # 메모리 이미지는 호출자가 준 해시가 있을 때만 캐시 사용
+        if self.cache is None or content_hash is None:
+            return await self._analyze(file_id, file_path, on_progress, image, is_crop)
+
+        # crop 여부에 따라 전처리가 달라지므로 키에 포함
+        key = make_cache_key(
+            content_hash, {"steps": self.get_config(), "is_crop": is_crop}
+        )
+
+        cached = await self.cache.aget(key)
+        # 인덱스 조회 / 가상 crop 파일 생성이 있을 수 있으므로 이벤트 루프 밖에서
+        if cached is not None and await asyncio.to_thread(
+            _problem_image_exists, cached
+        ):
+            return _rebind(cached, file_id, file_path)
+
+        result = await self._analyze(file_id, file_path, on_progress, image, is_crop)
+        result.context.metadata["cache"] = "miss"
+        if _is_cacheable(result):
+            await self.cache.aput(key, result)
+        return result
+
+    async def _analyze(
+        self,
+        file_id: str,
+        file_path: Path,
+        on_progress: Optional[ProgressCallback] = None,
+        image: Optional[np.ndarray] = None,
+        is_crop: bool = False,
+    ) -> PipelineResult:
+        """캐시 없이 pipeline을 실행합니다."""
+        # 초기 컨텍스트 생성 (메모리 이미지는 공유 버퍼의 원본으로 전달)
         context = PipelineContext(
             file_id=file_id,
             file_path=file_path,
+            image=ImageBuffer(file_path, original=image) if image is not None else None,
+            is_crop=is_crop,
         )
 
         # Pipeline 실행
-        final_context = await self.run(context)
+        final_context = await self.run(context, on_progress)
+
+        # 디코딩된 이미지 버퍼 해제 (결과에는 필요 없음)
+        if final_context.image is not None:
+            final_context.image.clear()
 
         # 최종 결과 생성 (API 응답 형식에 맞춤)
         # postprocess 단계에서 생성한 AnalyzeResult 사용
@@ -78,3 +154,44 @@ class AnalyzePipeline(Pipeline):
         )
 
         return result
+
+
+def _is_cacheable(result: PipelineResult) -> bool:
+    """모든 단계가 정상 완료된 결과만 캐시합니다."""
+    context = result.context
+    return all(
+        (stage or {}).get("status") == "completed"
+        for stage in (
+            context.preprocessed,
+            context.extracted_problem,
+            context.extracted_answer,
+            context.postprocessed,
+        )
+    )
+
+
+def _file_content_hash(file_path: Path, content_hash: Optional[str]) -> Optional[str]:
+    """파일이 있으면 내용 해시를 반환합니다 (주어진 해시가 있으면 그대로, 없으면 None)."""
+    if not file_path.is_file():
+        return None
+    return content_hash or compute_file_hash(file_path)
+
+
+def _problem_image_exists(result: PipelineResult) -> bool:
+    """캐시된 결과가 가리키는 문제 이미지가 아직 저장소에 있는지 확인합니다."""
+    problem = result.context.extracted_problem if result.context else None
+    problem_file_id = (problem or {}).get("problem_file_id")
+    if problem_file_id is None:
+        return False
+    path = get_file_path_by_id(problem_file_id)
+    return path is not None and path.exists()
+
+
+def _rebind(result: PipelineResult, file_id: str, file_path: Path) -> PipelineResult:
+    """캐시된 결과를 이번 요청의 file_id/경로 기준으로 바꿉니다."""
+    result.file_id = file_id
+    if result.context is not None:
+        result.context.file_id = file_id
+        result.context.file_path = file_path
+        result.context.metadata["cache"] = "hit"
+    return result
@@ -3,29 +3,139 @@
 손글씨 부분에서 정답만 추출하여 텍스트로 변환합니다.
 - 손글씨 영역 감지
 - 답 영역 감지 (문제 번호 옆)
-- 숫자/식 OCR 수행
+- 숫자/식 OCR 수행 (답 후보 영역 crop에만, 병렬로)
 - 텍스트로 변환 및 신뢰도 계산
 
 중요: 이미지로 저장하지 않고 텍스트 데이터로만 저장합니다.
 """
 
-from typing import Tuple
-import pytesseract
+import asyncio
+from typing import List, Optional, Tuple
+import numpy as np
 from PIL import Image
 from analyze.base import PipelineStep
 from analyze.models import PipelineContext
-from analyze.steps.image_processing import preprocess_for_ocr
+from analyze.ocr import OCREngine, get_default_ocr_engine
+from analyze.steps.image_processing import (
+    detect_answer_regions,
+    preprocess_gray_for_ocr,
+)
+
+
+def recognize_text(
+    image: Image.Image,
+    tesseract_config: str,
+    engine: Optional[OCREngine] = None,
+    timeout: Optional[float] = None,
+) -> dict:
+    """
+    한 번의 인식(image_to_data)으로 텍스트, 단어 box, confidence를 구합니다.
+
+    Args:
+        image: OCR 전처리된 PIL Image
+        tesseract_config: Tesseract OCR 설정
+        engine: OCR 엔진 (None이면 프로세스 공용 OCR worker pool)
+        timeout: OCR 호출 제한 시간 (초, None이면 엔진 기본값)
+
+    Returns:
+        {"text": 추출된 텍스트, "confidence": 평균 confidence (0~1),
+         "words": [{"text", "confidence", "left", "top", "width", "height"}, ...]}
+        OCR 실패 시 빈 결과
+    """
+    if engine is None:
+        engine = get_default_ocr_engine()
+
+    try:
+        data = engine.image_to_data(image, tesseract_config, timeout=timeout)
+    except Exception:
+        # OCR 실패 시 빈 결과 반환
+        return {"text": "", "confidence": 0.0, "words": []}
+
+    words = []
+    confidences = []
+    for i, text in enumerate(data["text"]):
+        text = text.strip()
+        if not text:  # 빈 문자열(블록 / 줄 단위 항목)은 건너뜀
+            continue
+        conf = float(data["conf"][i])
+        word = {"text": text, "confidence": max(conf, 0.0) / 100.0}
+        for key in ("left", "top", "width", "height"):
+            if key in data:
+                word[key] = int(data[key][i])
+        words.append(word)
+        if conf > 0:  # confidence가 0보다 큰 경우만
+            confidences.append(conf)
+
+    # 평균 confidence 계산
+    if confidences:
+        avg_confidence = sum(confidences) / len(confidences) / 100.0
+    else:
+        avg_confidence = 0.0
+
+    return {
+        "text": " ".join(word["text"] for word in words),
+        "confidence": avg_confidence,
+        "words": words,
+    }
+
+
+def extract_text_with_confidence(
+    image: Image.Image,
+    tesseract_config: str,
+    engine: Optional[OCREngine] = None,
+) -> Tuple[str, float]:
+    """
+    OCR 엔진을 사용하여 텍스트와 confidence를 추출합니다 (인식 1회).
+
+    Args:
+        image: OCR 전처리된 PIL Image
+        tesseract_config: Tesseract OCR 설정
+        engine: OCR 엔진 (None이면 프로세스 공용 OCR worker pool)
+
+    Returns:
+        (추출된 텍스트, 평균 confidence)
+    """
+    result = recognize_text(image, tesseract_config, engine)
+    return result["text"], result["confidence"]
+
+
+def _recognize_answer(
+    gray: np.ndarray,
+    tesseract_config: str,
+    engine: Optional[OCREngine],
+    timeout: Optional[float] = None,
+) -> dict:
+    """Grayscale 이미지를 OCR 전처리 후 인식합니다 (executor에서 실행)."""
+    # OCR 전처리 (색상 반전, 대비 증가)
+    preprocessed_img = Image.fromarray(preprocess_gray_for_ocr(gray))
+
+    # OCR 수행
+    return recognize_text(preprocessed_img, tesseract_config, engine, timeout)
+
+
+def _detect_answer_regions(image: np.ndarray, max_regions: int) -> List[dict]:
+    """답 후보 영역을 찾습니다 (executor에서 실행)."""
+    return detect_answer_regions(image, max_regions=max_regions)
 
 
 class ExtractAnswerStep(PipelineStep):
     """답안 추출 단계 - 손글씨에서 정답만 텍스트로 추출."""
 
+    inputs = ("preprocessed",)
+    outputs = ("extracted_answer",)
+
     def __init__(
         self,
         min_confidence: float = 0.3,
         tesseract_config: str = (
             "--psm 6 -c tessedit_char_whitelist=0123456789+-×÷=()[]"
         ),
+        ocr_engine: Optional[OCREngine] = None,
+        max_regions: int = 3,
+        region_padding: int = 8,
+        full_page_fallback: bool = True,
+        alternate_config: Optional[str] = None,
+        alternate_timeout: float = 2.0,
     ):
         """
         Args:
@@ -33,9 +143,24 @@ class ExtractAnswerStep(PipelineStep):
             tesseract_config: Tesseract OCR 설정
                 - --psm 6: 단일 블록 텍스트
                 - tessedit_char_whitelist: 숫자와 기본 수학 기호만
+            ocr_engine: OCR 엔진 (None이면 프로세스 공용 OCR worker pool)
+            max_regions: OCR할 최대 답 후보 영역 수 (0이면 항상 페이지 전체)
+            region_padding: 후보 영역 crop에 더할 여백 (픽셀)
+            full_page_fallback: 후보 영역이 없으면 페이지 전체를 OCR
+            alternate_config: 함께 시도할 다른 설정 (예: "--psm 7" 한 줄 모드).
+                              기본 설정과 병렬로 실행하고 confidence가 높은 쪽 사용
+            alternate_timeout: 기본 설정 인식이 끝난 뒤 alternate 결과를 기다리는
+                               최대 시간 (초, 넘으면 기본 결과 사용).
+                               alternate OCR 호출 자체의 제한 시간이기도 함
         """
         self.min_confidence = min_confidence
         self.tesseract_config = tesseract_config
+        self.ocr_engine = ocr_engine
+        self.max_regions = max_regions
+        self.region_padding = region_padding
+        self.full_page_fallback = full_page_fallback
+        self.alternate_config = alternate_config
+        self.alternate_timeout = alternate_timeout
 
     async def execute(self, context: PipelineContext) -> PipelineContext:
         """
@@ -43,9 +168,10 @@ class ExtractAnswerStep(PipelineStep):
 
         처리 과정:
         1. 전처리된 이미지 로드 (손글씨가 포함된 원본)
-        2. OCR 전처리 (색상 반전, 대비 증가)
-        3. pytesseract로 OCR 수행 (숫자/기호만)
-        4. confidence 확인하고 낮으면 빈 문자열 반환
+        2. 손글씨 답 후보 영역 감지 (인쇄 텍스트와 색 / 진하기 / 형태가 다른 잉크)
+        3. 후보 crop마다 OCR 전처리 + OCR을 병렬로 수행 (숫자/기호만)
+           - 후보가 없으면 페이지 전체 OCR (full_page_fallback)
+        4. confidence가 가장 높은 후보를 답으로 선택, 낮으면 빈 문자열 반환
 
         Args:
             context: Pipeline 컨텍스트
@@ -53,13 +179,24 @@ class ExtractAnswerStep(PipelineStep):
         Returns:
             업데이트된 Pipeline 컨텍스트
         """
-        # 전처리된 이미지 경로 가져오기 (손글씨가 포함된 원본)
-        preprocessed = context.preprocessed or {}
-        processed_path = preprocessed.get("processed_path", str(context.file_path))
-
-        # 이미지 로드
+        # 전처리된 이미지의 공유 버퍼 (손글씨가 포함된 원본)
         try:
-            original_img = Image.open(processed_path)
+            gray = await self.load_plane(context, "gray")
+            regions = []
+            if self.max_regions > 0:
+                regions = await self.run_blocking(
+                    _detect_answer_regions,
+                    await self.load_plane(context, "bgr"),
+                    self.max_regions,
+                )
+            if not regions and self.full_page_fallback:
+                regions = [None]
+
+            # 후보 crop마다 OCR 전처리 + OCR (이벤트 루프 밖에서 병렬 실행)
+            crops = [self._crop(gray, region) for region in regions]
+            results = await asyncio.gather(
+                *(self._recognize(crop) for crop, _ in crops)
+            )
         except Exception as e:
             # 이미지 로드 실패 시 빈 결과 반환
             context.extracted_answer = {
@@ -71,11 +208,28 @@ class ExtractAnswerStep(PipelineStep):
             }
             return context
 
-        # OCR 전처리 (색상 반전, 대비 증가)
-        preprocessed_img = preprocess_for_ocr(original_img)
-
-        # OCR 수행
-        answer_text, confidence = self._extract_text_with_confidence(preprocessed_img)
+        candidates = []
+        for region, (_, (x0, y0)), result in zip(regions, crops, results):
+            # 단어 box를 페이지 좌표로
+            for word in result["words"]:
+                if "left" in word:
+                    word["left"] += x0
+                    word["top"] += y0
+            candidates.append(
+                {
+                    "box": region,
+                    "answer_text": result["text"],
+                    "confidence": result["confidence"],
+                    "words": result["words"],
+                }
+            )
+        best = max(
+            candidates,
+            key=lambda c: (bool(c["answer_text"]), c["confidence"]),
+            default={"box": None, "answer_text": "", "confidence": 0.0},
+        )
+        answer_text = best["answer_text"]
+        confidence = best["confidence"]
 
         # confidence가 낮으면 빈 문자열 반환
         if confidence < self.min_confidence:
@@ -86,11 +240,83 @@ class ExtractAnswerStep(PipelineStep):
             "answer_text": answer_text,
             "confidence": confidence,
             "ocr_method": "tesseract",
+            "answer_box": best["box"],
+            "candidates": candidates,
             "status": "completed",
         }
 
         return context
 
+    async def _recognize(self, crop: np.ndarray) -> dict:
+        """
+        crop 하나를 인식합니다.
+
+        alternate_config가 있으면 두 설정을 동시에 실행하고(순차 재시도 없음),
+        기본 결과가 나온 뒤 alternate_timeout 안에 끝난 alternate 결과와
+        confidence를 비교합니다. alternate는 OCR 호출 자체에 alternate_timeout을
+        걸어서, 늦어지면 OCR 엔진이 인식을 끊고 worker를 돌려줍니다
+        (asyncio future 취소만으로는 이미 실행 중인 OCR이 멈추지 않음).
+        """
+        if self.alternate_config is None:
+            return await self.run_blocking(
+                _recognize_answer, crop, self.tesseract_config, self.ocr_engine
+            )
+
+        # 둘 다 바로 시작 (primary를 coroutine으로 두면 await할 때까지 시작하지 않음)
+        primary = asyncio.ensure_future(
+            self.run_blocking(
+                _recognize_answer, crop, self.tesseract_config, self.ocr_engine
+            )
+        )
+        alternate = asyncio.ensure_future(
+            self.run_blocking(
+                _recognize_answer,
+                crop,
+                self.alternate_config,
+                self.ocr_engine,
+                self.alternate_timeout,
+            )
+        )
+        try:
+            result = await primary
+            try:
+                other = await asyncio.wait_for(alternate, self.alternate_timeout)
+            except Exception:
+                # 시간 초과 / 실패한 alternate는 무시
+                return result
+        finally:
+            if not alternate.done():
+                # executor에서 아직 시작하지 않았으면 실행하지 않음
+                # (실행 중이면 위의 OCR 제한 시간으로 끝남)
+                alternate.cancel()
+            elif not alternate.cancelled():
+                # 쓰지 않은 결과의 예외도 회수 (미회수 경고 방지)
+                alternate.exception()
+        if (bool(other["text"]), other["confidence"]) > (
+            bool(result["text"]),
+            result["confidence"],
+        ):
+            return other
+        return result
+
+    def _crop(
+        self, gray: np.ndarray, region: Optional[dict]
+    ) -> Tuple[np.ndarray, Tuple[int, int]]:
+        """
+        후보 영역에 여백을 더해 잘라냅니다 (None이면 페이지 전체).
+
+        Returns:
+            (crop view, crop 왼쪽 위 좌표 (x, y))
+        """
+        if region is None:
+            return gray, (0, 0)
+        pad = self.region_padding
+        x0 = max(region["x"] - pad, 0)
+        y0 = max(region["y"] - pad, 0)
+        x1 = region["x"] + region["width"] + pad
+        y1 = region["y"] + region["height"] + pad
+        return gray[y0:y1, x0:x1], (x0, y0)
+
     def _extract_text_with_confidence(self, image: Image.Image) -> Tuple[str, float]:
         """
         pytesseract를 사용하여 텍스트와 confidence를 추출합니다.
@@ -101,52 +327,20 @@ class ExtractAnswerStep(PipelineStep):
         Returns:
             (추출된 텍스트, 평균 confidence)
         """
-        try:
-            # pytesseract로 OCR 수행 (숫자/기호만)
-            # image_to_data를 사용하여 confidence 정보도 함께 가져옴
-            data = pytesseract.image_to_data(
-                image,
-                config=self.tesseract_config,
-                output_type=pytesseract.Output.DICT,
-            )
+        return extract_text_with_confidence(
+            image, self.tesseract_config, self.ocr_engine
+        )
 
-            # 텍스트 추출
-            texts = []
-            confidences = []
-
-            for i, text in enumerate(data["text"]):
-                if text.strip():  # 빈 문자열이 아닌 경우만
-                    texts.append(text.strip())
-                    conf = float(data["conf"][i])
-                    if conf > 0:  # confidence가 0보다 큰 경우만
-                        confidences.append(conf)
-
-            # 전체 텍스트 합치기
-            answer_text = " ".join(texts).strip()
-
-            # 평균 confidence 계산
-            if confidences:
-                avg_confidence = sum(confidences) / len(confidences) / 100.0
-            else:
-                avg_confidence = 0.0
-
-            # confidence가 없거나 너무 낮으면 image_to_string으로 재시도
-            if not answer_text or avg_confidence < 0.1:
-                answer_text = pytesseract.image_to_string(
-                    image, config=self.tesseract_config
-                ).strip()
-                # image_to_string은 confidence를 반환하지 않으므로
-                # 기본값 사용
-                if answer_text:
-                    avg_confidence = 0.5  # 기본 confidence
-                else:
-                    avg_confidence = 0.0
-
-            return answer_text, avg_confidence
-
-        except Exception:
-            # OCR 실패 시 빈 결과 반환
-            return "", 0.0
+    def get_config(self) -> dict:
+        """OCR 설정과 최소 신뢰도."""
+        return {
+            "tesseract_config": self.tesseract_config,
+            "min_confidence": self.min_confidence,
+            "max_regions": self.max_regions,
+            "region_padding": self.region_padding,
+            "full_page_fallback": self.full_page_fallback,
+            "alternate_config": self.alternate_config,
+        }
 
     def get_name(self) -> str:
         """단계 이름 반환."""
@@ -5,29 +5,115 @@
 
 - 인쇄물 vs 손글씨 분리 (색상, 질감, 두께 분석)
 - 손글씨 영역 제거
-- 최종 문제 이미지 저장 및 URL 생성
+- 최종 문제 이미지 저장 및 URL 생성 (흑백 결과는 1-bit PNG)
 """
 
+import time
 import uuid
 from pathlib import Path
-from datetime import datetime
+import cv2
+import numpy as np
 from PIL import Image
 from typing import Optional
 from analyze.base import PipelineStep
+from analyze.metrics import observe_remover
 from analyze.models import PipelineContext
-from services.file_storage import UPLOAD_ROOT
+from services.file_storage import new_file_path, register_file
 from analyze.steps.image_processing import (
-    remove_handwriting_from_pil,
     HandwritingRemover,
     ThresholdBasedRemover,
     MorphologyBasedRemover,
     AIBasedRemover,
+    CascadeRemover,
 )
 
+# 흑백 결과 PNG 압축 수준 (크기 / 속도 균형: 12MP 기준 약 45 ms, JPEG의 1/5 크기)
+BILEVEL_PNG_COMPRESSION = 3
+
+
+def is_bilevel(image: np.ndarray) -> bool:
+    """0과 255로만 이루어진 Grayscale 이미지인지 확인합니다."""
+    return image.ndim == 2 and cv2.countNonZero(cv2.inRange(image, 1, 254)) == 0
+
+
+def save_problem_image(image: np.ndarray, output_path: str) -> dict:
+    """
+    필기 제거 결과를 저장합니다.
+
+    흑백(이진) 결과는 확장자와 관계없이 1-bit PNG로 저장합니다.
+    JPEG보다 작고 빠르며 글자 경계가 흐려지지 않고, 브라우저에서 바로 열립니다.
+    그 외(회색조가 있는 inpainting 결과 등)는 output_path 확장자 형식으로 저장합니다.
+
+    Args:
+        image: 필기가 제거된 Grayscale 이미지
+        output_path: 저장 경로 (흑백이면 확장자를 .png로 바꿈)
+
+    Returns:
+        {"path", "content_type", "size", "bilevel"}
+    """
+    path = Path(output_path)
+    bilevel = is_bilevel(image)
+    if bilevel:
+        path = path.with_suffix(".png")
+        ok, data = cv2.imencode(
+            ".png",
+            image,
+            [
+                cv2.IMWRITE_PNG_BILEVEL,
+                1,
+                cv2.IMWRITE_PNG_COMPRESSION,
+                BILEVEL_PNG_COMPRESSION,
+            ],
+        )
+        if not ok:
+            raise ValueError("Failed to encode problem image")
+        path.write_bytes(data)
+        size = len(data)
+        content_type = "image/png"
+    else:
+        Image.fromarray(image).save(path)
+        size = path.stat().st_size
+        content_type = None  # 확장자로 추정
+    return {
+        "path": str(path),
+        "content_type": content_type,
+        "size": size,
+        "bilevel": bilevel,
+    }
+
+
+def _remove_handwriting_and_save(
+    image: np.ndarray, remover: HandwritingRemover, output_path: str
+) -> dict:
+    """
+    필기를 제거하고 저장합니다 (executor에서 실행).
+
+    Returns:
+        {"remove_time", "save_time", "removal": 실제로 사용한 방법 정보,
+         "file": save_problem_image 결과}
+    """
+    # 필기 제거 처리 (전략 패턴 사용)
+    start = time.perf_counter()
+    result_array, removal = remover.remove_with_info(image)
+    removed = time.perf_counter()
+
+    # 처리된 이미지 저장
+    saved = save_problem_image(result_array, output_path)
+
+    return {
+        "remove_time": removed - start,
+        "save_time": time.perf_counter() - removed,
+        "removal": removal,
+        "file": saved,
+    }
+
 
 class ExtractProblemStep(PipelineStep):
     """문제 추출 단계 - 손글씨 제거하고 문제만 남기기."""
 
+    inputs = ("preprocessed",)
+    outputs = ("extracted_problem",)
+
     def __init__(
         self,
         remover: Optional[HandwritingRemover] = None,
@@ -38,11 +124,13 @@ class ExtractProblemStep(PipelineStep):
 
         Args:
             remover: 사용할 HandwritingRemover 인스턴스
-            remover_level: 사용할 레벨 (1: Threshold, 2: Morphology, 3: AI)
-                          remover가 None일 때만 사용됨
+            remover_level: 사용할 레벨 (0: Cascade, 1: Threshold,
+                          2: Morphology, 3: AI). remover가 None일 때만 사용됨
         """
         if remover is None:
-            if remover_level == 1:
+            if remover_level == 0:
+                self.remover = CascadeRemover()
+            elif remover_level == 1:
                 self.remover = ThresholdBasedRemover()
             elif remover_level == 2:
                 self.remover = MorphologyBasedRemover()
@@ -50,7 +138,7 @@ class ExtractProblemStep(PipelineStep):
                 self.remover = AIBasedRemover()
             else:
                 raise ValueError(
-                    f"Invalid remover_level: {remover_level}. " "Must be 1, 2, or 3"
+                    f"Invalid remover_level: {remover_level}. " "Must be 0, 1, 2, or 3"
                 )
         else:
             self.remover = remover
@@ -81,22 +169,32 @@ class ExtractProblemStep(PipelineStep):
         problem_file_id = str(uuid.uuid4())
 
         # 저장 경로 생성
-        date_dir = datetime.now().strftime("%Y-%m-%d")
-        upload_dir = UPLOAD_ROOT / date_dir
-        upload_dir.mkdir(parents=True, exist_ok=True)
-
         ext = processed_path.suffix or ".png"
-        stored_name = f"{problem_file_id}{ext}"
-        problem_image_path = upload_dir / stored_name
+        problem_image_path = new_file_path(problem_file_id, ext)
 
-        # 이미지 로드 및 필기 제거 처리
-        original_img = Image.open(processed_path)
+        # 공유 버퍼에서 remover가 쓰는 표현만 가져옴 (디코딩은 분석당 1회)
+        image = await self.load_plane(context, self.remover.input_plane)
 
-        # 필기 제거 처리 (전략 패턴 사용)
-        cleaned_img = remove_handwriting_from_pil(original_img, self.remover)
-
-        # 처리된 이미지 저장
-        cleaned_img.save(problem_image_path)
+        # 필기 제거 및 저장 (이벤트 루프 밖에서 실행)
+        result = await self.run_blocking(
+            _remove_handwriting_and_save,
+            image,
+            self.remover,
+            str(problem_image_path),
+        )
+        removal = result.pop("removal")
+        saved = result.pop("file")
+        timings = result
+        # 흑백 결과는 .png로 저장되므로 실제 저장 경로를 사용
+        problem_image_path = Path(saved["path"])
+        register_file(
+            problem_file_id,
+            problem_image_path,
+            content_type=saved["content_type"],
+            size=saved["size"],
+        )
+        # cascade는 실제로 결과를 낸 단계의 방법으로 집계
+        observe_remover(removal["method"], timings["remove_time"])
 
         # 문제 이미지 URL 생성 (frontend에서 사용할 수 있도록)
         problem_image_url = f"/files/{problem_file_id}"  # noqa: E501
@@ -106,13 +204,20 @@ class ExtractProblemStep(PipelineStep):
             "problem_image_path": str(problem_image_path),
             "problem_image_url": problem_image_url,
             "handwriting_removed": True,
-            "separation_method": self.remover.get_method_name(),
-            "confidence": self.remover.get_confidence(),
+            "bilevel": saved["bilevel"],
+            "separation_method": removal["method"],
+            "confidence": removal["confidence"],
+            "removal": removal,
+            "timings": timings,
             "status": "completed",
         }
 
         return context
 
+    def get_config(self) -> dict:
+        """사용하는 remover와 파라미터."""
+        return {"remover": self.remover.get_config()}
+
     def get_name(self) -> str:
         """단계 이름 반환."""
         return "extract_problem"
@@ -0,0 +1,223 @@
+"""문서 경계 검출 / 기울기 보정 / 원근 보정.
+
+12MP 사진에서 edge / contour 검출을 그대로 돌리면 느리므로,
+기하 정보(페이지 꼭짓점, 기울기)는 image pyramid의 작은 단계(proxy)에서
+추정하고, 최종 변환(homography)은 원본 해상도 이미지에 한 번만 적용합니다.
+
+- 페이지 경계가 보이면: 4개 꼭짓점 → 원근 보정 (여백 제거 포함)
+  (이미지 가장자리 가까이까지 닿는 사각형만 페이지로 인정 - 페이지 안의
+  표 / 박스를 페이지로 보고 잘라내지 않도록)
+- 보이지 않으면: 글자 줄의 기울기만 추정하여 회전 보정
+"""
+
+from typing import Optional, Tuple
+
+import cv2
+import numpy as np
+
+# proxy 이미지의 긴 변 최대 길이
+PROXY_MAX_SIDE = 512
+
+# 페이지로 인정할 최소 면적 비율 (proxy 전체 대비)
+MIN_PAGE_AREA_RATIO = 0.25
+
+# 페이지 사각형과 이미지 가장자리 사이에 허용하는 최대 여백 (변 길이 대비, 각 변마다)
+# 면적이 80% 이상인 사각형은 항상 이 조건을 만족함
+MAX_PAGE_MARGIN_RATIO = 0.2
+
+# 이 각도(도)보다 작은 기울기는 보정하지 않음 / 이보다 크면 추정 오류로 봄
+MIN_SKEW_ANGLE = 0.5
+MAX_SKEW_ANGLE = 15.0
+
+
+def build_proxy(
+    image: np.ndarray, max_side: int = PROXY_MAX_SIDE
+) -> Tuple[np.ndarray, float]:
+    """
+    pyrDown을 반복하여 긴 변이 max_side 이하인 grayscale proxy를 만듭니다.
+
+    Args:
+        image: RGB 또는 Grayscale 이미지
+        max_side: proxy 긴 변 최대 길이
+
+    Returns:
+        (proxy, 원본 / proxy 배율)
+    """
+    gray = image if image.ndim == 2 else cv2.cvtColor(image, cv2.COLOR_RGB2GRAY)
+    proxy = gray
+    while max(proxy.shape[:2]) > max_side:
+        proxy = cv2.pyrDown(proxy)
+    return proxy, gray.shape[1] / proxy.shape[1]
+
+
+def order_corners(points: np.ndarray) -> np.ndarray:
+    """꼭짓점 4개를 (좌상, 우상, 우하, 좌하) 순서로 정렬합니다."""
+    points = points.reshape(4, 2).astype(np.float32)
+    sums = points.sum(axis=1)
+    diffs = np.diff(points, axis=1).ravel()
+    return np.array(
+        [
+            points[np.argmin(sums)],
+            points[np.argmin(diffs)],
+            points[np.argmax(sums)],
+            points[np.argmax(diffs)],
+        ],
+        dtype=np.float32,
+    )
+
+
+def _reaches_borders(corners: np.ndarray, shape: Tuple[int, ...]) -> bool:
+    """사각형이 네 방향 모두 이미지 가장자리 가까이까지 닿는지 확인합니다."""
+    height, width = shape[:2]
+    left, top = corners.min(axis=0)
+    right, bottom = corners.max(axis=0)
+    return (
+        left <= MAX_PAGE_MARGIN_RATIO * width
+        and top <= MAX_PAGE_MARGIN_RATIO * height
+        and width - 1 - right <= MAX_PAGE_MARGIN_RATIO * width
+        and height - 1 - bottom <= MAX_PAGE_MARGIN_RATIO * height
+    )
+
+
+def detect_page_corners(proxy: np.ndarray) -> Optional[np.ndarray]:
+    """
+    proxy에서 페이지(가장 큰 볼록 사각형)의 꼭짓점을 찾습니다.
+
+    페이지 안의 표 / 박스와 구분하기 위해 이미지 가장자리 가까이까지 닿는
+    사각형만 페이지로 인정합니다.
+
+    Args:
+        proxy: grayscale proxy 이미지
+
+    Returns:
+        정렬된 꼭짓점 (4, 2) float32 또는 None (페이지가 보이지 않음)
+    """
+    blurred = cv2.GaussianBlur(proxy, (5, 5), 0)
+    edges = cv2.Canny(blurred, 50, 150)
+    edges = cv2.dilate(edges, np.ones((3, 3), np.uint8))
+
+    contours, _ = cv2.findContours(edges, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+    min_area = MIN_PAGE_AREA_RATIO * proxy.shape[0] * proxy.shape[1]
+    for contour in sorted(contours, key=cv2.contourArea, reverse=True)[:5]:
+        if cv2.contourArea(contour) < min_area:
+            break
+        perimeter = cv2.arcLength(contour, True)
+        approx = cv2.approxPolyDP(contour, 0.02 * perimeter, True)
+        if len(approx) == 4 and cv2.isContourConvex(approx):
+            corners = order_corners(approx)
+            if _reaches_borders(corners, proxy.shape):
+                return corners
+    return None
+
+
+def estimate_skew_angle(proxy: np.ndarray) -> float:
+    """
+    글자 픽셀의 최소 외접 사각형으로 기울기(도)를 추정합니다.
+
+    Args:
+        proxy: grayscale proxy 이미지
+
+    Returns:
+        이미지가 반시계 방향으로 기울어진 각도 (도). 추정할 수 없으면 0.0
+    """
+    _, binary = cv2.threshold(proxy, 0, 255, cv2.THRESH_BINARY_INV + cv2.THRESH_OTSU)
+    coords = cv2.findNonZero(binary)
+    if coords is None or len(coords) < 10:
+        return 0.0
+
+    (_, _), (width, height), angle = cv2.minAreaRect(coords)
+    # OpenCV 버전에 따라 각도 범위가 다르므로 [-45, 45)로 맞춤
+    if width < height:
+        angle -= 90
+    angle = (angle + 45) % 90 - 45
+    return -float(angle)
+
+
+def warp_to_page(image: np.ndarray, corners: np.ndarray) -> np.ndarray:
+    """
+    원본 해상도 꼭짓점으로 원근 보정하여 페이지만 잘라냅니다.
+
+    Args:
+        image: 원본 해상도 이미지
+        corners: 원본 좌표계의 정렬된 꼭짓점 (4, 2)
+
+    Returns:
+        보정된 페이지 이미지
+    """
+    top_left, top_right, bottom_right, bottom_left = corners
+    width = int(
+        round(
+            max(
+                np.linalg.norm(top_right - top_left),
+                np.linalg.norm(bottom_right - bottom_left),
+            )
+        )
+    )
+    height = int(
+        round(
+            max(
+                np.linalg.norm(bottom_left - top_left),
+                np.linalg.norm(bottom_right - top_right),
+            )
+        )
+    )
+    target = np.array(
+        [[0, 0], [width - 1, 0], [width - 1, height - 1], [0, height - 1]],
+        dtype=np.float32,
+    )
+    homography = cv2.getPerspectiveTransform(corners, target)
+    return cv2.warpPerspective(
+        image,
+        homography,
+        (width, height),
+        flags=cv2.INTER_LINEAR,
+        borderMode=cv2.BORDER_REPLICATE,
+    )
+
+
+def rotate(image: np.ndarray, angle: float) -> np.ndarray:
+    """이미지를 중심 기준으로 angle(도, 반시계)만큼 회전합니다 (크기 유지)."""
+    height, width = image.shape[:2]
+    matrix = cv2.getRotationMatrix2D((width / 2, height / 2), angle, 1.0)
+    return cv2.warpAffine(
+        image,
+        matrix,
+        (width, height),
+        flags=cv2.INTER_LINEAR,
+        borderMode=cv2.BORDER_REPLICATE,
+    )
+
+
+def correct_document_geometry(image: np.ndarray) -> Tuple[np.ndarray, dict]:
+    """
+    페이지 경계 검출 → 원근 보정, 없으면 기울기 보정.
+
+    추정은 proxy에서, 변환은 원본 해상도 이미지에 한 번만 수행합니다.
+
+    Args:
+        image: RGB 또는 Grayscale 이미지
+
+    Returns:
+        (보정된 이미지 - 보정할 것이 없으면 입력 그대로, 보정 정보)
+    """
+    proxy, ratio = build_proxy(image)
+    info = {
+        "page_detected": False,
+        "perspective_corrected": False,
+        "skew_angle": 0.0,
+        "proxy_width": proxy.shape[1],
+        "proxy_height": proxy.shape[0],
+    }
+
+    corners = detect_page_corners(proxy)
+    if corners is not None:
+        info["page_detected"] = True
+        info["perspective_corrected"] = True
+        return warp_to_page(image, corners * ratio), info
+
+    angle = estimate_skew_angle(proxy)
+    if MIN_SKEW_ANGLE <= abs(angle) <= MAX_SKEW_ANGLE:
+        info["skew_angle"] = angle
+        return rotate(image, -angle), info
+
+    return image, info
@@ -5,20 +5,35 @@
 구조:
 - HandwritingRemover: 추상 인터페이스
 - ThresholdBasedRemover (Level 1): Grayscale + Adaptive Threshold
-- MorphologyBasedRemover (Level 2): 형태 기반 분리 (미래 구현)
-- AIBasedRemover (Level 3): AI 기반 inpainting (미래 구현)
+- MorphologyBasedRemover (Level 2): 연결 요소 형태 분석 기반 분리
+- AIBasedRemover (Level 3): ONNX segmentation / inpainting 모델 (CPU 추론)
+- CascadeRemover: Level 1부터 실행하고 결과 품질이 나쁠 때만 다음 단계로
 """
 
+import math
+import time
 from abc import ABC, abstractmethod
-from typing import Union
+from pathlib import Path
+from typing import List, Optional, Tuple, Union
 import numpy as np
 from PIL import Image
 import cv2
 
+from analyze.inference import (
+    InferenceBackend,
+    InferenceError,
+    load_model,
+    predict_tiled,
+)
+
 
 class HandwritingRemover(ABC):
     """필기 제거 전략 추상 클래스."""
 
+    # remove()에 넘길 이미지 표현 ("bgr" 또는 "gray")
+    # Grayscale만 쓰는 remover는 "gray"로 지정해 BGR 변환을 건너뜀
+    input_plane = "bgr"
+
     @abstractmethod
     def remove(self, image: np.ndarray) -> np.ndarray:
         """
@@ -42,9 +57,55 @@ class HandwritingRemover(ABC):
         """처리 신뢰도 반환 (0.0 ~ 1.0)."""
         pass
 
+    def get_config(self) -> dict:
+        """
+        결과에 영향을 주는 파라미터 (분석 결과 캐시 키에 사용).
+
+        기본 구현은 방법 이름과 단순 값(숫자, 문자열 등) 속성을 모읍니다.
+        """
+        params = {
+            key: value
+            for key, value in vars(self).items()
+            if not key.startswith("_")
+            and isinstance(value, (int, float, str, bool, type(None)))
+        }
+        return {"method": self.get_method_name(), **params}
+
+    def remove_with_info(self, image: np.ndarray) -> Tuple[np.ndarray, dict]:
+        """
+        필기를 제거하고 실제로 사용한 방법 정보를 함께 반환합니다.
+
+        결과마다 방법이 달라지는 remover(CascadeRemover)는 이 메서드를
+        재정의합니다. 인스턴스 상태에 남기지 않으므로 여러 분석이 같은
+        remover를 동시에 써도 안전합니다.
+
+        Returns:
+            (필기가 제거된 이미지, {"method", "confidence"})
+        """
+        return self.remove(image), {
+            "method": self.get_method_name(),
+            "confidence": self.get_confidence(),
+        }
+
 
 class ThresholdBasedRemover(HandwritingRemover):
-    """Level 1: Grayscale + Adaptive Threshold 기반 필기 제거."""
+    """Level 1: Grayscale + Adaptive Threshold 기반 필기 제거.
+
+    Hot path는 중간 배열을 새로 만들지 않습니다.
+    - Grayscale 입력은 복사하지 않고 그대로 읽음 (입력은 수정하지 않음)
+    - threshold 결과 버퍼 하나에 opening / 반전을 in-place로 적용
+    - structuring element는 인스턴스에 캐시
+
+    메모리 상한 (Grayscale 입력 기준): 결과 1 B/px + OpenCV 내부
+    adaptiveThreshold 임시 버퍼 1 B/px → MP당 약 2 MB.
+    BGR 입력이면 Grayscale 변환 1 B/px이 추가되고, `out`으로 결과 버퍼를
+    넘기면 결과 할당 1 B/px이 빠집니다.
+    """
+
+    input_plane = "gray"
+
+    # Grayscale 입력 기준 픽셀당 최대 추가 메모리 (bytes, 위 설명 참고)
+    PEAK_BYTES_PER_PIXEL = 2
 
     def __init__(
         self,
@@ -61,8 +122,19 @@ class ThresholdBasedRemover(HandwritingRemover):
         self.threshold_block_size = threshold_block_size
         self.threshold_c = threshold_c
         self.noise_kernel_size = noise_kernel_size
-
-    def remove(self, image: np.ndarray) -> np.ndarray:
+        self._kernel: Optional[np.ndarray] = None
+
+    @property
+    def kernel(self) -> np.ndarray:
+        """Noise removal용 structuring element (크기가 바뀌면 다시 생성)."""
+        kernel = self._kernel
+        size = self.noise_kernel_size
+        if kernel is None or kernel.shape != (size, size):
+            kernel = cv2.getStructuringElement(cv2.MORPH_RECT, (size, size))
+            self._kernel = kernel
+        return kernel
+
+    def remove(self, image: np.ndarray, out: Optional[np.ndarray] = None) -> np.ndarray:
         """
         Grayscale + Adaptive Threshold 기반 필기 제거.
 
@@ -70,12 +142,20 @@ class ThresholdBasedRemover(HandwritingRemover):
         1. Grayscale 변환 (연필은 흐려지고 인쇄 텍스트는 선명해짐)
         2. Adaptive Threshold (인쇄 텍스트 → 검정, 연필 → 흰색으로 제거)
         3. Noise Removal (작은 노이즈 제거)
+
+        Args:
+            image: BGR 또는 Grayscale numpy array (수정하지 않음)
+            out: 결과를 쓸 uint8 버퍼 (입력과 같은 height x width, 선택).
+                 반복 호출 시 재사용하면 호출당 할당이 없어짐
+
+        Returns:
+            필기가 제거된 Grayscale 이미지 (out을 넘겼으면 out)
         """
-        # 1. Grayscale 변환
-        if len(image.shape) == 3:
+        # 1. Grayscale 변환 (이미 Grayscale이면 복사 없이 사용)
+        if image.ndim == 3:
             gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
         else:
-            gray = image.copy()
+            gray = image
 
         # 2. Adaptive Threshold
         # 인쇄 텍스트 → 검정 (진하고 굵음)
@@ -87,16 +167,14 @@ class ThresholdBasedRemover(HandwritingRemover):
             thresholdType=cv2.THRESH_BINARY_INV,
             blockSize=self.threshold_block_size,
             C=self.threshold_c,
+            dst=out,
         )
 
-        # 3. Noise Removal
-        kernel = np.ones((self.noise_kernel_size, self.noise_kernel_size), np.uint8)
-        cleaned = cv2.morphologyEx(binary, cv2.MORPH_OPEN, kernel)
+        # 3. Noise Removal (같은 버퍼에서 in-place)
+        cv2.morphologyEx(binary, cv2.MORPH_OPEN, self.kernel, dst=binary)
 
         # 다시 원래 형태로 변환 (검정 텍스트, 흰색 배경)
-        result = cv2.bitwise_not(cleaned)
-
-        return result
+        return cv2.bitwise_not(binary, dst=binary)
 
     def get_method_name(self) -> str:
         """방법 이름 반환."""
@@ -107,78 +185,649 @@ class ThresholdBasedRemover(HandwritingRemover):
         return 0.7
 
 
+def component_features(
+    binary: np.ndarray, gray: np.ndarray, bgr: Optional[np.ndarray] = None
+) -> dict:
+    """
+    전경(잉크) 연결 요소별 형태 / 색 특징을 한 번에 계산합니다.
+
+    요소마다 Python loop를 돌지 않고, 전경 픽셀의 label을 index로
+    `np.bincount`에 넘겨 모든 요소의 합계를 동시에 구합니다.
+
+    Args:
+        binary: 전경이 255인 이진 이미지 (uint8)
+        gray: Grayscale 이미지
+        bgr: BGR 이미지 (있으면 채도 특징 계산)
+
+    Returns:
+        {"count", "labels", "stats",
+         "foreground": 전경 픽셀 flat index, "foreground_labels",
+         "pixel_saturation": 전경 픽셀별 채도,
+         label별 배열 "area", "intensity", "saturation", "width_mean",
+         "width_cv", "elongation", "slant", "curvature"}.
+        label별 배열의 index 0은 배경
+    """
+    count, labels, stats, _ = cv2.connectedComponentsWithStats(binary, connectivity=8)
+    width = binary.shape[1]
+    fg = np.flatnonzero(binary)
+    fg_labels = labels.ravel()[fg]
+
+    area = np.bincount(fg_labels, minlength=count).astype(np.float64)
+    safe_area = np.maximum(area, 1)
+
+    def mean(values: np.ndarray) -> np.ndarray:
+        return np.bincount(fg_labels, values, count) / safe_area
+
+    # 잉크 진하기 (인쇄 텍스트는 진하고 연필은 옅음)
+    intensity = mean(gray.ravel()[fg])
+
+    # 채도 (색연필). 전경 픽셀에 대해서만 계산
+    if bgr is not None and bgr.ndim == 3:
+        pixel_saturation = _saturation(bgr.reshape(-1, 3)[fg])
+    else:
+        pixel_saturation = np.zeros(len(fg), dtype=np.float32)
+    saturation = mean(pixel_saturation)
+
+    # 획 두께: distance transform의 능선(ridge, 중심선 근사) 값 x 2
+    # 인쇄 글자는 두께가 일정하고, 필압이 바뀌는 손글씨는 두께 편차가 큼
+    dist = cv2.distanceTransform(binary, cv2.DIST_L2, 3)
+    ridge = np.flatnonzero(
+        (dist >= cv2.dilate(dist, np.ones((3, 3), np.uint8))).ravel()
+        & (binary.ravel() > 0)
+    )
+    ridge_labels = labels.ravel()[ridge]
+    stroke = 2 * dist.ravel()[ridge]
+    ridge_count = np.bincount(ridge_labels, minlength=count).astype(np.float64)
+    safe_ridge = np.maximum(ridge_count, 1)
+    width_mean = np.bincount(ridge_labels, stroke, count) / safe_ridge
+    width_var = np.bincount(ridge_labels, stroke * stroke, count) / safe_ridge
+    width_var = np.maximum(width_var - width_mean**2, 0)
+    width_cv = np.sqrt(width_var) / np.maximum(width_mean, 1e-6)
+
+    # 방향: 2차 중심 moment (공분산) → 주축 각도와 길쭉함
+    ys, xs = np.divmod(fg, width)
+    xs = xs.astype(np.float64)
+    ys = ys.astype(np.float64)
+    cx = mean(xs)
+    cy = mean(ys)
+    mu20 = mean(xs * xs) - cx**2
+    mu02 = mean(ys * ys) - cy**2
+    mu11 = mean(xs * ys) - cx * cy
+    half_trace = (mu20 + mu02) / 2
+    spread = np.sqrt(((mu20 - mu02) / 2) ** 2 + mu11**2)
+    major = half_trace + spread
+    minor = np.maximum(half_trace - spread, 1e-6)
+    elongation = np.sqrt(major / minor)
+    angle = 0.5 * np.degrees(np.arctan2(2 * mu11, mu20 - mu02))
+    # 수평 / 수직 축에서 벗어난 정도 (0 ~ 45도)
+    slant = np.abs((angle + 45) % 90 - 45)
+
+    # 곡률: 중심선 길이 / bounding box 대각선 (직선이면 ~1, 구불구불할수록 큼)
+    diagonal = np.hypot(stats[:, cv2.CC_STAT_WIDTH], stats[:, cv2.CC_STAT_HEIGHT])
+    curvature = ridge_count / np.maximum(diagonal, 1)
+
+    return {
+        "count": count,
+        "labels": labels,
+        "stats": stats,
+        "foreground": fg,
+        "foreground_labels": fg_labels,
+        "pixel_saturation": pixel_saturation,
+        "area": area,
+        "intensity": intensity,
+        "saturation": saturation,
+        "width_mean": width_mean,
+        "width_cv": width_cv,
+        "elongation": elongation,
+        "slant": slant,
+        "curvature": curvature,
+    }
+
+
 class MorphologyBasedRemover(HandwritingRemover):
-    """Level 2: 형태 기반 필기 제거 (미래 구현).
+    """Level 2: 연결 요소 형태 분석 기반 필기 제거.
+
+    잉크를 이진화한 뒤 연결 요소마다 특징을 계산하여 손글씨를 골라냅니다.
+    - 인쇄 텍스트: 진하고 무채색, 일정한 두께, 수평/수직 정렬
+    - 필기: 옅거나(연필) 채도가 있고(색연필), 두께 불균일, 기울어짐, 곡선 많음
 
-    아이디어:
-    - 인쇄 텍스트: 일정한 두께, 일정한 폰트, 수평 정렬
-    - 필기: 선 두께 불균일, 기울어짐, 곡선 많음
-    → 형태적 특징으로 필기 제거
+    손글씨가 인쇄 글자 위를 지나가면 둘이 하나의 요소로 붙으므로,
+    필기로 분류된 요소 안에서도 진한 무채색 픽셀(인쇄 잉크)은 남깁니다.
+
+    큰 사진은 요소 분석을 0.8MP 이하의 proxy에서 하고(요소 수와 특징이
+    해상도에 덜 민감해짐), 결과 mask를 원본 해상도 이진화에 적용합니다.
     """
 
-    def __init__(self):
-        """형태 기반 remover 초기화."""
-        # TODO: Level 2 구현 시 파라미터 추가
-        pass
+    def __init__(
+        self,
+        threshold_block_size: int = 11,
+        threshold_c: int = 8,
+        analysis_max_pixels: int = 800_000,
+        min_area: int = 12,
+        ink_threshold: int = 130,
+        dark_threshold: int = 100,
+        saturation_threshold: int = 60,
+        width_cv_threshold: float = 0.3,
+        elongation_threshold: float = 3.0,
+        slant_threshold: float = 10.0,
+        curvature_threshold: float = 2.5,
+    ):
+        """
+        Args:
+            threshold_block_size: 잉크 이진화 Adaptive threshold 블록 크기 (홀수)
+            threshold_c: Adaptive threshold 상수 (센서 노이즈가 잉크로 잡히지 않을 만큼)
+            analysis_max_pixels: 요소 분석 proxy의 최대 픽셀 수
+                                 (이보다 큰 이미지는 1/2씩 축소해서 분류)
+            min_area: 이보다 작은 요소는 노이즈로 제거 (proxy 픽셀)
+            ink_threshold: 평균 밝기가 이보다 밝은 요소는 연필로 분류
+            dark_threshold: 필기 요소 안에서도 이보다 어두운 무채색 픽셀은 유지
+            saturation_threshold: 평균 채도가 이보다 큰 요소는 색연필로 분류
+            width_cv_threshold: 획 두께 변동계수(표준편차/평균) 상한
+            elongation_threshold: 길쭉함(주축/부축) 기준
+            slant_threshold: 길쭉한 요소가 축에서 이 각도(도) 이상 기울면 필기
+            curvature_threshold: 중심선 길이 / 대각선 비율 상한
+        """
+        self.threshold_block_size = threshold_block_size
+        self.threshold_c = threshold_c
+        self.analysis_max_pixels = analysis_max_pixels
+        self.min_area = min_area
+        self.ink_threshold = ink_threshold
+        self.dark_threshold = dark_threshold
+        self.saturation_threshold = saturation_threshold
+        self.width_cv_threshold = width_cv_threshold
+        self.elongation_threshold = elongation_threshold
+        self.slant_threshold = slant_threshold
+        self.curvature_threshold = curvature_threshold
 
     def remove(self, image: np.ndarray) -> np.ndarray:
         """
-        형태 기반 필기 제거 (미래 구현).
+        연결 요소 형태 분석 기반 필기 제거.
+
+        처리 흐름:
+        1. 분석용 proxy (최대 analysis_max_pixels)에서 잉크 이진화
+        2. 연결 요소별 특징 계산 (component_features) → 인쇄 텍스트 mask
+        3. 원본 해상도 잉크 이진화 결과에 mask를 적용
+        """
+        if image.ndim == 3:
+            bgr = image
+            gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+        else:
+            bgr = None
+            gray = image
+
+        height, width = gray.shape
+        if height * width <= self.analysis_max_pixels:
+            return cv2.bitwise_not(self._printed_mask(gray, bgr))
+
+        # 요소 분석은 proxy에서, 잉크 모양은 원본 해상도에서
+        small, factor = _halve_to(
+            bgr if bgr is not None else gray, self.analysis_max_pixels
+        )
+        if bgr is not None:
+            small_bgr = small
+            small_gray = cv2.cvtColor(small, cv2.COLOR_BGR2GRAY)
+        else:
+            small_bgr = None
+            small_gray = small
+        mask = self._printed_mask(small_gray, small_bgr)
+        # proxy 1픽셀 경계 오차를 덮도록 살짝 넓혀서 원본 크기로
+        mask = cv2.dilate(mask, np.ones((3, 3), np.uint8))
+        mask = cv2.resize(mask, (width, height), interpolation=cv2.INTER_NEAREST)
+
+        ink = self._binarize(gray, self.threshold_block_size * factor | 1)
+        cv2.bitwise_and(ink, mask, dst=ink)
+        return cv2.bitwise_not(ink, dst=ink)
+
+    def _binarize(self, gray: np.ndarray, block_size: int) -> np.ndarray:
+        """잉크(인쇄 + 필기)를 255로 이진화합니다 (box filter라 블록 크기와 무관한 속도)."""
+        return cv2.adaptiveThreshold(
+            gray,
+            maxValue=255,
+            adaptiveMethod=cv2.ADAPTIVE_THRESH_MEAN_C,
+            thresholdType=cv2.THRESH_BINARY_INV,
+            blockSize=block_size,
+            C=self.threshold_c,
+        )
+
+    def _printed_mask(self, gray: np.ndarray, bgr: Optional[np.ndarray]) -> np.ndarray:
+        """인쇄 텍스트 픽셀이 255인 mask (분석 해상도)."""
+        binary = self._binarize(gray, self.threshold_block_size)
+        features = component_features(binary, gray, bgr)
+        printed = self.classify(features)
+        large = features["area"] >= self.min_area
+
+        # label별 판정을 전경 픽셀로 펼침 (배경 픽셀은 볼 필요 없음)
+        fg = features["foreground"]
+        fg_labels = features["foreground_labels"]
+        keep = printed[fg_labels]
+
+        # 필기와 붙은 인쇄 글자 복원: 노이즈가 아닌 요소의 진한 무채색 픽셀
+        keep |= (
+            large[fg_labels]
+            & (gray.ravel()[fg] < self.dark_threshold)
+            & (features["pixel_saturation"] < self.saturation_threshold)
+        )
+
+        mask = np.zeros(gray.shape, dtype=np.uint8)
+        mask.ravel()[fg[keep]] = 255
+        return mask
+
+    def classify(self, features: dict) -> np.ndarray:
+        """
+        연결 요소를 인쇄 텍스트 / 필기로 분류합니다 (모든 요소를 한 번에).
 
-        TODO: 구현 예정
-        - 선 두께 분석
-        - 기울기 분석
-        - 곡률 분석
-        - 인쇄 텍스트 특징 추출
+        Args:
+            features: component_features 결과
+
+        Returns:
+            label별 인쇄 텍스트 여부 (bool 배열, 배경과 노이즈는 False)
         """
-        # 현재는 Level 1 방식으로 fallback
-        fallback = ThresholdBasedRemover()
-        return fallback.remove(image)
+        pencil = features["intensity"] > self.ink_threshold
+        colored = features["saturation"] > self.saturation_threshold
+        uneven = features["width_cv"] > self.width_cv_threshold
+        slanted = (features["elongation"] > self.elongation_threshold) & (
+            features["slant"] > self.slant_threshold
+        )
+        curved = features["curvature"] > self.curvature_threshold
+        handwriting = pencil | colored | uneven | slanted | curved
+
+        printed = ~handwriting & (features["area"] >= self.min_area)
+        printed[0] = False
+        return printed
 
     def get_method_name(self) -> str:
         """방법 이름 반환."""
         return "morphology_based"
 
     def get_confidence(self) -> float:
-        """신뢰도 반환 (아직 구현되지 않음)."""
-        return 0.0
+        """신뢰도 반환."""
+        return 0.8
+
+
+def _halve_to(image: np.ndarray, max_pixels: int) -> Tuple[np.ndarray, int]:
+    """
+    max_pixels 이하가 될 때까지 1/2 INTER_AREA 축소를 반복합니다.
+
+    (임의 배율 INTER_AREA보다 훨씬 빠름)
+
+    Returns:
+        (축소된 이미지, 축소 배율)
+    """
+    factor = 1
+    while image.shape[0] * image.shape[1] > max_pixels:
+        size = (image.shape[1] // 2, image.shape[0] // 2)
+        image = cv2.resize(image, size, interpolation=cv2.INTER_AREA)
+        factor *= 2
+    return image, factor
+
+
+def detect_answer_regions(
+    image: np.ndarray,
+    max_regions: int = 3,
+    analysis_max_pixels: int = 800_000,
+    group_ratio: float = 0.02,
+    min_ink: int = 30,
+    max_region_ratio: float = 0.25,
+    remover: Optional["MorphologyBasedRemover"] = None,
+) -> List[dict]:
+    """
+    손글씨 답 후보 영역을 찾습니다 (답 OCR을 페이지 전체 대신 이 영역에만 실행).
+
+    Level 2 분류로 인쇄 텍스트를 뺀 나머지 잉크(연필 / 색연필 / 필기)를
+    가까운 획끼리 묶어 box로 만들고, 잉크가 많은 순서로 반환합니다.
+    분석은 proxy(최대 analysis_max_pixels)에서 하고 box는 원본 좌표로 변환합니다.
+
+    Args:
+        image: BGR 또는 Grayscale 이미지
+        max_regions: 반환할 최대 후보 수
+        analysis_max_pixels: 분석 proxy의 최대 픽셀 수
+        group_ratio: 획을 한 답으로 묶는 거리 (이미지 짧은 변 대비 비율)
+        min_ink: 후보로 인정할 최소 필기 잉크 픽셀 수 (proxy 기준)
+        max_region_ratio: box가 이미지 면적의 이 비율보다 크면 답이 아닌
+                          풀이 / 낙서로 보고 제외
+        remover: 인쇄 / 필기 분류에 쓸 MorphologyBasedRemover (None이면 기본값)
+
+    Returns:
+        [{"x", "y", "width", "height", "score": 필기 잉크 픽셀 수}, ...]
+        (score 내림차순)
+    """
+    remover = remover or MorphologyBasedRemover()
+    small, factor = _halve_to(image, analysis_max_pixels)
+    if small.ndim == 3:
+        small_bgr = small
+        small_gray = cv2.cvtColor(small, cv2.COLOR_BGR2GRAY)
+    else:
+        small_bgr = None
+        small_gray = small
+
+    # 필기 = 잉크 - 인쇄 텍스트 (인쇄 경계 1픽셀 오차는 넓혀서 제외)
+    ink = remover._binarize(small_gray, remover.threshold_block_size)
+    printed = cv2.dilate(
+        remover._printed_mask(small_gray, small_bgr), np.ones((3, 3), np.uint8)
+    )
+    handwriting = cv2.bitwise_and(ink, cv2.bitwise_not(printed))
+    # 노이즈 점 제거
+    handwriting = cv2.morphologyEx(
+        handwriting, cv2.MORPH_OPEN, np.ones((2, 2), np.uint8)
+    )
+
+    # 가까운 획을 하나의 답으로 묶음
+    height, width = small_gray.shape
+    reach = max(3, int(min(height, width) * group_ratio)) | 1
+    grouped = cv2.dilate(handwriting, np.ones((reach, reach), np.uint8))
+    count, labels, stats, _ = cv2.connectedComponentsWithStats(grouped, connectivity=8)
+    score = np.bincount(labels.ravel()[np.flatnonzero(handwriting)], minlength=count)
+    score[0] = 0
+    box_area = stats[:, cv2.CC_STAT_WIDTH] * stats[:, cv2.CC_STAT_HEIGHT]
+    score[box_area > max_region_ratio * height * width] = 0
+
+    regions = []
+    for label in np.argsort(score, kind="stable")[::-1][:max_regions]:
+        if score[label] < min_ink:
+            break
+        x, y, w, h = stats[label, :4]
+        # dilate로 넓어진 만큼은 여백으로 남겨 둠
+        x0, y0 = x * factor, y * factor
+        x1 = min((x + w) * factor, image.shape[1])
+        y1 = min((y + h) * factor, image.shape[0])
+        regions.append(
+            {
+                "x": int(x0),
+                "y": int(y0),
+                "width": int(x1 - x0),
+                "height": int(y1 - y0),
+                "score": int(score[label]),
+            }
+        )
+    return regions
+
+
+def _saturation(pixels: np.ndarray) -> np.ndarray:
+    """(N, 3) 픽셀의 HSV 채도 (0~255). HSV 전체 변환 없이 max/min으로 계산."""
+    # axis=1 reduce보다 채널별 elementwise 비교가 훨씬 빠름
+    blue, green, red = pixels[:, 0], pixels[:, 1], pixels[:, 2]
+    high = np.maximum(np.maximum(blue, green), red).astype(np.float32)
+    low = np.minimum(np.minimum(blue, green), red)
+    return (high - low) * 255 / np.maximum(high, 1)
 
 
 class AIBasedRemover(HandwritingRemover):
-    """Level 3: AI 기반 필기 제거 (미래 구현).
+    """Level 3: ONNX 모델 기반 필기 제거 (CPU 추론).
+
+    모델 종류 (output):
+    - "mask": segmentation 모델. 출력은 필기 확률이며, Level 1 이진화
+      결과에서 필기로 판정된 픽셀을 지웁니다
+    - "image": inpainting / 복원 모델. 출력은 필기가 지워진 Grayscale (0~1)
 
-    아이디어:
-    - Diffusion 기반 inpainting
-    - Vision-language 모델로 "문제 복원"
+    모델은 프로세스마다 한 번만 로드합니다 (analyze.inference.load_model).
+    remover 인스턴스는 경로와 설정만 가지므로 process executor로 보내도
+    세션이 pickle되지 않고, 각 worker가 처음 쓸 때 직접 로드합니다.
+    모델이 없거나 로드할 수 없으면 Level 2(MorphologyBasedRemover)로 fallback.
     """
 
-    def __init__(self, model_path: str = None):
+    def __init__(
+        self,
+        model_path: str = None,
+        output: str = "mask",
+        threads: Optional[int] = None,
+        backend: Optional[str] = None,
+        tile_size: int = 256,
+        overlap: int = 16,
+        batch_size: int = 8,
+        mask_threshold: float = 0.5,
+        fp16: bool = False,
+    ):
         """
         Args:
-            model_path: AI 모델 경로 (미래 구현)
+            model_path: ONNX 모델 경로 (int8 / fp16 양자화 모델 가능)
+            output: 모델 출력 종류 ("mask" 또는 "image")
+            threads: 추론 thread 수 (None이면 backend 기본값)
+            backend: "onnxruntime" / "opencv" / None (onnxruntime 우선)
+            tile_size: 추론 tile 크기 (모델 입력이 고정 크기면 무시)
+            overlap: tile 경계 이음새 방지용 겹침 폭
+            batch_size: 한 번에 추론할 tile 수
+            mask_threshold: 필기로 판정할 확률 ("mask" 모델)
+            fp16: OpenCV backend에서 CPU fp16 target 사용
         """
+        if output not in ("mask", "image"):
+            raise ValueError(f"Invalid output: {output}. Must be 'mask' or 'image'")
         self.model_path = model_path
-        # TODO: Level 3 구현 시 모델 로드
+        self.output = output
+        self.threads = threads
+        self.backend = backend
+        self.tile_size = tile_size
+        self.overlap = overlap
+        self.batch_size = batch_size
+        self.mask_threshold = mask_threshold
+        self.fp16 = fp16
+        self._fallback = MorphologyBasedRemover()
+
+    def is_available(self) -> bool:
+        """모델 파일이 있는지 여부 (없으면 fallback으로 동작)."""
+        return self.model_path is not None and Path(self.model_path).is_file()
+
+    def get_model(self) -> InferenceBackend:
+        """이 프로세스에 로드된 모델을 반환합니다 (처음 호출 시 로드)."""
+        return load_model(self.model_path, self.threads, self.backend, self.fp16)
+
+    def _load_model(self) -> Optional[InferenceBackend]:
+        """모델을 반환합니다 (파일이 없거나 로드할 수 없으면 None → fallback)."""
+        if not self.is_available():
+            return None
+        try:
+            return self.get_model()
+        except InferenceError:
+            return None
 
     def remove(self, image: np.ndarray) -> np.ndarray:
         """
-        AI 기반 필기 제거 (미래 구현).
+        tile 단위 batch 추론으로 필기를 제거합니다.
 
-        TODO: 구현 예정
-        - Diffusion inpainting
-        - Vision-language 모델 사용
+        처리 흐름:
+        1. 모델 입력 표현(Grayscale 또는 RGB, 0~1)으로 변환
+        2. 겹치는 tile로 나눠 batch 추론 후 이어 붙임 (predict_tiled)
+        3. "mask": Level 1 결과에서 필기 픽셀을 흰색으로 / "image": 그대로 사용
         """
-        # 현재는 Level 1 방식으로 fallback
-        fallback = ThresholdBasedRemover()
-        return fallback.remove(image)
+        model = self._load_model()
+        if model is None:
+            return self._fallback.remove(image)
+
+        gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY) if image.ndim == 3 else image
+        if model.channels == 3:
+            if image.ndim == 3:
+                source = cv2.cvtColor(image, cv2.COLOR_BGR2RGB)
+            else:
+                source = cv2.cvtColor(image, cv2.COLOR_GRAY2RGB)
+        else:
+            source = gray
+        prediction = predict_tiled(
+            source.astype(np.float32) / 255,
+            model,
+            tile_size=self.tile_size,
+            overlap=self.overlap,
+            batch_size=self.batch_size,
+        )
+
+        if self.output == "image":
+            return np.clip(prediction * 255 + 0.5, 0, 255).astype(np.uint8)
+
+        result = ThresholdBasedRemover().remove(gray)
+        result[prediction > self.mask_threshold] = 255
+        return result
 
     def get_method_name(self) -> str:
         """방법 이름 반환."""
         return "ai_based"
 
     def get_confidence(self) -> float:
-        """신뢰도 반환 (아직 구현되지 않음)."""
-        return 0.0
+        """신뢰도 반환 (모델이 없거나 로드할 수 없으면 fallback의 신뢰도)."""
+        if self._load_model() is None:
+            return self._fallback.get_confidence()
+        return 0.9
+
+
+def removal_statistics(result: np.ndarray, max_pixels: int = 1_000_000) -> dict:
+    """
+    필기 제거 결과의 품질 통계 (CascadeRemover의 단계 상승 판단용).
+
+    인쇄 글자는 크기가 비슷한 연결 요소로 남고, 지워지지 않은 필기는
+    글자보다 훨씬 길거나 큰 요소로 남는다는 점을 이용합니다.
+    큰 결과는 간격을 두고 샘플링(복사 없는 strided view)해서 계산합니다.
+
+    Args:
+        result: remover 결과 (검정 잉크, 흰 배경 Grayscale)
+        max_pixels: 통계 계산에 쓸 최대 픽셀 수
+
+    Returns:
+        {"ink_density": 잉크 픽셀 비율,
+         "large_ink_ratio": 글자 크기를 크게 벗어난 요소의 잉크 비율 (잔여 필기),
+         "speck_ratio": 아주 작은 요소(노이즈)의 비율,
+         "components": 연결 요소 수}
+    """
+    step = max(1, math.ceil((result.size / max_pixels) ** 0.5))
+    ink = (result[::step, ::step] < 128).view(np.uint8)
+    count, _, stats, _ = cv2.connectedComponentsWithStats(ink, connectivity=8)
+    area = stats[1:, cv2.CC_STAT_AREA].astype(np.float64)
+    height = stats[1:, cv2.CC_STAT_HEIGHT]
+    width = stats[1:, cv2.CC_STAT_WIDTH]
+    total = area.sum()
+    if total == 0:
+        return {
+            "ink_density": 0.0,
+            "large_ink_ratio": 0.0,
+            "speck_ratio": 0.0,
+            "components": 0,
+        }
+
+    # 글자 높이 기준: 노이즈를 뺀 요소 높이의 중앙값
+    speck = area < 8
+    glyph_height = np.median(height[~speck]) if (~speck).any() else 1.0
+    large = (height > 2.5 * glyph_height) | (width > 8 * glyph_height)
+    return {
+        "ink_density": float(total / ink.size),
+        "large_ink_ratio": float(area[large].sum() / total),
+        "speck_ratio": float(speck.mean()),
+        "components": int(count - 1),
+    }
+
+
+class CascadeRemover(HandwritingRemover):
+    """싼 단계부터 실행하고, 결과 품질이 나쁠 때만 다음 단계로 올리는 remover.
+
+    기본 단계: Level 1 (Threshold) → Level 2 (Morphology) → Level 3 (AI, 모델이
+    있을 때만). 각 단계 결과에 removal_statistics를 계산하여 잔여 필기
+    (large_ink_ratio), 노이즈(speck_ratio), 잉크 밀도가 기준 이하이면 그
+    결과를 사용합니다. 마지막 단계 결과는 품질과 관계없이 사용합니다.
+    깨끗한 페이지는 대부분 Level 1에서 끝납니다.
+    """
+
+    def __init__(
+        self,
+        stages: Optional[List[HandwritingRemover]] = None,
+        ai_remover: Optional["AIBasedRemover"] = None,
+        max_large_ink_ratio: float = 0.05,
+        max_speck_ratio: float = 0.5,
+        max_ink_density: float = 0.2,
+    ):
+        """
+        Args:
+            stages: 실행 순서대로의 remover 목록 (None이면 기본 단계)
+            ai_remover: 기본 단계에 붙일 Level 3 remover (모델이 있을 때만 사용)
+            max_large_ink_ratio: 통과 기준 - 글자 크기를 벗어난 잉크 비율 상한
+            max_speck_ratio: 통과 기준 - 노이즈 요소 비율 상한
+            max_ink_density: 통과 기준 - 잉크 픽셀 비율 상한
+        """
+        if stages is None:
+            stages = [ThresholdBasedRemover(), MorphologyBasedRemover()]
+            if ai_remover is not None and ai_remover.is_available():
+                stages.append(ai_remover)
+        if not stages:
+            raise ValueError("CascadeRemover needs at least one stage")
+        self.stages = stages
+        self.max_large_ink_ratio = max_large_ink_ratio
+        self.max_speck_ratio = max_speck_ratio
+        self.max_ink_density = max_ink_density
+
+    @property
+    def input_plane(self) -> str:
+        # 첫 단계만 Grayscale이면 되더라도 상위 단계를 위해 BGR을 받음
+        if all(stage.input_plane == "gray" for stage in self.stages):
+            return "gray"
+        return "bgr"
+
+    def passes(self, statistics: dict) -> bool:
+        """품질 통계가 통과 기준을 만족하는지 여부."""
+        return (
+            statistics["large_ink_ratio"] <= self.max_large_ink_ratio
+            and statistics["speck_ratio"] <= self.max_speck_ratio
+            and statistics["ink_density"] <= self.max_ink_density
+        )
+
+    def remove(self, image: np.ndarray) -> np.ndarray:
+        """단계별로 실행하여 처음 품질 기준을 통과한 결과를 반환합니다."""
+        return self.remove_with_info(image)[0]
+
+    def remove_with_info(self, image: np.ndarray) -> Tuple[np.ndarray, dict]:
+        """
+        단계별로 실행하고 사용한 단계와 단계별 품질 통계를 함께 반환합니다.
+
+        Returns:
+            (결과 이미지, {"method": 사용한 단계 방법 이름, "confidence",
+             "stage": 사용한 단계 번호 (1부터), "escalated": 상위 단계 사용 여부,
+             "stages": [{"method", "statistics", "passed", "time"}, ...]})
+        """
+        gray = None
+        attempts = []
+        for number, stage in enumerate(self.stages, start=1):
+            stage_input = image
+            if stage.input_plane == "gray" and image.ndim == 3:
+                if gray is None:
+                    gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+                stage_input = gray
+
+            start = time.perf_counter()
+            result = stage.remove(stage_input)
+            elapsed = time.perf_counter() - start
+            statistics = removal_statistics(result)
+            passed = self.passes(statistics)
+            attempts.append(
+                {
+                    "method": stage.get_method_name(),
+                    "statistics": statistics,
+                    "passed": passed,
+                    "time": elapsed,
+                }
+            )
+            if passed or number == len(self.stages):
+                break
+
+        # 신뢰도: 단계 자체의 신뢰도를 잔여 필기 비율만큼 낮춤
+        confidence = stage.get_confidence() * (1 - statistics["large_ink_ratio"])
+        return result, {
+            "method": stage.get_method_name(),
+            "confidence": round(confidence, 3),
+            "stage": number,
+            "escalated": number > 1,
+            "stages": attempts,
+        }
+
+    def get_method_name(self) -> str:
+        """방법 이름 반환."""
+        return "cascade"
+
+    def get_confidence(self) -> float:
+        """신뢰도 반환 (실제 값은 결과마다 remove_with_info로 계산)."""
+        return self.stages[0].get_confidence()
+
+    def get_config(self) -> dict:
+        """단계별 설정과 통과 기준."""
+        return {
+            "method": self.get_method_name(),
+            "stages": [stage.get_config() for stage in self.stages],
+            "max_large_ink_ratio": self.max_large_ink_ratio,
+            "max_speck_ratio": self.max_speck_ratio,
+            "max_ink_density": self.max_ink_density,
+        }
 
 
 # 편의 함수들 (하위 호환성 유지)
@@ -202,17 +851,18 @@ def remove_handwriting(
     Returns:
         필기가 제거된 이미지 (numpy array, uint8, 0-255)
     """
-    # 이미지 로드
+    # 이미지 로드 (ThresholdBasedRemover는 Grayscale만 쓰므로 바로 Grayscale로 디코딩)
     if isinstance(image_path, (str, bytes)):
         if isinstance(image_path, str):
-            img = cv2.imread(image_path)
+            img = cv2.imread(image_path, cv2.IMREAD_GRAYSCALE)
         else:
             nparr = np.frombuffer(image_path, np.uint8)
-            img = cv2.imdecode(nparr, cv2.IMREAD_COLOR)
+            img = cv2.imdecode(nparr, cv2.IMREAD_GRAYSCALE)
         if img is None:
             raise ValueError(f"Failed to load image: {image_path}")
     elif isinstance(image_path, np.ndarray):
-        img = image_path.copy()
+        # remover는 입력을 수정하지 않으므로 복사하지 않음
+        img = image_path
     else:
         raise TypeError(
             f"Unsupported image type: {type(image_path)}. "
@@ -242,17 +892,21 @@ def remove_handwriting_from_pil(
     Returns:
         필기가 제거된 PIL Image
     """
-    # PIL Image를 numpy array로 변환
-    img_array = np.array(image)
-
-    # BGR로 변환 (PIL은 RGB, OpenCV는 BGR)
-    if len(img_array.shape) == 3:
-        img_array = cv2.cvtColor(img_array, cv2.COLOR_RGB2BGR)
-
     # Remover 선택
     if remover is None:
         remover = ThresholdBasedRemover(**kwargs)
 
+    # PIL Image를 numpy array로 변환 (복사 없이)
+    img_array = np.asarray(image)
+
+    # remover 입력 표현으로 변환 (PIL은 RGB, OpenCV는 BGR)
+    # Grayscale remover면 RGB → Gray 한 번으로 끝냄 (RGB → BGR → Gray 생략)
+    if img_array.ndim == 3:
+        if remover.input_plane == "gray":
+            img_array = cv2.cvtColor(img_array, cv2.COLOR_RGB2GRAY)
+        else:
+            img_array = cv2.cvtColor(img_array, cv2.COLOR_RGB2BGR)
+
     # 필기 제거
     result_array = remover.remove(img_array)
 
@@ -286,8 +940,24 @@ def preprocess_for_ocr(image: Image.Image) -> Image.Image:
     if len(img_array.shape) == 3:
         gray = cv2.cvtColor(img_array, cv2.COLOR_RGB2GRAY)
     else:
-        gray = img_array.copy()
+        gray = img_array
+
+    # numpy array를 PIL Image로 변환
+    return Image.fromarray(preprocess_gray_for_ocr(gray))
 
+
+def preprocess_gray_for_ocr(gray: np.ndarray) -> np.ndarray:
+    """
+    Grayscale 배열에 OCR 전처리를 적용합니다.
+
+    preprocess_for_ocr의 2~4단계 (이미 Grayscale인 공유 버퍼용).
+
+    Args:
+        gray: Grayscale numpy array (uint8)
+
+    Returns:
+        이진화된 numpy array (uint8)
+    """
     # 2. 색상 반전 (검정 텍스트 → 흰색 배경으로)
     inverted = cv2.bitwise_not(gray)
 
@@ -305,7 +975,4 @@ def preprocess_for_ocr(image: Image.Image) -> Image.Image:
         C=2,
     )
 
-    # numpy array를 PIL Image로 변환
-    result_image = Image.fromarray(binary)
-
-    return result_image
+    return binary
@@ -13,6 +13,9 @@ from analyze.models import PipelineContext, AnalyzeResult, AnswerResult
 class PostprocessStep(PipelineStep):
     """후처리 단계 - 최종 결과 정리 및 포맷팅."""
 
+    inputs = ("extracted_problem", "extracted_answer")
+    outputs = ("postprocessed",)
+
     async def execute(self, context: PipelineContext) -> PipelineContext:
         """
         모든 단계의 결과를 종합하여 최종 결과 생성.
@@ -7,19 +7,224 @@
 - 해상도 정규화
 """
 
+import asyncio
+import math
+import uuid
+from pathlib import Path
+from typing import Optional, Tuple
+
+import numpy as np
+from PIL import Image, ImageOps, UnidentifiedImageError
+
 from analyze.base import PipelineStep
+from analyze.image_buffer import ImageBuffer, image_to_array
 from analyze.models import PipelineContext
+from analyze.steps.geometry import correct_document_geometry
+from services.file_storage import derived_path, register_file
+
+# 기본 최대 픽셀 수 (약 4MP, A4 한 장을 250dpi 정도로 볼 수 있는 크기)
+DEFAULT_MAX_PIXELS = 4_000_000
+
+# EXIF orientation 태그
+_EXIF_ORIENTATION = 0x0112
+
+# 보정한 이미지를 파일로 남길 때의 PNG 압축 수준 (무손실, 빠른 압축)
+_PNG_COMPRESS_LEVEL = 1
+
+
+def _scale_factor(
+    size: Tuple[int, int],
+    dpi: Optional[float],
+    max_pixels: Optional[int],
+    target_dpi: Optional[int],
+) -> float:
+    """축소 비율을 계산합니다 (확대는 하지 않음, 1.0이면 그대로)."""
+    width, height = size
+    scale = 1.0
+    if max_pixels and width * height > max_pixels:
+        scale = min(scale, math.sqrt(max_pixels / (width * height)))
+    if target_dpi and dpi and dpi > target_dpi:
+        scale = min(scale, target_dpi / dpi)
+    return scale
+
+
+def _normalize_image(
+    file_path: str,
+    max_pixels: Optional[int],
+    target_dpi: Optional[int],
+    correct_geometry: bool,
+) -> Tuple[dict, Optional[np.ndarray], bool]:
+    """
+    EXIF 회전 적용, 해상도 제한, 문서 기하 보정을 합니다 (executor에서 실행).
+
+    JPEG는 draft 모드로 1/2, 1/4, 1/8 크기로 바로 디코딩한 뒤
+    남은 비율만 resize 합니다 (원본 크기로 디코딩하지 않음).
+    기하 보정을 하지 않고 바꿀 것도 없으면 header만 읽고 디코딩하지 않습니다.
+
+    Returns:
+        (결과 정보, 디코딩된 배열 또는 None, 원본과 달라졌는지 여부)
+    """
+    try:
+        img = Image.open(file_path)
+    except UnidentifiedImageError as e:
+        raise ValueError(f"Invalid image file: {file_path}") from e
+
+    with img:
+        original_size = img.size
+        orientation = img.getexif().get(_EXIF_ORIENTATION, 1)
+        dpi = img.info.get("dpi", (None, None))[0]
+        scale = _scale_factor(original_size, dpi, max_pixels, target_dpi)
+
+        info = {
+            "original_width": original_size[0],
+            "original_height": original_size[1],
+            "scale": scale,
+            "rotation_corrected": orientation != 1,
+            "resolution_normalized": scale < 1.0,
+            "draft_decoded": False,
+        }
+        changed = orientation != 1 or scale < 1.0
+        if not changed and not correct_geometry:
+            info["width"], info["height"] = original_size
+            return info, None, False
+
+        target_size = (
+            max(1, round(original_size[0] * scale)),
+            max(1, round(original_size[1] * scale)),
+        )
+        if img.format == "JPEG" and scale < 1.0:
+            # 요청 크기 이상인 가장 작은 1/2^n 크기로 디코딩
+            img.draft(img.mode, target_size)
+            info["draft_decoded"] = img.size != original_size
+
+        img.load()
+        if img.size != target_size:
+            img = img.resize(target_size, Image.Resampling.LANCZOS)
+        image = image_to_array(ImageOps.exif_transpose(img))
+
+    if correct_geometry:
+        image, corrected = _correct_geometry(image, info)
+        changed = changed or corrected
+
+    info["height"], info["width"] = image.shape[:2]
+    return info, image, changed
+
+
+def _save_png(image: np.ndarray, path: str) -> None:
+    """보정한 이미지를 무손실(PNG)로 저장합니다 (executor에서 실행)."""
+    Path(path).parent.mkdir(parents=True, exist_ok=True)
+    Image.fromarray(image).save(path, format="PNG", compress_level=_PNG_COMPRESS_LEVEL)
+
+
+def _correct_geometry(image: np.ndarray, info: dict) -> Tuple[np.ndarray, bool]:
+    """문서 기하 보정을 적용하고 info를 갱신합니다 (바뀌었는지 여부도 반환)."""
+    # 기하 정보는 작은 proxy에서 추정하고, 변환은 이 해상도에서 한 번만 적용
+    corrected, geometry = correct_document_geometry(image)
+    info.update(geometry)
+    if corrected is image:
+        return image, False
+    info["rotation_corrected"] = (
+        info["rotation_corrected"] or geometry["skew_angle"] != 0.0
+    )
+    info["margins_removed"] = geometry["page_detected"]
+    return corrected, True
+
+
+def _normalize_array(
+    image: np.ndarray,
+    max_pixels: Optional[int],
+    correct_geometry: bool,
+) -> Tuple[dict, np.ndarray]:
+    """
+    이미 디코딩된 이미지에 해상도 제한, 문서 기하 보정을 합니다 (executor에서 실행).
+
+    파일에서 읽은 것이 아니므로 EXIF / DPI 정보는 없고, 결과를 저장하지 않습니다.
+
+    Returns:
+        (결과 정보, 처리된 배열 - 바뀐 것이 없으면 입력 그대로)
+    """
+    height, width = image.shape[:2]
+    scale = _scale_factor((width, height), None, max_pixels, None)
+    info = {
+        "original_width": width,
+        "original_height": height,
+        "scale": scale,
+        "rotation_corrected": False,
+        "resolution_normalized": scale < 1.0,
+        "draft_decoded": False,
+    }
+    if scale < 1.0:
+        target_size = (max(1, round(width * scale)), max(1, round(height * scale)))
+        image = np.asarray(
+            Image.fromarray(image).resize(target_size, Image.Resampling.LANCZOS)
+        )
+    if correct_geometry:
+        image, _ = _correct_geometry(image, info)
+
+    info["height"], info["width"] = image.shape[:2]
+    return info, image
+
+
+def _check_file(file_path: Path) -> int:
+    """입력 파일이 있고 비어 있지 않은지 확인합니다 (파일 크기 반환)."""
+    # 파일 존재 확인
+    if not file_path.exists():
+        raise FileNotFoundError(f"File not found: {file_path}")
+
+    # 파일 크기 확인
+    file_size = file_path.stat().st_size
+    if file_size == 0:
+        raise ValueError(f"File is empty: {file_path}")
+    return file_size
 
 
 class PreprocessStep(PipelineStep):
     """이미지 전처리 단계 - 사진을 분석 가능한 상태로 변환."""
 
+    inputs = ("file_path",)
+    outputs = ("preprocessed",)
+
+    def __init__(
+        self,
+        max_pixels: Optional[int] = DEFAULT_MAX_PIXELS,
+        target_dpi: Optional[int] = None,
+        correct_geometry: bool = True,
+        correct_crop_geometry: bool = False,
+        save_processed: bool = False,
+    ):
+        """
+        PreprocessStep 초기화.
+
+        Args:
+            max_pixels: 최대 픽셀 수 (넘으면 비율을 유지하며 축소, None이면 제한 없음)
+            target_dpi: 목표 DPI (이미지에 DPI 정보가 있고 더 크면 축소)
+            correct_geometry: 페이지 경계 원근 보정 / 기울기 보정 여부
+            correct_crop_geometry: crop 이미지(context.is_crop)에도 기하 보정을
+                할지 여부 (기본 False - 이미 잘라낸 문제 영역 안의 박스를
+                페이지로 보고 잘라내지 않도록)
+            save_processed: 보정한 이미지를 파일로도 남길지 여부 (기본 False -
+                이후 단계는 공유 버퍼의 배열을 쓰므로 파일이 필요 없음)
+        """
+        self.max_pixels = max_pixels
+        self.target_dpi = target_dpi
+        self.correct_geometry = correct_geometry
+        self.correct_crop_geometry = correct_crop_geometry
+        self.save_processed = save_processed
+
     async def execute(self, context: PipelineContext) -> PipelineContext:
         """
         이미지 파일 검증 및 전처리.
 
-        현재는 더미 구현으로 원본 경로를 그대로 넘깁니다.
-        나중에 실제 이미지 처리 로직을 추가합니다.
+        EXIF orientation을 적용하고, max_pixels / target_dpi를 넘는 이미지는
+        축소합니다. 이어서 페이지 경계가 보이면 원근 보정으로 페이지만 남기고,
+        보이지 않으면 기울기를 보정합니다. 바뀐 이미지는 공유 버퍼(context.image)로
+        이후 단계에 넘기므로 카메라 해상도와 관계없이 처리 비용이 일정하고,
+        다시 인코딩하지 않으므로 화질 손실도 없습니다. save_processed면 derived
+        저장소에 PNG로도 남기고 processed_path / processed_file_id로 알려 줍니다.
+
+        컨텍스트에 이미 디코딩된 이미지가 있으면 (예: 원본에서 바로 읽은 crop
+        영역) 파일을 읽지 않고 그 배열을 처리합니다.
+        crop 이미지는 correct_crop_geometry가 아니면 기하 보정을 하지 않습니다.
 
         Args:
             context: Pipeline 컨텍스트
@@ -29,39 +234,82 @@ class PreprocessStep(PipelineStep):
         """
         file_path = context.file_path
 
-        # 파일 존재 확인
-        if not file_path.exists():
-            raise FileNotFoundError(f"File not found: {file_path}")
-
-        # 파일 크기 확인
-        file_size = file_path.stat().st_size
-        if file_size == 0:
-            raise ValueError(f"File is empty: {file_path}")
-
         # 이미지 형식 검증
         allowed_extensions = {".png", ".jpg", ".jpeg"}
         if file_path.suffix.lower() not in allowed_extensions:
             raise ValueError(f"Unsupported file format: {file_path.suffix}")
 
-        # 더미 전처리 결과
-        # 실제 구현 시: 회전 보정, 밝기/대비 보정, 여백 제거, 해상도 정규화 수행
+        correct_geometry = self.correct_geometry and (
+            self.correct_crop_geometry or not context.is_crop
+        )
+        source = context.image
+        if source is not None and source.has("original"):
+            # 메모리로 받은 이미지 (예: 원본에서 바로 읽은 crop 영역) - 파일 입출력 없음
+            info, image = await self.run_blocking(
+                _normalize_array,
+                source.original,
+                self.max_pixels,
+                correct_geometry,
+            )
+            changed = image is not source.original
+            if not changed:
+                # 입력 버퍼를 그대로 사용
+                image = None
+            file_size = None
+        else:
+            file_size = _check_file(file_path)
+
+            # 회전 보정 + 해상도 정규화 + 기하 보정 (이벤트 루프 밖에서 실행)
+            info, image, changed = await self.run_blocking(
+                _normalize_image,
+                str(file_path),
+                self.max_pixels,
+                self.target_dpi,
+                correct_geometry,
+            )
+
+        processed_path = file_path
+        processed_file_id = None
+        if changed and self.save_processed:
+            # 요청한 경우에만 derived 저장소에 남김 (원본 file_id의 파생 파일)
+            processed_file_id = str(uuid.uuid4())
+            processed_path = derived_path(processed_file_id, ".png")
+            await self.run_blocking(_save_png, image, str(processed_path))
+            await asyncio.to_thread(
+                register_file,
+                processed_file_id,
+                processed_path,
+                content_type="image/png",
+                parent_id=context.file_id,
+            )
+        if image is not None:
+            # 이미 디코딩한 결과를 이후 단계와 공유 (다시 디코딩 / 인코딩하지 않음)
+            context.image = ImageBuffer(processed_path, original=image)
+
         context.preprocessed = {
             "original_path": str(file_path),
-            "processed_path": str(file_path),  # 현재는 원본 그대로
+            "processed_path": str(processed_path),
+            "processed_file_id": processed_file_id,
             "file_size": file_size,
             "file_format": file_path.suffix.lower(),
-            "width": None,  # 실제 구현 시 이미지 로드하여 설정
-            "height": None,  # 실제 구현 시 이미지 로드하여 설정
-            "rotation_corrected": False,  # 회전 보정 여부
             "brightness_adjusted": False,  # 밝기 보정 여부
             "contrast_adjusted": False,  # 대비 보정 여부
             "margins_removed": False,  # 여백 제거 여부
-            "resolution_normalized": False,  # 해상도 정규화 여부
+            **info,
             "status": "completed",
         }
 
         return context
 
+    def get_config(self) -> dict:
+        """해상도 정규화 / 기하 보정 설정."""
+        return {
+            "max_pixels": self.max_pixels,
+            "target_dpi": self.target_dpi,
+            "correct_geometry": self.correct_geometry,
+            "correct_crop_geometry": self.correct_crop_geometry,
+        }
+
     def get_name(self) -> str:
         """단계 이름 반환."""
         return "preprocess"
@@ -0,0 +1,6 @@
+"""필기 제거 / OCR 전처리 / 전체 pipeline 성능 벤치마크.
+
+실행 (backend 디렉토리에서):
+    python -m benchmarks --sizes crop 4mp 12mp --output bench.json
+    python -m benchmarks --baseline bench.json   # 기준 결과와 비교
+"""
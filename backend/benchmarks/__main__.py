@@ -0,0 +1,67 @@
+"""벤치마크 CLI.
+
+    python -m benchmarks [--cases ...] [--sizes ...] [--repeat N]
+                         [--output result.json] [--baseline base.json]
+
+기준 결과보다 p50 지연 시간이 --threshold 이상 늘어난 항목이 있으면
+종료 코드 1을 반환합니다.
+"""
+
+import argparse
+import sys
+
+from benchmarks.bench import CASES, compare, load, run_benchmarks, save
+from benchmarks.synthetic import RESOLUTIONS
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks")
+    parser.add_argument("--cases", nargs="+", default=list(CASES), choices=list(CASES))
+    parser.add_argument(
+        "--sizes",
+        nargs="+",
+        default=["crop", "4mp", "12mp"],
+        help=f"해상도 이름({', '.join(RESOLUTIONS)}) 또는 WxH",
+    )
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--warmup", type=int, default=1)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--no-memory", action="store_true", help="메모리 측정 생략")
+    parser.add_argument("--output", help="결과 JSON 저장 경로")
+    parser.add_argument("--baseline", help="비교할 기준 결과 JSON")
+    parser.add_argument(
+        "--threshold", type=float, default=0.2, help="회귀로 볼 p50 증가 비율"
+    )
+    args = parser.parse_args(argv)
+
+    result = run_benchmarks(
+        args.cases,
+        args.sizes,
+        repeat=args.repeat,
+        warmup=args.warmup,
+        memory=not args.no_memory,
+        seed=args.seed,
+        log=print,
+    )
+    if args.output:
+        save(result, args.output)
+
+    if not args.baseline:
+        return 0
+
+    regressions = 0
+    for row in compare(result, load(args.baseline), args.threshold):
+        mark = "REGRESSION" if row["regression"] else ""
+        # 기준 p50이 0이면 비율을 구할 수 없음
+        ratio = "n/a" if row["ratio"] is None else f"{row['ratio']:.2f}"
+        print(
+            f"{row['case']:<20} {row['size']:>10} "
+            f"{row['baseline'] * 1000:8.1f}ms -> {row['current'] * 1000:8.1f}ms "
+            f"(x{ratio}) {mark}"
+        )
+        regressions += row["regression"]
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
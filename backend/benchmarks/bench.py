@@ -0,0 +1,273 @@
+"""벤치마크 실행 / 측정 / 기준 결과 비교.
+
+각 대상(case)을 해상도별로 반복 실행하여 다음을 측정합니다.
+- 처리량 (images/s), 지연 시간 p50 / p90 / p99 / max
+- 최대 메모리: tracemalloc peak (numpy 할당 포함)
+
+메모리는 시간 측정과 섞이지 않도록 별도의 1회 실행에서 잽니다.
+결과는 JSON으로 저장하고, 기준 결과(baseline)와 비교하여
+지연 시간이 threshold 이상 늘어난 항목을 회귀로 보고합니다.
+"""
+
+import asyncio
+import json
+import platform
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+import cv2
+import numpy as np
+from PIL import Image
+
+from analyze.steps.image_processing import (
+    AIBasedRemover,
+    CascadeRemover,
+    MorphologyBasedRemover,
+    ThresholdBasedRemover,
+    detect_answer_regions,
+    preprocess_for_ocr,
+)
+from benchmarks.synthetic import generate_page, resolution
+
+# 결과 JSON 형식 버전
+RESULT_VERSION = 1
+
+# case 이름 → 준비 함수. 준비 함수는 (합성 페이지, 작업 디렉토리)를 받아
+# 한 번 실행할 때마다 호출할 인자 없는 함수를 반환
+CASES: Dict[str, Callable] = {}
+
+
+def case(name: str):
+    """벤치마크 대상을 등록하는 decorator."""
+
+    def register(prepare: Callable) -> Callable:
+        CASES[name] = prepare
+        return prepare
+
+    return register
+
+
+def _remover_case(remover_class):
+    def prepare(page: np.ndarray, workdir: Path) -> Callable[[], object]:
+        remover = remover_class()
+        image = _plane(page, remover.input_plane)
+        return lambda: remover.remove(image)
+
+    return prepare
+
+
+case("threshold_remover")(_remover_case(ThresholdBasedRemover))
+case("morphology_remover")(_remover_case(MorphologyBasedRemover))
+case("ai_remover")(_remover_case(AIBasedRemover))
+case("cascade_remover")(_remover_case(CascadeRemover))
+
+
+@case("preprocess_for_ocr")
+def _prepare_preprocess_for_ocr(page: np.ndarray, workdir: Path):
+    image = Image.fromarray(page)
+    return lambda: preprocess_for_ocr(image)
+
+
+@case("answer_regions")
+def _prepare_answer_regions(page: np.ndarray, workdir: Path):
+    image = _plane(page, "bgr")
+    return lambda: detect_answer_regions(image)
+
+
+@case("pipeline")
+def _prepare_pipeline(page: np.ndarray, workdir: Path):
+    """업로드된 JPEG 한 장을 처음부터 끝까지 분석 (결과 캐시 없음)."""
+    import services.file_storage as file_storage
+    from analyze.pipeline import AnalyzePipeline
+
+    file_storage.UPLOAD_ROOT = workdir / "uploads"
+    image_path = workdir / "page.jpg"
+    Image.fromarray(page).save(image_path, quality=90)
+    pipeline = AnalyzePipeline()
+
+    def run():
+        return asyncio.run(pipeline.analyze("bench", image_path))
+
+    return run
+
+
+def _plane(page: np.ndarray, plane: str) -> np.ndarray:
+    """합성 페이지(RGB)를 remover 입력 표현으로 변환합니다."""
+    if plane == "gray":
+        return cv2.cvtColor(page, cv2.COLOR_RGB2GRAY)
+    return cv2.cvtColor(page, cv2.COLOR_RGB2BGR)
+
+
+def _percentile(values: List[float], q: float) -> float:
+    return float(np.percentile(values, q))
+
+
+def measure(
+    run: Callable[[], object], repeat: int, warmup: int = 1, memory: bool = True
+) -> dict:
+    """
+    함수 하나의 지연 시간 / 처리량 / 메모리를 측정합니다.
+
+    Args:
+        run: 측정할 함수 (인자 없음)
+        repeat: 측정 반복 횟수
+        warmup: 측정 전에 버리는 실행 횟수
+        memory: 메모리 측정 실행 여부
+
+    Returns:
+        측정 결과 dict
+    """
+    for _ in range(warmup):
+        run()
+
+    latencies = []
+    started = time.perf_counter()
+    for _ in range(repeat):
+        start = time.perf_counter()
+        run()
+        latencies.append(time.perf_counter() - start)
+    elapsed = time.perf_counter() - started
+
+    result = {
+        "repeat": repeat,
+        "throughput": repeat / elapsed if elapsed > 0 else None,
+        "latency": {
+            "mean": float(np.mean(latencies)),
+            "p50": _percentile(latencies, 50),
+            "p90": _percentile(latencies, 90),
+            "p99": _percentile(latencies, 99),
+            "max": max(latencies),
+        },
+    }
+
+    if memory:
+        tracemalloc.start()
+        try:
+            run()
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+        # ru_maxrss는 프로세스 전체의 최고치라 앞선 실행(warmup 등)에 가려지므로
+        # 이 실행에서 새로 할당한 양만 보는 tracemalloc peak만 기록
+        result["memory"] = {"tracemalloc_peak": peak}
+    return result
+
+
+def run_benchmarks(
+    cases: List[str],
+    sizes: List[str],
+    repeat: int = 5,
+    warmup: int = 1,
+    memory: bool = True,
+    seed: int = 0,
+    log: Optional[Callable[[str], None]] = None,
+) -> dict:
+    """
+    case × 해상도 조합을 모두 측정합니다.
+
+    Args:
+        cases: 측정할 case 이름 목록 (CASES 키)
+        sizes: 해상도 이름 또는 "WxH" 목록
+        repeat: 조합별 측정 반복 횟수
+        warmup: 조합별 warmup 횟수
+        memory: 메모리 측정 여부
+        seed: 합성 페이지 seed
+        log: 진행 상황 출력 함수 (선택)
+
+    Returns:
+        결과 JSON으로 저장할 dict
+    """
+    unknown = [name for name in cases if name not in CASES]
+    if unknown:
+        raise ValueError(f"Unknown benchmark case: {', '.join(unknown)}")
+
+    results = []
+    with tempfile.TemporaryDirectory(prefix="redo-bench-") as tmp:
+        for size in sizes:
+            width, height = resolution(size)
+            page = generate_page(width, height, seed=seed)
+            for name in cases:
+                workdir = Path(tmp) / f"{name}-{size}"
+                workdir.mkdir()
+                run = CASES[name](page, workdir)
+                measured = measure(run, repeat, warmup, memory)
+                results.append(
+                    {
+                        "case": name,
+                        "size": size,
+                        "width": width,
+                        "height": height,
+                        **measured,
+                    }
+                )
+                if log is not None:
+                    latency = measured["latency"]
+                    log(
+                        f"{name:<20} {size:>10} "
+                        f"p50={latency['p50'] * 1000:8.1f}ms "
+                        f"p99={latency['p99'] * 1000:8.1f}ms "
+                        f"{measured['throughput']:7.2f} img/s"
+                    )
+
+    return {
+        "version": RESULT_VERSION,
+        "created_at": datetime.now().isoformat(),
+        "environment": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "processor": platform.processor(),
+            "numpy": np.__version__,
+            "opencv": cv2.__version__,
+        },
+        "config": {"repeat": repeat, "warmup": warmup, "seed": seed},
+        "results": results,
+    }
+
+
+def compare(current: dict, baseline: dict, threshold: float = 0.2) -> List[dict]:
+    """
+    기준 결과와 비교합니다 (같은 case / 해상도끼리 p50 지연 시간 비교).
+
+    Args:
+        current: 이번 측정 결과
+        baseline: 기준 측정 결과
+        threshold: 회귀로 볼 지연 시간 증가 비율 (0.2 = 20%)
+
+    Returns:
+        비교 항목 목록 ({"case", "size", "baseline", "current", "ratio", "regression"},
+        기준 p50이 0이면 ratio는 None)
+    """
+    base = {(r["case"], r["size"]): r for r in baseline.get("results", [])}
+    rows = []
+    for result in current["results"]:
+        previous = base.get((result["case"], result["size"]))
+        if previous is None:
+            continue
+        before = previous["latency"]["p50"]
+        after = result["latency"]["p50"]
+        ratio = after / before if before > 0 else None
+        rows.append(
+            {
+                "case": result["case"],
+                "size": result["size"],
+                "baseline": before,
+                "current": after,
+                "ratio": ratio,
+                "regression": ratio is not None and ratio > 1 + threshold,
+            }
+        )
+    return rows
+
+
+def save(result: dict, path: Path) -> None:
+    """결과를 JSON 파일로 저장합니다."""
+    Path(path).write_text(json.dumps(result, indent=2, ensure_ascii=False) + "\n")
+
+
+def load(path: Path) -> dict:
+    """JSON 결과 파일을 읽습니다."""
+    return json.loads(Path(path).read_text())
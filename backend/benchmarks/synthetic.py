@@ -0,0 +1,133 @@
+"""합성 문제지 이미지 생성기.
+
+인쇄된 문제 텍스트 위에 연필(회색, 얇고 불규칙한 선)과
+색연필(빨강/파랑, 굵고 옅은 선) 필기를 그린 사진 같은 페이지를 만듭니다.
+같은 seed면 항상 같은 이미지가 나옵니다.
+"""
+
+from typing import Tuple
+
+import cv2
+import numpy as np
+
+# 해상도 이름 → (width, height)
+RESOLUTIONS = {
+    "crop": (800, 600),  # 사용자가 crop한 문제 하나
+    "1mp": (1224, 816),
+    "4mp": (2448, 1632),
+    "12mp": (4032, 3024),  # 스마트폰 카메라 원본
+}
+
+_PENCIL = (90, 90, 90)
+_COLORED_PENCILS = [(200, 60, 60), (60, 80, 200), (60, 150, 60)]  # RGB
+
+
+def generate_page(
+    width: int,
+    height: int,
+    seed: int = 0,
+    strokes: int = 40,
+) -> np.ndarray:
+    """
+    합성 문제지 페이지를 생성합니다.
+
+    Args:
+        width: 이미지 너비
+        height: 이미지 높이
+        seed: 난수 seed
+        strokes: 필기 획 수 (1MP 기준, 해상도에 비례하여 늘어남)
+
+    Returns:
+        RGB numpy array (uint8)
+    """
+    rng = np.random.default_rng(seed)
+    scale = width / 1224
+
+    # 약간 누렇고 고르지 않은 종이 + 조명 그라데이션
+    page = np.full((height, width, 3), (245, 242, 235), dtype=np.uint8)
+    shade = np.linspace(0, 18, width, dtype=np.float32)[None, :, None]
+    page = np.clip(page.astype(np.float32) - shade, 0, 255).astype(np.uint8)
+
+    _draw_printed_text(page, rng, scale)
+    _draw_handwriting(page, rng, scale, int(strokes * scale))
+
+    # 카메라 센서 노이즈
+    noise = rng.normal(0, 3, page.shape).astype(np.int16)
+    return np.clip(page.astype(np.int16) + noise, 0, 255).astype(np.uint8)
+
+
+def generate_gray_page(width: int, height: int, seed: int = 0) -> np.ndarray:
+    """generate_page의 Grayscale 버전."""
+    return cv2.cvtColor(generate_page(width, height, seed), cv2.COLOR_RGB2GRAY)
+
+
+def resolution(name: str) -> Tuple[int, int]:
+    """해상도 이름(RESOLUTIONS 키) 또는 "WxH" 문자열을 (width, height)로 변환합니다."""
+    if name in RESOLUTIONS:
+        return RESOLUTIONS[name]
+    width, _, height = name.lower().partition("x")
+    return int(width), int(height)
+
+
+def _draw_printed_text(page: np.ndarray, rng: np.random.Generator, scale: float):
+    """문제 번호, 지문, 보기처럼 보이는 인쇄 텍스트 줄을 그립니다."""
+    height, width = page.shape[:2]
+    font_scale = 0.9 * scale
+    thickness = max(1, round(2 * scale))
+    line_height = int(42 * scale)
+    margin = int(60 * scale)
+    words = ["x", "y", "=", "+", "-", "2", "3", "f(x)", "sin", "log", "(1)", "(2)"]
+
+    y = margin + line_height
+    number = 1
+    while y < height - margin:
+        if rng.random() < 0.15:
+            text = f"{number}. " + " ".join(rng.choice(words, 6))
+            number += 1
+        else:
+            text = " ".join(rng.choice(words, int(rng.integers(6, 14))))
+        cv2.putText(
+            page,
+            text,
+            (margin, y),
+            cv2.FONT_HERSHEY_SIMPLEX,
+            font_scale,
+            (20, 20, 20),
+            thickness,
+            cv2.LINE_AA,
+        )
+        y += line_height
+
+
+def _draw_handwriting(
+    page: np.ndarray, rng: np.random.Generator, scale: float, strokes: int
+):
+    """연필/색연필 풀이 흔적(곡선 획)을 그립니다."""
+    height, width = page.shape[:2]
+    for _ in range(strokes):
+        colored = rng.random() < 0.4
+        color = (
+            _COLORED_PENCILS[int(rng.integers(len(_COLORED_PENCILS)))]
+            if colored
+            else _PENCIL
+        )
+        thickness = max(1, round((4 if colored else 2) * scale * rng.uniform(0.7, 1.3)))
+
+        # 손으로 쓴 것처럼 흔들리는 polyline
+        start = rng.uniform((0, 0), (width, height))
+        steps = rng.normal(0, 12 * scale, (int(rng.integers(8, 30)), 2))
+        steps[:, 0] += 10 * scale
+        points = (start + np.cumsum(steps, axis=0)).astype(np.int32)
+
+        # 획이 지나는 영역만 잘라서 반투명하게 합성 (연필은 진하기가 일정하지 않음)
+        x0, y0 = np.maximum(points.min(axis=0) - thickness, 0)
+        x1, y1 = points.max(axis=0) + thickness + 1
+        region = page[y0:y1, x0:x1]
+        if region.size == 0:
+            continue
+        overlay = region.copy()
+        cv2.polylines(
+            overlay, [points - (x0, y0)], False, color, thickness, cv2.LINE_AA
+        )
+        alpha = rng.uniform(0.4, 0.8)
+        cv2.addWeighted(overlay, alpha, region, 1 - alpha, 0, dst=region)
@@ -1,17 +1,67 @@
-from fastapi import FastAPI, UploadFile, File, HTTPException, Form
+from fastapi import (
+    BackgroundTasks,
+    FastAPI,
+    UploadFile,
+    File,
+    HTTPException,
+    Form,
+    Query,
+    Request,
+)
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import FileResponse
+from fastapi.responses import FileResponse, PlainTextResponse, StreamingResponse
 from pydantic import BaseModel
-from datetime import datetime
+from contextlib import asynccontextmanager
 from pathlib import Path
+from typing import Optional
+import asyncio
+import json
+import os
 import uuid
-from PIL import Image
-from services.file_storage import save_upload_file, get_file_path_by_id
+from services import file_storage
+from services.file_storage import (
+    UploadTooLarge,
+    save_upload_file,
+    get_file_path_by_id,
+    get_file_info_by_id,
+    derived_path,
+    load_crop,
+    persist_crop,
+    register_crop,
+)
+from services.file_index import get_file_index
+from services.problem_store import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, ProblemStore
+from services.upload_stream import ingest_multipart_upload
 from analyze import AnalyzePipeline
+from analyze.cache import AnalysisCache, region_hash
+from analyze.executor import PipelineExecutor
+from analyze.image_buffer import image_to_array
+from analyze.jobs import JobQueue, JobQueueFull
+from analyze.metrics import REGISTRY as METRICS_REGISTRY
+from analyze.ocr import get_default_ocr_engine
 from analyze.models import PipelineContext
 from analyze.steps import PreprocessStep, ExtractProblemStep, ExtractAnswerStep
+from analyze.steps.image_processing import AIBasedRemover, CascadeRemover
+
 
-app = FastAPI()
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """시작 시 file_id 인덱스 구축, OCR worker 미리 띄우기, 문제 저장소 열기."""
+    global problem_store
+    get_file_index(file_storage.UPLOAD_ROOT)
+    ocr_engine = get_default_ocr_engine()
+    ocr_engine.start()
+    get_problem_store()
+    yield
+    await analyze_jobs.close()
+    analyze_pipeline.executor.shutdown(wait=False)
+    ocr_engine.close()
+    if problem_store is not None:
+        problem_store.close()
+        problem_store = None
+
+
+app = FastAPI(lifespan=lifespan)
 
 # CORS 설정 (프론트 연결용 – 중요)
 app.add_middleware(
@@ -23,13 +73,75 @@ app.add_middleware(
 )
 
 # Pipeline 인스턴스 생성 (싱글톤 패턴 고려 가능)
-analyze_pipeline = AnalyzePipeline()
+# 무거운 단계는 크기가 제한된 pool에서 실행 (이벤트 루프를 막지 않음)
+# ANALYZE_EXECUTOR: "thread" 또는 "process", ANALYZE_WORKERS: pool 크기
+# 같은 이미지 + 같은 설정의 재분석은 결과 캐시에서 반환
+# ANALYSIS_CACHE_SIZE: 메모리 캐시 항목 수, ANALYSIS_CACHE_DIR: 디스크 캐시 위치
+analyze_pipeline = AnalyzePipeline(
+    executor=PipelineExecutor(
+        kind=os.getenv("ANALYZE_EXECUTOR", "thread"),
+        max_workers=int(os.getenv("ANALYZE_WORKERS", "0")) or None,
+    ),
+    cache=AnalysisCache(
+        max_entries=int(os.getenv("ANALYSIS_CACHE_SIZE", "256")),
+        disk_dir=os.getenv("ANALYSIS_CACHE_DIR") or None,
+    ),
+)
+
+# 일괄 분석 (/analyze/batch)
+# ANALYZE_BATCH_MAX: 한 요청의 최대 이미지 수, ANALYZE_BATCH_CONCURRENCY: 동시 분석 수 상한
+ANALYZE_BATCH_MAX = int(os.getenv("ANALYZE_BATCH_MAX", "100"))
+ANALYZE_BATCH_CONCURRENCY = int(os.getenv("ANALYZE_BATCH_CONCURRENCY", "4"))
+
+# Level 3 필기 제거 (ONNX 모델, CPU 추론)
+# AI_REMOVER_MODEL: 모델 경로 (없으면 Level 2로 fallback),
+# AI_REMOVER_OUTPUT: "mask" (segmentation) 또는 "image" (inpainting),
+# AI_REMOVER_THREADS: 추론 thread 수, AI_REMOVER_BATCH: 한 번에 추론할 tile 수
+AI_REMOVER_OPTIONS = {
+    "model_path": os.getenv("AI_REMOVER_MODEL") or None,
+    "output": os.getenv("AI_REMOVER_OUTPUT", "mask"),
+    "threads": int(os.getenv("AI_REMOVER_THREADS", "0")) or None,
+    "batch_size": int(os.getenv("AI_REMOVER_BATCH", "8")),
+}
+
+# 비동기 분석 작업 큐 (/analyze/jobs)
+# ANALYZE_JOB_WORKERS: 동시에 실행할 job 수, ANALYZE_JOB_QUEUE: 최대 대기 job 수
+analyze_jobs = JobQueue(
+    workers=int(os.getenv("ANALYZE_JOB_WORKERS", "2")),
+    max_queue=int(os.getenv("ANALYZE_JOB_QUEUE", "64")),
+)
+
+
+# /upload 요청 본문 문서화 (본문은 FastAPI form 파싱 없이 직접 읽음)
+UPLOAD_REQUEST_BODY = {
+    "required": True,
+    "content": {
+        "multipart/form-data": {
+            "schema": {
+                "type": "object",
+                "required": ["file"],
+                "properties": {"file": {"type": "string", "format": "binary"}},
+            }
+        }
+    },
+}
 
 
-@app.post("/upload")
-async def upload(file: UploadFile = File(...)):
+@app.post("/upload", openapi_extra={"requestBody": UPLOAD_REQUEST_BODY})
+async def upload(request: Request):
+    """
+    이미지를 업로드합니다 (multipart/form-data, 필드 이름 "file").
+
+    본문을 임시 파일에 spool하지 않고 저장소로 바로 받으며,
+    해시 / 크기 제한 / 형식 검사를 같은 흐름에서 처리합니다.
+    """
     file_id = str(uuid.uuid4())
-    file_info = await save_upload_file(file, file_id=file_id)
+    try:
+        file_info = await ingest_multipart_upload(request, file_id=file_id)
+    except UploadTooLarge as e:
+        raise HTTPException(status_code=413, detail=str(e)) from e
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e)) from e
 
     return {
         "file_id": file_id,
@@ -46,7 +158,19 @@ class CropRequest(BaseModel):
 
 
 class AnalyzeRequest(BaseModel):
-    file_id: str
+    """분석 요청 모델 (file_id, 또는 image_id + crop)."""
+
+    file_id: Optional[str] = None
+    image_id: Optional[str] = None
+    crop: Optional[dict] = None  # {"x": int, "y": int, "w": int, "h": int}
+    persist_crop: bool = True  # crop 파일을 응답 후 백그라운드에서 저장
+
+
+class BatchAnalyzeRequest(BaseModel):
+    """여러 이미지 일괄 분석 요청 모델."""
+
+    file_ids: list[str]
+    concurrency: Optional[int] = None  # 동시에 분석할 이미지 수 (상한 있음)
 
 
 class ProblemRequest(BaseModel):
@@ -56,146 +180,229 @@ class ProblemRequest(BaseModel):
     answer_value: str
 
 
+def _parse_crop(crop_params: dict) -> dict:
+    """crop 파라미터를 검증하고 정수 사각형으로 바꿉니다 (잘못되면 400)."""
+    if crop_params.get("w") is None or crop_params.get("h") is None:
+        raise HTTPException(
+            status_code=400,
+            detail="Invalid crop parameters: w and h must be positive",
+        )
+    try:
+        rect = {key: int(crop_params.get(key, 0)) for key in ("x", "y", "w", "h")}
+    except (TypeError, ValueError) as e:
+        raise HTTPException(
+            status_code=400,
+            detail="Invalid crop parameters: x, y, w and h must be integers",
+        ) from e
+
+    if rect["w"] <= 0 or rect["h"] <= 0:
+        raise HTTPException(
+            status_code=400,
+            detail="Invalid crop parameters: w and h must be positive",
+        )
+    return rect
+
+
+def _applied_crop(crop_rect: dict, entry: dict) -> dict:
+    """요청 좌표계에서 실제로 기록된 사각형 (JPEG는 MCU 경계로 넓어질 수 있음)."""
+    # 오른쪽 / 아래쪽 모서리는 요청 그대로
+    w, h = entry["width"], entry["height"]
+    return {
+        "x": crop_rect["x"] + crop_rect["w"] - w,
+        "y": crop_rect["y"] + crop_rect["h"] - h,
+        "w": w,
+        "h": h,
+    }
+
+
 @app.post("/crop")
 async def crop(request: CropRequest):
     """
     이미지 crop 처리.
 
-    원본 이미지를 crop하여 새 이미지로 저장합니다.
+    원본 이미지를 decode / 저장하지 않고 원본 file_id + 사각형만 기록한
+    가상 crop을 만듭니다. crop 이미지 파일은 `/files`나 `/analyze`에서
+    처음 사용할 때 원본의 해당 영역만 읽어 만들고 캐시합니다.
+    JPEG는 DCT 영역에서 무손실로 자르며 (jpegtran / PyTurboJPEG가 있을 때),
+    이때 사각형의 왼쪽 / 위쪽 모서리는 MCU 경계로 당겨집니다.
     Phase 1 - 사용자 주도 crop 단계.
 
     Args:
         request: CropRequest (image_id, crop: {x, y, w, h})
 
     Returns:
-        crop된 이미지의 file_id와 저장 경로
+        crop의 file_id와 실제로 적용된 사각형
+        (stored_path는 파일을 만들기 전이므로 None)
     """
-    try:
-        # 원본 이미지 경로 찾기
-        original_path = get_file_path_by_id(request.image_id)
-        if original_path is None or not original_path.exists():
-            raise HTTPException(
-                status_code=404, detail=f"File not found: {request.image_id}"
-            )
-
-        # crop 파라미터 검증
-        crop_params = request.crop
-        x = crop_params.get("x", 0)
-        y = crop_params.get("y", 0)
-        w = crop_params.get("w")
-        h = crop_params.get("h")
-
-        if w is None or h is None or w <= 0 or h <= 0:
-            raise HTTPException(
-                status_code=400,
-                detail="Invalid crop parameters: w and h must be positive",
-            )
-
-        # 이미지 로드 및 crop
-        try:
-            img = Image.open(original_path)
-            img_width, img_height = img.size
-
-            # crop 영역 검증
-            if x < 0 or y < 0 or x + w > img_width or y + h > img_height:
-                detail_msg = (
-                    f"Crop area out of bounds. "
-                    f"Image size: {img_width}x{img_height}, "
-                    f"Crop: x={x}, y={y}, w={w}, h={h}"
-                )
-                raise HTTPException(status_code=400, detail=detail_msg)
-
-            # crop 수행
-            cropped_img = img.crop((x, y, x + w, y + h))
-
-            # 새 file_id 생성
-            cropped_file_id = str(uuid.uuid4())
-
-            # 저장 경로 생성 (원본과 동일한 구조)
-            from datetime import datetime
-            from services.file_storage import UPLOAD_ROOT
-
-            date_dir = datetime.now().strftime("%Y-%m-%d")
-            upload_dir = UPLOAD_ROOT / date_dir
-            upload_dir.mkdir(parents=True, exist_ok=True)
+    crop_rect = _parse_crop(request.crop)
 
-            ext = original_path.suffix or ".png"
-            stored_name = f"{cropped_file_id}{ext}"
-            cropped_path = upload_dir / stored_name
-
-            # crop된 이미지 저장
-            cropped_img.save(cropped_path)
-
-            return {
-                "file_id": cropped_file_id,
-                "stored_path": str(cropped_path),
-                "original_image_id": request.image_id,
-                "crop": crop_params,
-            }
-
-        except Exception as e:
-            raise HTTPException(
-                status_code=500, detail=f"Image processing failed: {str(e)}"
-            ) from e
-
-    except HTTPException:
-        raise
+    try:
+        entry = await asyncio.to_thread(register_crop, request.image_id, crop_rect)
+    except FileNotFoundError as e:
+        raise HTTPException(status_code=404, detail=str(e)) from e
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e)) from e
     except Exception as e:
         detail = f"Crop failed: {str(e)}"
         raise HTTPException(status_code=500, detail=detail) from e
 
+    return {
+        "file_id": entry["file_id"],
+        "stored_path": None,
+        "original_image_id": request.image_id,
+        "crop": _applied_crop(crop_rect, entry),
+    }
+
 
 @app.get("/files/{file_id}")
 async def get_file(file_id: str):
     """
     file_id로 저장된 파일을 반환합니다.
     """
-    file_path = get_file_path_by_id(file_id)
-    if file_path is None or not file_path.exists():
+    # 가상 crop은 처음 요청될 때 파일로 만들어짐 (이벤트 루프 밖에서)
+    file_info = await asyncio.to_thread(get_file_info_by_id, file_id)
+    if file_info is None or not file_info["path"].exists():
         raise HTTPException(status_code=404, detail=f"File not found: {file_id}")
 
-    # 이미지 타입 결정
-    suffix = file_path.suffix.lower()
-    media_type = "image/jpeg" if suffix in [".jpg", ".jpeg"] else "image/png"
+    return FileResponse(path=file_info["path"], media_type=file_info["content_type"])
 
-    return FileResponse(path=file_path, media_type=media_type)
 
+async def _get_analyze_file_info(file_id: str) -> dict:
+    """분석할 파일의 인덱스 레코드를 찾습니다 (없으면 404, 가상 crop은 파일로 만듦)."""
+    try:
+        file_info = await asyncio.to_thread(get_file_info_by_id, file_id)
+        if file_info is None or not file_info["path"].exists():
+            raise HTTPException(status_code=404, detail=f"File not found: {file_id}")
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e)) from e
+    return file_info
+
+
+async def _run_analysis(
+    file_id: str, file_info: dict, on_progress=None, image=None
+) -> dict:
+    """
+    Pipeline을 실행하고 frontend 응답 형식으로 변환합니다.
+
+    Args:
+        file_id: 분석할 파일 ID
+        file_info: 파일 인덱스 레코드
+        on_progress: 단계 진행 상황 콜백 (선택)
+        image: 이미 디코딩된 이미지 배열 (있으면 파일을 읽지 않음)
+
+    Returns:
+        분석 결과 dict
+    """
+    # 업로드 시 기록된 내용 해시로 결과 캐시 조회
+    result = await analyze_pipeline.analyze(
+        file_id=file_id,
+        file_path=file_info["path"],
+        content_hash=file_info.get("sha256"),
+        on_progress=on_progress,
+        image=image,
+        # crop(원본에서 잘라낸 영역)은 기하 보정을 하지 않음
+        is_crop="crop" in file_info,
+    )
+    # extract_problem 단계에서 생성된 problem_file_id 가져오기
+    problem_file_id = None
+    if result.context and result.context.extracted_problem:
+        problem_file_id = result.context.extracted_problem.get("problem_file_id")
+
+    # Frontend에서 사용하기 좋은 형식으로 응답
+    return {
+        "message": "분석 완료",
+        "file_id": result.file_id,  # 원본 crop된 이미지 file_id
+        "problem_image_file_id": problem_file_id,  # 문제 이미지 file_id
+        "problem_image_url": result.analysis.clean_problem_image_url,
+        "answer": {
+            "text": result.analysis.answer.text,
+            "confidence": result.analysis.answer.confidence,
+        },
+    }
+
+
+def _open_crop(image_id: str, crop_rect: dict):
+    """가상 crop을 등록하고 영역을 메모리로 읽습니다 (blocking, 파일 저장 없음)."""
+    entry = register_crop(image_id, crop_rect)
+    root, region = load_crop(entry)
+    return entry, root, region, image_to_array(region)
+
+
+async def _analyze_crop(
+    request: AnalyzeRequest, background_tasks: BackgroundTasks
+) -> dict:
+    """
+    원본의 crop 영역을 crop 파일 없이 바로 분석합니다.
+
+    영역은 원본에서 한 번만 decode해서 pipeline에 배열로 넘기고,
+    crop 파일 저장(persist_crop)은 응답을 보낸 뒤 백그라운드에서 합니다.
+    """
+    if request.image_id is None:
+        raise HTTPException(status_code=400, detail="image_id is required with crop")
+    crop_rect = _parse_crop(request.crop)
 
-@app.post("/analyze")
-async def analyze(request: AnalyzeRequest):
     try:
-        file_path = get_file_path_by_id(request.file_id)
-        if file_path is None or not file_path.exists():
-            raise HTTPException(
-                status_code=404, detail=f"File not found: {request.file_id}"
-            )
+        entry, root, region, image = await asyncio.to_thread(
+            _open_crop, request.image_id, crop_rect
+        )
+    except FileNotFoundError as e:
+        raise HTTPException(status_code=404, detail=str(e)) from e
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e)) from e
 
-    # Pipeline 실행
+    file_id = entry["file_id"]
+    if request.persist_crop:
+        background_tasks.add_task(persist_crop, file_id, region)
+
+    # crop 파일이 만들어질 경로 (분석 중에는 없어도 됨)
+    file_info = {
+        "path": derived_path(file_id, root["path"].suffix),
+        "crop": entry["crop"],
+        "sha256": (
+            region_hash(root["sha256"], entry["crop"]) if root.get("sha256") else None
+        ),
+    }
     try:
-        result = await analyze_pipeline.analyze(
-            file_id=request.file_id,
-            file_path=file_path,
+        result = await _run_analysis(file_id, file_info, image=image)
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"Analysis failed: {str(e)}",
+        ) from e
+    return {
+        **result,
+        "original_image_id": request.image_id,
+        "crop": _applied_crop(crop_rect, entry),
+    }
+
+
+@app.post("/analyze")
+async def analyze(request: AnalyzeRequest, background_tasks: BackgroundTasks):
+    """
+    이미지를 분석합니다.
+
+    file_id 대신 image_id + crop을 주면 `/crop` → `/analyze`를 한 번에 처리합니다.
+    crop 영역을 원본에서 바로 읽어 분석하므로 crop 파일의 encode / decode와
+    인덱스 조회가 분석 경로에서 빠집니다. 응답의 file_id는 그 crop의 file_id입니다.
+
+    Args:
+        request: AnalyzeRequest (file_id, 또는 image_id + crop: {x, y, w, h})
+
+    Returns:
+        분석 결과 dict
+    """
+    if request.crop is not None:
+        return await _analyze_crop(request, background_tasks)
+    if request.file_id is None:
+        raise HTTPException(
+            status_code=400, detail="file_id or image_id + crop is required"
         )
-        # extract_problem 단계에서 생성된 problem_file_id 가져오기
-        problem_file_id = None
-        if result.context and result.context.extracted_problem:
-            problem_file_id = result.context.extracted_problem.get("problem_file_id")
 
-        # Frontend에서 사용하기 좋은 형식으로 응답
-        return {
-            "message": "분석 완료",
-            "file_id": result.file_id,  # 원본 crop된 이미지 file_id
-            "problem_image_file_id": problem_file_id,  # 문제 이미지 file_id
-            "problem_image_url": result.analysis.clean_problem_image_url,
-            "answer": {
-                "text": result.analysis.answer.text,
-                "confidence": result.analysis.answer.confidence,
-            },
-        }
+    file_info = await _get_analyze_file_info(request.file_id)
+
+    # Pipeline 실행
+    try:
+        return await _run_analysis(request.file_id, file_info)
     except Exception as e:
         raise HTTPException(
             status_code=500,
@@ -203,9 +410,182 @@ async def analyze(request: AnalyzeRequest):
         ) from e
 
 
-# 문제 리스트 저장 (더미 구현)
-# 실제로는 DB에 저장하지만, 현재는 메모리에 저장
-problems_list = []
+@app.post("/analyze/batch")
+async def analyze_batch(request: BatchAnalyzeRequest):
+    """
+    여러 이미지를 한 요청으로 분석합니다.
+
+    이미지들은 제한된 수만큼 동시에 분석되고, 하나가 끝날 때마다
+    결과를 NDJSON 한 줄로 바로 내보냅니다 (끝난 순서, index로 요청 순서 확인).
+    찾을 수 없거나 분석에 실패한 이미지는 해당 줄에 오류로 기록됩니다.
+
+    Args:
+        request: BatchAnalyzeRequest (file_ids, concurrency)
+
+    Returns:
+        application/x-ndjson 스트림
+        각 줄: {"index", "file_id", "status": "completed"|"failed", "result"|"error"}
+    """
+    if not request.file_ids:
+        raise HTTPException(status_code=400, detail="file_ids must not be empty")
+    if len(request.file_ids) > ANALYZE_BATCH_MAX:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Too many files in batch (max {ANALYZE_BATCH_MAX})",
+        )
+    if request.concurrency is not None and request.concurrency <= 0:
+        raise HTTPException(status_code=400, detail="concurrency must be positive")
+
+    concurrency = min(
+        request.concurrency or ANALYZE_BATCH_CONCURRENCY, ANALYZE_BATCH_CONCURRENCY
+    )
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def analyze_one(index: int, file_id: str) -> dict:
+        line = {"index": index, "file_id": file_id}
+        try:
+            file_info = await _get_analyze_file_info(file_id)
+            async with semaphore:
+                result = await _run_analysis(file_id, file_info)
+        except HTTPException as e:
+            return {
+                **line,
+                "status": "failed",
+                "status_code": e.status_code,
+                "error": e.detail,
+            }
+        except Exception as e:
+            return {
+                **line,
+                "status": "failed",
+                "status_code": 500,
+                "error": f"Analysis failed: {str(e)}",
+            }
+        return {**line, "status": "completed", "result": result}
+
+    async def results():
+        tasks = [
+            asyncio.create_task(analyze_one(index, file_id))
+            for index, file_id in enumerate(request.file_ids)
+        ]
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                line = await next_done
+                yield json.dumps(line, ensure_ascii=False) + "\n"
+        finally:
+            # 클라이언트가 연결을 끊으면 남은 분석은 취소
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+    return StreamingResponse(results(), media_type="application/x-ndjson")
+
+
+@app.post("/analyze/jobs", status_code=202)
+async def create_analyze_job(request: AnalyzeRequest):
+    """
+    분석 작업을 큐에 넣고 job id를 바로 반환합니다.
+
+    결과는 GET /analyze/jobs/{job_id}로 조회하거나,
+    GET /analyze/jobs/{job_id}/events (Server-Sent Events)로 진행 상황을 받습니다.
+
+    Args:
+        request: AnalyzeRequest (file_id)
+
+    Returns:
+        job id와 상태 (queued)
+    """
+    if request.file_id is None:
+        raise HTTPException(status_code=400, detail="file_id is required")
+    file_info = await _get_analyze_file_info(request.file_id)
+
+    try:
+        job = analyze_jobs.submit(
+            _run_analysis, request.file_id, file_info, file_id=request.file_id
+        )
+    except JobQueueFull as e:
+        raise HTTPException(status_code=503, detail=str(e)) from e
+
+    return {
+        "job_id": job.job_id,
+        "status": job.status,
+        "status_url": f"/analyze/jobs/{job.job_id}",
+        "events_url": f"/analyze/jobs/{job.job_id}/events",
+    }
+
+
+def _get_job(job_id: str):
+    job = analyze_jobs.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Job not found: {job_id}")
+    return job
+
+
+@app.get("/analyze/jobs/{job_id}")
+async def get_analyze_job(job_id: str):
+    """
+    분석 작업의 상태와 결과를 반환합니다.
+
+    Returns:
+        status(queued/running/completed/failed), 단계 진행 이벤트, 결과 또는 오류
+    """
+    return _get_job(job_id).to_dict()
+
+
+@app.get("/analyze/jobs/{job_id}/events")
+async def stream_analyze_job(job_id: str):
+    """
+    분석 작업의 진행 상황을 Server-Sent Events로 전송합니다.
+
+    지금까지의 이벤트를 먼저 보내고, job이 끝나면 최종 상태를
+    `done` 이벤트로 보낸 뒤 스트림을 닫습니다.
+    """
+    job = _get_job(job_id)
+
+    async def events():
+        async for event in job.stream():
+            data = json.dumps(event, ensure_ascii=False)
+            yield f"event: {event['type']}\ndata: {data}\n\n"
+        data = json.dumps(job.to_dict(), ensure_ascii=False)
+        yield f"event: done\ndata: {data}\n\n"
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def metrics():
+    """
+    Pipeline 단계별 계측값을 Prometheus 텍스트 형식으로 반환합니다.
+
+    단계 이름별 wall time / CPU time histogram,
+    remover 방식별 필기 제거 시간 histogram, 단계 실패 횟수를 포함합니다.
+    """
+    return PlainTextResponse(
+        METRICS_REGISTRY.render(), media_type="text/plain; version=0.0.4"
+    )
+
+
+# 저장된 문제 (SQLite WAL - 재시작 후에도 유지, 여러 worker 프로세스가 공유)
+# import 시점에는 열지 않고 lifespan 시작 또는 처음 사용할 때 생성
+problem_store: Optional[ProblemStore] = None
+
+
+def get_problem_store() -> ProblemStore:
+    """
+    문제 저장소를 반환합니다 (처음 호출 시 생성).
+
+    PROBLEM_DB: DB 파일 경로 (기본: 업로드 루트의 problems.db)
+    """
+    global problem_store
+    if problem_store is None:
+        problem_store = ProblemStore(
+            os.getenv("PROBLEM_DB") or file_storage.UPLOAD_ROOT / "problems.db"
+        )
+    return problem_store
 
 
 @app.post("/problems")
@@ -214,7 +594,7 @@ async def create_problem(request: ProblemRequest):
     문제를 저장합니다.
 
     이 시점에만:
-    - DB 저장 (현재는 메모리)
+    - DB 저장
     - "문제 리스트"에 쌓임
     - 시험지 생성 대상이 됨
 
@@ -225,46 +605,54 @@ async def create_problem(request: ProblemRequest):
         저장된 문제 정보
     """
     # 문제 이미지 파일 존재 확인
-    problem_file_path = get_file_path_by_id(request.problem_image_file_id)
+    problem_file_path = await asyncio.to_thread(
+        get_file_path_by_id, request.problem_image_file_id
+    )
     if problem_file_path is None or not problem_file_path.exists():
         raise HTTPException(
             status_code=404,
             detail=f"Problem image not found: {request.problem_image_file_id}",
         )
 
-    # 문제 ID 생성
-    problem_id = str(uuid.uuid4())
-
-    # 더미: 메모리에 저장 (실제로는 DB에 저장)
-    problem_data = {
-        "problem_id": problem_id,
-        "problem_image_file_id": request.problem_image_file_id,
-        "answer_value": request.answer_value,
-        "created_at": datetime.now().isoformat(),
-        "status": "pending",  # 시험지 생성 대기 상태
-    }
-
-    problems_list.append(problem_data)
+    # status는 "pending" (시험지 생성 대기 상태)
+    problem = await get_problem_store().aadd(
+        request.problem_image_file_id, request.answer_value
+    )
 
     return {
         "message": "문제가 저장되었습니다",
-        "problem_id": problem_id,
+        "problem_id": problem["problem_id"],
         "problem_image_file_id": request.problem_image_file_id,
         "answer_value": request.answer_value,
     }
 
 
 @app.get("/problems")
-async def get_problems():
+async def get_problems(
+    status: Optional[str] = None,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+):
     """
-    저장된 문제 리스트를 반환합니다.
+    저장된 문제 리스트를 저장 순서대로 한 페이지씩 반환합니다.
+
+    Args:
+        status: 이 상태의 문제만 (예: "pending")
+        limit: 페이지 크기
+        cursor: 이전 응답의 next_cursor (없으면 처음부터)
 
     Returns:
-        문제 리스트
+        이 페이지의 문제 리스트와 다음 페이지 cursor (마지막 페이지면 None)
     """
+    try:
+        problems, next_cursor = await get_problem_store().alist(status, limit, cursor)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e)) from e
+
     return {
-        "count": len(problems_list),
-        "problems": problems_list,
+        "count": len(problems),
+        "problems": problems,
+        "next_cursor": next_cursor,
     }
 
 
@@ -276,7 +664,9 @@ async def get_problems():
 async def debug_extract_problem(
     file: UploadFile = File(None, description="이미지 파일 (직접 업로드)"),
     image_id: str = Form(None, description="이미지 ID (이미 업로드된 파일)"),
-    remover_level: int = Form(1, description="필기 제거 레벨 (1, 2, 3)"),
+    remover_level: int = Form(
+        1, description="필기 제거 레벨 (0: 자동 cascade, 1, 2, 3)"
+    ),
 ):
     """
     extract_problem 단계만 독립적으로 실행합니다.
@@ -287,7 +677,7 @@ async def debug_extract_problem(
     Args:
         file: 이미지 파일 (직접 업로드) - file 또는 image_id 중 하나 필수
         image_id: 이미지 ID (이미 업로드된 파일) - file 또는 image_id 중 하나 필수
-        remover_level: 필기 제거 레벨 (1, 2, 3), 기본값: 1
+        remover_level: 필기 제거 레벨 (0: 자동 cascade, 1, 2, 3), 기본값: 1
 
     Returns:
         extract_problem 결과 (문제 이미지 URL, 메타데이터)
@@ -304,7 +694,7 @@ async def debug_extract_problem(
         actual_file_id = file_id
     elif image_id:
         # image_id를 사용한 경우
-        file_path = get_file_path_by_id(image_id)
+        file_path = await asyncio.to_thread(get_file_path_by_id, image_id)
         if file_path is None or not file_path.exists():
             raise HTTPException(status_code=404, detail=f"File not found: {image_id}")
         actual_file_id = image_id
@@ -326,7 +716,15 @@ async def debug_extract_problem(
         context = await preprocess_step.execute(context)
 
         # 2. ExtractProblemStep 실행
-        extract_problem_step = ExtractProblemStep(remover_level=remover_level)
+        remover = None
+        if remover_level == 3:
+            remover = AIBasedRemover(**AI_REMOVER_OPTIONS)
+        elif remover_level == 0:
+            # 모델이 설정되어 있으면 마지막 단계로 Level 3까지 올림
+            remover = CascadeRemover(ai_remover=AIBasedRemover(**AI_REMOVER_OPTIONS))
+        extract_problem_step = ExtractProblemStep(
+            remover=remover, remover_level=remover_level
+        )
         context = await extract_problem_step.execute(context)
 
         # 결과 반환
@@ -347,6 +745,7 @@ async def debug_extract_problem(
                 ),
                 "separation_method": context.extracted_problem.get("separation_method"),
                 "confidence": context.extracted_problem.get("confidence"),
+                "removal": context.extracted_problem.get("removal"),
                 "status": context.extracted_problem.get("status"),
             },
         }
@@ -389,7 +788,7 @@ async def debug_extract_answer(
         actual_file_id = file_id
     elif image_id:
         # image_id를 사용한 경우
-        file_path = get_file_path_by_id(image_id)
+        file_path = await asyncio.to_thread(get_file_path_by_id, image_id)
         if file_path is None or not file_path.exists():
             raise HTTPException(status_code=404, detail=f"File not found: {image_id}")
         actual_file_id = image_id
@@ -425,6 +824,7 @@ async def debug_extract_answer(
                 "answer_text": context.extracted_answer.get("answer_text"),
                 "confidence": context.extracted_answer.get("confidence"),
                 "ocr_method": context.extracted_answer.get("ocr_method"),
+                "answer_box": context.extracted_answer.get("answer_box"),
                 "status": context.extracted_answer.get("status"),
             },
         }
@@ -0,0 +1,238 @@
+"""file_id → 저장 파일 정보 인덱스.
+
+업로드 루트의 `.file_index.jsonl` append-only 로그와 메모리 dict 캐시로
+구성됩니다. 조회는 dict 조회(O(1))이며, 날짜 디렉토리를 스캔하지 않습니다.
+
+- 기록: 한 줄짜리 JSON 레코드를 O_APPEND로 한 번에 write (원자적 추가)
+- 시작 시: 로그를 읽고 디스크를 한 번 스캔하여 로그에 없는 파일을 보충
+- 다른 워커 프로세스가 추가한 레코드는 캐시 miss 시 로그 tail을 읽어 반영
+- 가상 crop 레코드는 path 없이 parent_id + crop 사각형만 가짐
+  (처음 사용할 때 파일로 만들고 path가 있는 레코드로 갱신)
+"""
+
+import json
+import mimetypes
+import os
+import threading
+from pathlib import Path
+from typing import Dict, Optional
+
+INDEX_FILENAME = ".file_index.jsonl"
+
+# 날짜 디렉토리 스캔에서 제외할 디렉토리
+SKIP_DIRS = {"blobs", "derived"}
+
+CONTENT_TYPES = {
+    ".jpg": "image/jpeg",
+    ".jpeg": "image/jpeg",
+    ".png": "image/png",
+}
+
+
+def guess_content_type(path: Path) -> str:
+    """확장자로 content type을 추정합니다."""
+    suffix = path.suffix.lower()
+    if suffix in CONTENT_TYPES:
+        return CONTENT_TYPES[suffix]
+    return mimetypes.guess_type(path.name)[0] or "application/octet-stream"
+
+
+class FileIndex:
+    """업로드 루트 하나에 대한 file_id 인덱스."""
+
+    def __init__(self, upload_root: Path):
+        """
+        Args:
+            upload_root: 파일이 저장되는 루트 디렉토리
+        """
+        self.upload_root = Path(upload_root)
+        self.log_path = self.upload_root / INDEX_FILENAME
+        self._entries: Dict[str, dict] = {}
+        self._offset = 0  # 로그에서 읽은 위치 (byte)
+        self._lock = threading.Lock()
+
+    def rebuild(self) -> None:
+        """로그와 디스크로부터 인덱스를 다시 만듭니다 (시작 시 1회)."""
+        with self._lock:
+            self._entries = {}
+            self._offset = 0
+            self._read_log_tail()
+
+            # 로그에 없는 파일(인덱스 도입 이전 업로드 등)을 보충하고,
+            # 디스크에서 사라진 파일은 제거
+            on_disk = self._scan_disk()
+            for file_id, entry in list(self._entries.items()):
+                if "path" in entry and not self.resolve(entry).exists():
+                    del self._entries[file_id]
+            # 원본이 사라진 가상 crop 제거
+            for file_id, entry in list(self._entries.items()):
+                if "path" not in entry and entry.get("parent_id") not in self._entries:
+                    del self._entries[file_id]
+            known_paths = {e.get("path") for e in self._entries.values()}
+            for rel_path, file_id in on_disk.items():
+                if file_id in self._entries or rel_path in known_paths:
+                    continue
+                path = self.upload_root / rel_path
+                self._append(
+                    {
+                        "file_id": file_id,
+                        "path": rel_path,
+                        "size": path.stat().st_size,
+                        "content_type": guess_content_type(path),
+                    }
+                )
+
+    def add(
+        self,
+        file_id: str,
+        path: Path,
+        content_type: Optional[str] = None,
+        size: Optional[int] = None,
+        **extra,
+    ) -> dict:
+        """
+        파일을 인덱스에 등록합니다.
+
+        Args:
+            file_id: 파일 ID
+            path: 저장된 파일 경로 (upload_root 하위)
+            content_type: MIME 타입 (None이면 확장자로 추정)
+            size: 파일 크기 (None이면 stat으로 계산)
+            **extra: 레코드에 함께 저장할 추가 필드
+
+        Returns:
+            등록된 레코드
+        """
+        path = Path(path)
+        entry = {
+            "file_id": file_id,
+            "path": self._relative(path),
+            "size": path.stat().st_size if size is None else size,
+            "content_type": content_type or guess_content_type(path),
+            **extra,
+        }
+        with self._lock:
+            # 다른 프로세스가 추가한 레코드를 먼저 따라잡은 뒤 기록
+            self._read_log_tail()
+            self._append(entry)
+        return entry
+
+    def add_derived(
+        self,
+        file_id: str,
+        parent_id: str,
+        crop: dict,
+        content_type: Optional[str] = None,
+        **extra,
+    ) -> dict:
+        """
+        파일 없이 원본 영역을 가리키는 가상 crop 레코드를 등록합니다.
+
+        Args:
+            file_id: 파일 ID
+            parent_id: 원본 파일 ID (path가 있는 레코드)
+            crop: 원본 좌표계의 사각형 {"x", "y", "w", "h"}
+            content_type: 파일로 만들 때 사용할 MIME 타입
+            **extra: 레코드에 함께 저장할 추가 필드
+
+        Returns:
+            등록된 레코드
+        """
+        entry = {
+            "file_id": file_id,
+            "parent_id": parent_id,
+            "crop": crop,
+            "content_type": content_type,
+            **extra,
+        }
+        with self._lock:
+            self._read_log_tail()
+            self._append(entry)
+        return entry
+
+    def get(self, file_id: str) -> Optional[dict]:
+        """file_id의 레코드를 반환합니다 (없으면 None)."""
+        entry = self._entries.get(file_id)
+        if entry is None:
+            with self._lock:
+                self._read_log_tail()
+                entry = self._entries.get(file_id)
+        return entry
+
+    def resolve(self, entry: dict) -> Path:
+        """레코드의 상대 경로를 절대 경로로 변환합니다."""
+        return self.upload_root / entry["path"]
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _relative(self, path: Path) -> str:
+        try:
+            return path.relative_to(self.upload_root).as_posix()
+        except ValueError:
+            return str(path)
+
+    def _append(self, entry: dict) -> None:
+        """레코드를 로그에 한 줄로 추가하고 캐시에 반영합니다 (lock 보유 상태)."""
+        self.upload_root.mkdir(parents=True, exist_ok=True)
+        line = (json.dumps(entry, ensure_ascii=False) + "\n").encode("utf-8")
+        fd = os.open(self.log_path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        try:
+            os.write(fd, line)
+        finally:
+            os.close(fd)
+        # offset은 tail 읽기로만 전진 (자신의 레코드를 다시 읽어도 동일한 값)
+        self._entries[entry["file_id"]] = entry
+
+    def _read_log_tail(self) -> None:
+        """마지막으로 읽은 위치 이후의 로그 레코드를 캐시에 반영합니다."""
+        if not self.log_path.exists():
+            return
+        with open(self.log_path, "rb") as f:
+            f.seek(self._offset)
+            data = f.read()
+        # 쓰는 중인 마지막 줄(개행 없음)은 다음에 다시 읽음
+        end = data.rfind(b"\n") + 1
+        for raw in data[:end].splitlines():
+            try:
+                entry = json.loads(raw)
+            except ValueError:
+                continue
+            if entry.get("deleted"):
+                self._entries.pop(entry["file_id"], None)
+            else:
+                self._entries[entry["file_id"]] = entry
+        self._offset += end
+
+    def _scan_disk(self) -> Dict[str, str]:
+        """날짜 디렉토리를 스캔하여 {상대 경로: file_id}를 반환합니다."""
+        found = {}
+        if not self.upload_root.exists():
+            return found
+        for date_dir in self.upload_root.iterdir():
+            # blob 저장소와 숨김 디렉토리(임시 파일)는 file_id 파일이 아님
+            name = date_dir.name
+            if not date_dir.is_dir() or name in SKIP_DIRS or name.startswith("."):
+                continue
+            for file_path in date_dir.iterdir():
+                if file_path.is_file() and not file_path.name.startswith("."):
+                    found[self._relative(file_path)] = file_path.stem
+        return found
+
+
+_indexes: Dict[Path, FileIndex] = {}
+_indexes_lock = threading.Lock()
+
+
+def get_file_index(upload_root: Path) -> FileIndex:
+    """업로드 루트별 FileIndex를 반환합니다 (처음 접근 시 디스크에서 구축)."""
+    key = Path(upload_root).resolve()
+    index = _indexes.get(key)
+    if index is None:
+        with _indexes_lock:
+            index = _indexes.get(key)
+            if index is None:
+                index = FileIndex(key)
+                index.rebuild()
+                _indexes[key] = index
+    return index
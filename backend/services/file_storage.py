@@ -1,23 +1,58 @@
+import hashlib
+import os
+import tempfile
 import uuid
 from pathlib import Path
 from datetime import datetime
-from typing import Optional
+from typing import BinaryIO, Optional, Tuple
 from fastapi import UploadFile
+from PIL import Image
+from starlette.concurrency import run_in_threadpool
+from services.file_index import get_file_index
+from services.jpeg_crop import (
+    JPEG_EXTENSIONS,
+    align_crop,
+    crop_jpeg,
+    lossless_backend,
+    mcu_size,
+)
 
 BASE_DIR = Path(__file__).resolve().parent.parent
 UPLOAD_ROOT = BASE_DIR / "uploads"
 
 ALLOWED_CONTENT_TYPES = {"image/png", "image/jpeg", "image/jpg"}
 
+# 업로드 원본은 내용 해시로 저장 (같은 사진을 다시 올려도 한 벌만 보관)
+BLOB_DIR = "blobs"
+TMP_DIR = ".tmp"
+# 가상 crop을 처음 사용할 때 만든 파일 (file_id로 저장)
+DERIVED_DIR = "derived"
+CONTENT_TYPE_EXTENSIONS = {
+    "image/png": ".png",
+    "image/jpeg": ".jpg",
+    "image/jpg": ".jpg",
+}
+
+# 내용 type별 파일 시작 바이트 (magic bytes)
+MAGIC_BYTES = {
+    "image/png": b"\x89PNG\r\n\x1a\n",
+    "image/jpeg": b"\xff\xd8\xff",
+    "image/jpg": b"\xff\xd8\xff",
+}
+
+# 업로드 최대 크기 (UPLOAD_MAX_BYTES 환경 변수, 기본 30 MB)
+MAX_UPLOAD_SIZE = int(os.getenv("UPLOAD_MAX_BYTES", str(30 * 1024 * 1024)))
+
+# 업로드 복사 단위
+CHUNK_SIZE = 1024 * 1024
 
-async def save_upload_file(
-    file: UploadFile,
-    upload_root: Optional[Path] = None,
-    file_id: Optional[str] = None,
-) -> dict:
-    if file.content_type not in ALLOWED_CONTENT_TYPES:
-        raise ValueError("Unsupported file type")
 
+class UploadTooLarge(ValueError):
+    """업로드 파일이 최대 크기를 넘음."""
+
+
+def new_file_path(file_id: str, ext: str, upload_root: Optional[Path] = None) -> Path:
+    """오늘 날짜 디렉토리 아래에 file_id로 저장할 경로를 만듭니다."""
     if upload_root is None:
         upload_root = UPLOAD_ROOT
 
@@ -25,46 +60,444 @@ async def save_upload_file(
     upload_dir = upload_root / date_dir
     upload_dir.mkdir(parents=True, exist_ok=True)
 
-    ext = Path(file.filename).suffix or ".jpg"
-    if file_id is None:
-        file_id = str(uuid.uuid4())
-    stored_name = f"{file_id}{ext}"
-    file_path = upload_dir / stored_name
+    return upload_dir / f"{file_id}{ext}"
+
+
+def blob_path(content_hash: str, ext: str, upload_root: Optional[Path] = None) -> Path:
+    """내용 해시(sha256 hex)로 저장되는 blob 경로를 반환합니다."""
+    if upload_root is None:
+        upload_root = UPLOAD_ROOT
+
+    return upload_root / BLOB_DIR / content_hash[:2] / f"{content_hash}{ext}"
+
+
+def derived_path(file_id: str, ext: str, upload_root: Optional[Path] = None) -> Path:
+    """가상 crop을 파일로 만들 때 저장되는 경로를 반환합니다."""
+    if upload_root is None:
+        upload_root = UPLOAD_ROOT
+
+    return upload_root / DERIVED_DIR / f"{file_id}{ext}"
+
+
+def register_file(
+    file_id: str,
+    file_path: Path,
+    content_type: Optional[str] = None,
+    size: Optional[int] = None,
+    upload_root: Optional[Path] = None,
+    **extra,
+) -> dict:
+    """저장이 끝난 파일을 file_id 인덱스에 등록합니다."""
+    if upload_root is None:
+        upload_root = UPLOAD_ROOT
+
+    return get_file_index(upload_root).add(
+        file_id, file_path, content_type=content_type, size=size, **extra
+    )
 
-    size = 0
-    with open(file_path, "wb") as buffer:
-        while chunk := await file.read(1024 * 1024):
-            buffer.write(chunk)
-            size += len(chunk)
+
+class BlobWriter:
+    """업로드 내용을 한 번 훑으면서 저장 / 해시 / 크기 제한 / magic byte 검사.
+
+    내용은 upload_root 아래 임시 파일에 바로 쓰고, commit()에서 내용 해시
+    blob 경로로 rename합니다 (같은 내용의 blob이 이미 있으면 임시 파일을 버림).
+    write() / commit() / abort()는 blocking이므로 event loop 밖에서 호출합니다.
+    """
+
+    def __init__(
+        self,
+        content_type: str,
+        upload_root: Optional[Path] = None,
+        max_size: Optional[int] = None,
+    ):
+        """
+        Args:
+            content_type: 업로드 MIME 타입 (ALLOWED_CONTENT_TYPES 중 하나)
+            upload_root: 저장 루트 (None이면 UPLOAD_ROOT)
+            max_size: 최대 크기 (bytes, None이면 MAX_UPLOAD_SIZE)
+
+        Raises:
+            ValueError: 허용하지 않는 content type
+        """
+        if content_type not in ALLOWED_CONTENT_TYPES:
+            raise ValueError("Unsupported file type")
+        if upload_root is None:
+            upload_root = UPLOAD_ROOT
+
+        self.content_type = content_type
+        self.upload_root = upload_root
+        self.max_size = MAX_UPLOAD_SIZE if max_size is None else max_size
+        self.size = 0
+        self._magic = MAGIC_BYTES[content_type]
+        self._head = b""
+        self._hasher = hashlib.sha256()
+
+        tmp_dir = upload_root / TMP_DIR
+        tmp_dir.mkdir(parents=True, exist_ok=True)
+        fd, self._tmp_path = tempfile.mkstemp(dir=tmp_dir)
+        self._file = os.fdopen(fd, "wb")
+
+    def write(self, data) -> None:
+        """
+        내용 일부를 씁니다 (bytes-like, 복사 없이 해시 / 파일에 전달).
+
+        Raises:
+            UploadTooLarge: 누적 크기가 max_size를 넘음
+            ValueError: 시작 바이트가 content type과 맞지 않음
+        """
+        self.size += len(data)
+        if self.size > self.max_size:
+            raise UploadTooLarge(f"File is larger than {self.max_size} bytes")
+        if len(self._head) < len(self._magic):
+            self._head += bytes(data[: len(self._magic) - len(self._head)])
+            if not self._magic.startswith(self._head[: len(self._magic)]):
+                raise ValueError(f"File content is not {self.content_type}")
+        self._hasher.update(data)
+        self._file.write(data)
+
+    def commit(self) -> Tuple[Path, str, bool]:
+        """
+        임시 파일을 내용 해시 blob 경로로 옮깁니다.
+
+        Returns:
+            (blob 경로, sha256 hex, 기존 blob 재사용 여부)
+        """
+        try:
+            self._file.close()
+            if self._head != self._magic:
+                raise ValueError(f"File content is not {self.content_type}")
+
+            content_hash = self._hasher.hexdigest()
+            ext = CONTENT_TYPE_EXTENSIONS[self.content_type]
+            file_path = blob_path(content_hash, ext, self.upload_root)
+            deduplicated = file_path.exists()
+            if not deduplicated:
+                file_path.parent.mkdir(parents=True, exist_ok=True)
+                os.replace(self._tmp_path, file_path)
+            return file_path, content_hash, deduplicated
+        finally:
+            self.abort()
+
+    def abort(self) -> None:
+        """임시 파일을 지웁니다 (commit 후에는 아무것도 하지 않음)."""
+        self._file.close()
+        if os.path.exists(self._tmp_path):
+            os.unlink(self._tmp_path)
+
+
+def store_blob(
+    writer: BlobWriter,
+    file_id: str,
+    original_filename: Optional[str],
+) -> dict:
+    """
+    BlobWriter 내용을 blob으로 확정하고 file_id로 등록합니다 (blocking).
+
+    Returns:
+        업로드 결과 (stored_path, size, sha256, deduplicated 등)
+    """
+    file_path, content_hash, deduplicated = writer.commit()
+
+    content_type = writer.content_type
+    if content_type == "image/jpg":
+        content_type = "image/jpeg"
+    register_file(
+        file_id,
+        file_path,
+        content_type,
+        writer.size,
+        writer.upload_root,
+        sha256=content_hash,
+    )
 
     return {
-        "original_filename": file.filename,
+        "original_filename": original_filename,
         "stored_path": str(file_path),
-        "stored_name": stored_name,
-        "content_type": file.content_type,
-        "size": size,
+        "stored_name": file_path.name,
+        "content_type": writer.content_type,
+        "size": writer.size,
         "file_id": file_id,
+        "sha256": content_hash,
+        "deduplicated": deduplicated,
     }
 
 
-def get_file_path_by_id(
+def _copy_to_blob(
+    source: BinaryIO, writer: BlobWriter, file_id: str, filename: Optional[str]
+) -> dict:
+    """Starlette가 spool한 업로드를 blob으로 복사합니다 (thread에서 실행)."""
+    try:
+        source.seek(0)
+        while chunk := source.read(CHUNK_SIZE):
+            writer.write(chunk)
+        return store_blob(writer, file_id, filename)
+    except BaseException:
+        writer.abort()
+        raise
+
+
+async def save_upload_file(
+    file: UploadFile,
+    upload_root: Optional[Path] = None,
+    file_id: Optional[str] = None,
+    max_size: Optional[int] = None,
+) -> dict:
+    """
+    Starlette가 이미 받아 둔 UploadFile을 저장합니다.
+
+    큰 업로드는 Starlette가 먼저 임시 파일에 spool하므로 디스크에 두 번
+    쓰게 됩니다. /upload는 본문을 저장 위치로 바로 쓰는
+    `services.upload_stream.ingest_multipart_upload`를 사용하고, 이 함수는
+    다른 form 필드와 함께 파일을 받는 debug endpoint용입니다.
+    복사 / 해시 / 검사는 한 번의 thread 호출 안에서 처리합니다.
+
+    Raises:
+        ValueError: 허용하지 않는 content type 또는 내용
+        UploadTooLarge: 최대 크기 초과
+    """
+    if file_id is None:
+        file_id = str(uuid.uuid4())
+
+    writer = await run_in_threadpool(
+        BlobWriter, file.content_type, upload_root, max_size
+    )
+    return await run_in_threadpool(
+        _copy_to_blob, file.file, writer, file_id, file.filename
+    )
+
+
+def load_region(path: Path, crop: dict) -> Image.Image:
+    """
+    이미지 파일에서 crop 영역만 읽습니다.
+
+    Pillow의 공개 API(crop)만 사용합니다. 디코더 내부 상태(tile / 크기)를
+    고치지 않으므로 Pillow 버전과 관계없이 동작하고, 결과는 전체를 decode한 뒤
+    자른 것과 같습니다.
+
+    Args:
+        path: 이미지 파일 경로
+        crop: {"x", "y", "w", "h"}
+
+    Returns:
+        crop된 PIL Image (decode 완료)
+    """
+    x, y, w, h = crop["x"], crop["y"], crop["w"], crop["h"]
+    with Image.open(path) as img:
+        region = img.crop((x, y, x + w, y + h))
+        region.load()
+        return region
+
+
+def register_crop(
+    parent_id: str,
+    crop: dict,
+    upload_root: Optional[Path] = None,
+    file_id: Optional[str] = None,
+) -> dict:
+    """
+    원본 영역을 가리키는 가상 crop을 등록합니다 (이미지 decode / 저장 없음).
+
+    crop의 crop도 가장 처음 원본 기준 사각형으로 바꿔서 기록하므로,
+    여러 번 다시 잘라도 중간 파일이 생기지 않습니다.
+    원본이 JPEG이고 무손실 crop을 쓸 수 있으면 왼쪽 / 위쪽 모서리를 MCU 경계로
+    당겨서 기록합니다 (width / height가 요청보다 클 수 있음).
+
+    Args:
+        parent_id: 자를 이미지의 file_id (가상 crop이어도 됨)
+        crop: parent 좌표계의 사각형 {"x", "y", "w", "h"}
+        upload_root: 저장 루트 (None이면 UPLOAD_ROOT)
+        file_id: 등록할 file_id (None이면 새로 발급)
+
+    Returns:
+        등록된 레코드
+
+    Raises:
+        FileNotFoundError: parent가 없음
+        ValueError: 사각형이 이미지 밖으로 나감
+    """
+    if upload_root is None:
+        upload_root = UPLOAD_ROOT
+    if file_id is None:
+        file_id = str(uuid.uuid4())
+
+    index = get_file_index(upload_root)
+    parent = index.get(parent_id)
+    if parent is None or ("path" in parent and not index.resolve(parent).exists()):
+        raise FileNotFoundError(f"File not found: {parent_id}")
+
+    if "width" in parent:
+        width, height = parent["width"], parent["height"]
+    else:
+        # header만 읽음 (decode 없음)
+        with Image.open(index.resolve(parent)) as img:
+            width, height = img.size
+
+    x, y, w, h = crop["x"], crop["y"], crop["w"], crop["h"]
+    if x < 0 or y < 0 or x + w > width or y + h > height:
+        raise ValueError(
+            f"Crop area out of bounds. Image size: {width}x{height}, "
+            f"Crop: x={x}, y={y}, w={w}, h={h}"
+        )
+
+    # crop의 crop → 원본 기준 사각형
+    root_id = parent_id
+    if "crop" in parent:
+        root_id = parent["parent_id"]
+        x += parent["crop"]["x"]
+        y += parent["crop"]["y"]
+
+    rect = _lossless_crop_rect(
+        index, index.get(root_id), {"x": x, "y": y, "w": w, "h": h}
+    )
+    return index.add_derived(
+        file_id,
+        root_id,
+        rect,
+        content_type=parent.get("content_type"),
+        width=rect["w"],
+        height=rect["h"],
+    )
+
+
+def _lossless_crop_rect(index, root: Optional[dict], crop: dict) -> dict:
+    """원본이 JPEG이고 무손실 crop을 쓸 수 있으면 사각형을 MCU 경계로 넓힙니다."""
+    if root is None or "path" not in root or lossless_backend() is None:
+        return crop
+    path = index.resolve(root)
+    if path.suffix.lower() not in JPEG_EXTENSIONS:
+        return crop
+    try:
+        mcu = mcu_size(path)
+    except OSError:
+        return crop
+    return crop if mcu is None else align_crop(crop, mcu)
+
+
+def load_crop(
+    entry: dict, upload_root: Optional[Path] = None
+) -> Tuple[dict, Image.Image]:
+    """
+    가상 crop의 영역을 파일로 만들지 않고 메모리로 읽습니다 (blocking).
+
+    Args:
+        entry: 가상 crop 레코드 (parent_id, crop)
+        upload_root: 저장 루트 (None이면 UPLOAD_ROOT)
+
+    Returns:
+        (원본 레코드, crop된 PIL Image)
+
+    Raises:
+        FileNotFoundError: 원본이 없음
+    """
+    root = get_file_info_by_id(entry["parent_id"], upload_root)
+    if root is None or not root["path"].exists():
+        raise FileNotFoundError(f"File not found: {entry['parent_id']}")
+    return root, load_region(root["path"], entry["crop"])
+
+
+def _materialize_crop(
+    entry: dict, upload_root: Path, region: Optional[Image.Image] = None
+) -> dict:
+    """
+    가상 crop을 파일로 만들고 path가 있는 레코드로 갱신합니다 (처음 한 번).
+
+    다른 요청 / 프로세스가 동시에 만들어도 임시 파일 + rename이라 안전합니다.
+    JPEG는 가능하면 무손실 crop을 쓰고, 아니면 이미 읽어 둔 영역(region)을
+    encode합니다 (없으면 원본에서 영역만 읽음).
+    """
+    index = get_file_index(upload_root)
+    root = get_file_info_by_id(entry["parent_id"], upload_root)
+    if root is None or not root["path"].exists():
+        raise FileNotFoundError(f"File not found: {entry['parent_id']}")
+
+    path = derived_path(entry["file_id"], root["path"].suffix, upload_root)
+    if not path.exists():
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=path.parent, suffix=path.suffix)
+        os.close(fd)
+        try:
+            # JPEG는 DCT 영역에서 무손실로 자르고, 불가능할 때만 decode → encode
+            if not crop_jpeg(root["path"], entry["crop"], Path(tmp_path)):
+                if region is None:
+                    region = load_region(root["path"], entry["crop"])
+                region.save(tmp_path, format=_image_format(root["path"]))
+            os.replace(tmp_path, path)
+        finally:
+            if os.path.exists(tmp_path):
+                os.unlink(tmp_path)
+
+    extra = {
+        key: entry[key]
+        for key in ("parent_id", "crop", "width", "height")
+        if key in entry
+    }
+    return index.add(entry["file_id"], path, entry.get("content_type"), **extra)
+
+
+def persist_crop(
+    file_id: str, region: Image.Image, upload_root: Optional[Path] = None
+) -> Optional[dict]:
+    """
+    이미 메모리로 읽은 crop 영역을 파일로 저장합니다 (응답 후 백그라운드용).
+
+    Args:
+        file_id: 가상 crop의 file_id
+        region: load_crop으로 읽은 영역
+        upload_root: 저장 루트 (None이면 UPLOAD_ROOT)
+
+    Returns:
+        path가 있는 레코드 (crop 또는 원본이 사라졌으면 None)
+    """
+    if upload_root is None:
+        upload_root = UPLOAD_ROOT
+
+    entry = get_file_index(upload_root).get(file_id)
+    if entry is None:
+        return None
+    if "path" in entry:
+        # 이미 다른 요청에서 파일로 만들어짐
+        return entry
+    try:
+        return _materialize_crop(entry, upload_root, region=region)
+    except FileNotFoundError:
+        return None
+
+
+def _image_format(path: Path) -> Optional[str]:
+    """확장자에 해당하는 PIL 저장 형식 (모르면 None)."""
+    return Image.registered_extensions().get(path.suffix.lower())
+
+
+def get_file_info_by_id(
     file_id: str, upload_root: Optional[Path] = None
-) -> Optional[Path]:
-    """file_id로 저장된 파일 경로를 찾습니다."""
+) -> Optional[dict]:
+    """
+    file_id의 인덱스 레코드(path, size, content_type, sha256)를 반환합니다.
+
+    가상 crop은 처음 조회할 때 파일로 만들어 캐시합니다 (blocking).
+    """
     if upload_root is None:
         upload_root = UPLOAD_ROOT
 
-    # uploads 디렉토리 하위의 모든 날짜 디렉토리를 검색
-    if not upload_root.exists():
+    index = get_file_index(upload_root)
+    entry = index.get(file_id)
+    if entry is None:
         return None
+    if "path" not in entry:
+        try:
+            entry = _materialize_crop(entry, upload_root)
+        except FileNotFoundError:
+            # 원본이 사라진 가상 crop
+            return None
 
-    # 날짜 디렉토리들을 검색 (최신 것부터)
-    date_dirs = sorted([d for d in upload_root.iterdir() if d.is_dir()], reverse=True)
+    return {**entry, "path": index.resolve(entry)}
 
-    for date_dir in date_dirs:
-        # 해당 날짜 디렉토리에서 file_id로 시작하는 파일 찾기
-        for file_path in date_dir.glob(f"{file_id}.*"):
-            if file_path.is_file():
-                return file_path
 
-    return None
+def get_file_path_by_id(
+    file_id: str, upload_root: Optional[Path] = None
+) -> Optional[Path]:
+    """file_id로 저장된 파일 경로를 찾습니다 (인덱스 조회, O(1))."""
+    info = get_file_info_by_id(file_id, upload_root)
+    if info is None:
+        return None
+    return info["path"]
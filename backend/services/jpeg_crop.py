@@ -0,0 +1,153 @@
+"""JPEG 무손실 crop (DCT 영역에서 MCU 단위로 자르기).
+
+JPEG를 pixel로 decode → crop → 다시 encode하면 원본 크기에 비례하는 CPU를 쓰고
+재압축으로 화질도 떨어집니다. MCU(8x8 또는 16x16 블록) 경계에서 시작하는 사각형은
+압축된 DCT 계수를 그대로 옮겨 담을 수 있어서, 원본 크기와 관계없이 몇 ms면
+되고 화질 손실도 없습니다.
+
+- backend: PyTurboJPEG(`turbojpeg`)가 있으면 사용, 없으면 `jpegtran` 실행 파일
+  (경로는 JPEGTRAN 환경 변수), 둘 다 없으면 사용 불가 → 호출자가 pixel crop으로 처리
+- 사각형의 왼쪽 / 위쪽 모서리는 MCU 경계로 당깁니다 (오른쪽 / 아래쪽 모서리는 유지)
+"""
+
+import functools
+import os
+import shutil
+import subprocess
+from pathlib import Path
+from typing import Optional, Tuple
+
+from PIL import Image
+
+try:
+    from turbojpeg import TurboJPEG
+except ImportError:  # 선택 의존성
+    TurboJPEG = None
+
+JPEGTRAN = os.getenv("JPEGTRAN", "jpegtran")
+JPEGTRAN_TIMEOUT = 30.0
+JPEG_EXTENSIONS = {".jpg", ".jpeg"}
+
+
+@functools.lru_cache(maxsize=1)
+def lossless_backend() -> Optional[str]:
+    """
+    사용할 무손실 crop backend 이름을 반환합니다 (프로세스당 한 번 확인).
+
+    Returns:
+        "turbojpeg" / "jpegtran" / None (사용 불가)
+    """
+    if TurboJPEG is not None:
+        try:
+            _turbojpeg()
+            return "turbojpeg"
+        except (OSError, RuntimeError):
+            # 파이썬 모듈은 있지만 libturbojpeg를 찾지 못함
+            pass
+    if shutil.which(JPEGTRAN):
+        return "jpegtran"
+    return None
+
+
+@functools.lru_cache(maxsize=1)
+def _turbojpeg():
+    return TurboJPEG()
+
+
+def mcu_size(path: Path) -> Optional[Tuple[int, int]]:
+    """
+    JPEG의 MCU 크기(가로, 세로 pixel)를 header에서 읽습니다 (decode 없음).
+
+    Returns:
+        (width, height) - JPEG가 아니면 None
+    """
+    with Image.open(path) as img:
+        if img.format != "JPEG":
+            return None
+        layers = getattr(img, "layer", None) or []
+        if len(layers) <= 1:
+            # 단일 채널은 sampling factor와 관계없이 8x8
+            return 8, 8
+        # layer: (component id, 가로 sampling, 세로 sampling, 양자화 table)
+        horizontal = max(layer[1] for layer in layers)
+        vertical = max(layer[2] for layer in layers)
+        return 8 * horizontal, 8 * vertical
+
+
+def align_crop(crop: dict, mcu: Tuple[int, int]) -> dict:
+    """
+    사각형의 왼쪽 / 위쪽 모서리를 MCU 경계로 당깁니다.
+
+    오른쪽 / 아래쪽 모서리는 그대로 두므로 요청한 영역은 모두 포함되고,
+    이미지 밖으로 나가지도 않습니다.
+
+    Args:
+        crop: {"x", "y", "w", "h"}
+        mcu: (MCU 가로, MCU 세로)
+
+    Returns:
+        정렬된 사각형 (이미 정렬되어 있으면 같은 값)
+    """
+    dx = crop["x"] % mcu[0]
+    dy = crop["y"] % mcu[1]
+    return {
+        "x": crop["x"] - dx,
+        "y": crop["y"] - dy,
+        "w": crop["w"] + dx,
+        "h": crop["h"] + dy,
+    }
+
+
+def crop_jpeg(path: Path, crop: dict, output_path: Path) -> bool:
+    """
+    JPEG를 DCT 영역에서 잘라 output_path에 씁니다 (blocking).
+
+    Args:
+        path: 원본 JPEG 경로
+        crop: MCU 경계에서 시작하는 사각형 {"x", "y", "w", "h"}
+        output_path: 결과 파일 경로
+
+    Returns:
+        성공 여부 (backend가 없거나, 정렬되지 않았거나, 실패하면 False →
+        호출자가 pixel crop으로 처리)
+    """
+    backend = lossless_backend()
+    if backend is None or Path(path).suffix.lower() not in JPEG_EXTENSIONS:
+        return False
+    try:
+        mcu = mcu_size(path)
+    except OSError:
+        return False
+    if mcu is None or align_crop(crop, mcu) != crop:
+        return False
+
+    x, y, w, h = crop["x"], crop["y"], crop["w"], crop["h"]
+    if backend == "turbojpeg":
+        try:
+            # copynone: EXIF 등 marker를 복사하지 않음 (jpegtran `-copy none`,
+            # pixel crop과 같게 Orientation이 남지 않도록)
+            data = _turbojpeg().crop(Path(path).read_bytes(), x, y, w, h, copynone=True)
+        except (OSError, ValueError, TypeError):
+            # TypeError: copynone을 지원하지 않는 오래된 PyTurboJPEG
+            return False
+        Path(output_path).write_bytes(data)
+        return True
+
+    try:
+        completed = subprocess.run(
+            [
+                JPEGTRAN,
+                "-copy",
+                "none",
+                "-crop",
+                f"{w}x{h}+{x}+{y}",
+                "-outfile",
+                str(output_path),
+                str(path),
+            ],
+            capture_output=True,
+            timeout=JPEGTRAN_TIMEOUT,
+        )
+    except (OSError, subprocess.TimeoutExpired):
+        return False
+    return completed.returncode == 0 and Path(output_path).stat().st_size > 0
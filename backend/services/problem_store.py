@@ -0,0 +1,237 @@
+"""저장된 문제 저장소 (SQLite, WAL 모드).
+
+- 파일 하나짜리 SQLite DB라 재시작 후에도 유지되고 별도 서버가 필요 없음
+- WAL 모드: 읽기가 쓰기를 막지 않고, 여러 uvicorn worker 프로세스가
+  같은 DB 파일을 안전하게 공유 (쓰기는 SQLite lock으로 직렬화, busy timeout 대기)
+- 연결은 thread마다 하나 (처음 사용할 때 열림), async 메서드는 이벤트 루프 밖에서 실행
+- 목록은 seq(AUTOINCREMENT, 저장 순서) 기준 cursor pagination - OFFSET 없이
+  index를 cursor 위치부터 읽으므로 문제가 많아도 페이지 비용이 일정
+  (시계가 바뀌거나 프로세스마다 시간이 달라도 순서가 흔들리지 않음)
+- created_at은 UTC ISO 8601 문자열 (표시용, 정렬에는 쓰지 않음)
+"""
+
+import asyncio
+import base64
+import json
+import sqlite3
+import threading
+import uuid
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import List, Optional, Tuple, Union
+
+# 다른 프로세스가 쓰는 중일 때 기다리는 최대 시간 (초)
+BUSY_TIMEOUT = 10.0
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS problems (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    problem_id TEXT NOT NULL UNIQUE,
+    problem_image_file_id TEXT NOT NULL,
+    answer_value TEXT NOT NULL,
+    status TEXT NOT NULL,
+    created_at TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_problems_status_seq ON problems (status, seq);
+DROP INDEX IF EXISTS idx_problems_created_at;
+DROP INDEX IF EXISTS idx_problems_status;
+"""
+
+_COLUMNS = "seq, problem_id, problem_image_file_id, answer_value, status, created_at"
+
+
+def encode_cursor(seq: int) -> str:
+    """목록의 마지막 항목 위치(seq)를 불투명한 cursor 문자열로 만듭니다."""
+    payload = json.dumps({"seq": seq}).encode("utf-8")
+    return base64.urlsafe_b64encode(payload).decode("ascii")
+
+
+def decode_cursor(cursor: str) -> int:
+    """
+    cursor 문자열을 seq로 되돌립니다.
+
+    Raises:
+        ValueError: 잘못된 cursor
+    """
+    try:
+        seq = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))["seq"]
+    except (ValueError, TypeError, KeyError) as e:
+        raise ValueError(f"Invalid cursor: {cursor}") from e
+    if not isinstance(seq, int) or isinstance(seq, bool):
+        raise ValueError(f"Invalid cursor: {cursor}")
+    return seq
+
+
+def _to_dict(row: sqlite3.Row) -> dict:
+    """DB 행을 API 응답 형식의 dict로 바꿉니다 (내부 seq 제외)."""
+    return {
+        "problem_id": row["problem_id"],
+        "problem_image_file_id": row["problem_image_file_id"],
+        "answer_value": row["answer_value"],
+        "created_at": row["created_at"],
+        "status": row["status"],
+    }
+
+
+class ProblemStore:
+    """SQLite 문제 저장소 (thread-safe, 프로세스 간 공유 가능)."""
+
+    def __init__(self, db_path: Union[str, Path]):
+        """
+        Args:
+            db_path: DB 파일 경로 (없으면 처음 사용할 때 생성)
+        """
+        self.db_path = Path(db_path)
+        self._local = threading.local()
+        self._connections: List[sqlite3.Connection] = []
+        self._lock = threading.Lock()
+        self._initialized = False
+
+    def add(
+        self,
+        problem_image_file_id: str,
+        answer_value: str,
+        status: str = "pending",
+    ) -> dict:
+        """
+        문제를 저장합니다.
+
+        Args:
+            problem_image_file_id: 문제 이미지 file_id
+            answer_value: 정답
+            status: 상태 (기본 "pending" - 시험지 생성 대기)
+
+        Returns:
+            저장된 문제
+        """
+        problem = {
+            "problem_id": str(uuid.uuid4()),
+            "problem_image_file_id": problem_image_file_id,
+            "answer_value": answer_value,
+            "created_at": datetime.now(timezone.utc).isoformat(timespec="microseconds"),
+            "status": status,
+        }
+        self._connection().execute(
+            "INSERT INTO problems (problem_id, problem_image_file_id, answer_value,"
+            " status, created_at) VALUES (:problem_id, :problem_image_file_id,"
+            " :answer_value, :status, :created_at)",
+            problem,
+        )
+        return problem
+
+    def get(self, problem_id: str) -> Optional[dict]:
+        """problem_id로 문제를 찾습니다 (없으면 None)."""
+        row = (
+            self._connection()
+            .execute(
+                f"SELECT {_COLUMNS} FROM problems WHERE problem_id = ?", (problem_id,)
+            )
+            .fetchone()
+        )
+        return _to_dict(row) if row is not None else None
+
+    def list(
+        self,
+        status: Optional[str] = None,
+        limit: int = DEFAULT_PAGE_SIZE,
+        cursor: Optional[str] = None,
+    ) -> Tuple[List[dict], Optional[str]]:
+        """
+        문제를 저장 순서대로 한 페이지 가져옵니다.
+
+        Args:
+            status: 이 상태의 문제만 (None이면 전체)
+            limit: 페이지 크기 (1 ~ MAX_PAGE_SIZE)
+            cursor: 이전 페이지가 돌려준 next_cursor (None이면 처음부터)
+
+        Returns:
+            (문제 리스트, 다음 페이지 cursor - 마지막 페이지면 None)
+
+        Raises:
+            ValueError: 잘못된 limit / cursor
+        """
+        if not 1 <= limit <= MAX_PAGE_SIZE:
+            raise ValueError(f"limit must be between 1 and {MAX_PAGE_SIZE}")
+
+        conditions = []
+        params = []
+        if status is not None:
+            conditions.append("status = ?")
+            params.append(status)
+        if cursor is not None:
+            conditions.append("seq > ?")
+            params.append(decode_cursor(cursor))
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+
+        # 한 개 더 읽어서 다음 페이지가 있는지 확인
+        rows = (
+            self._connection()
+            .execute(
+                f"SELECT {_COLUMNS} FROM problems {where}" " ORDER BY seq LIMIT ?",
+                (*params, limit + 1),
+            )
+            .fetchall()
+        )
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            next_cursor = encode_cursor(rows[-1]["seq"])
+        return [_to_dict(row) for row in rows], next_cursor
+
+    async def aadd(
+        self, problem_image_file_id: str, answer_value: str, status: str = "pending"
+    ) -> dict:
+        """add()의 비동기 버전 (DB 쓰기는 이벤트 루프 밖에서)."""
+        return await asyncio.to_thread(
+            self.add, problem_image_file_id, answer_value, status
+        )
+
+    async def aget(self, problem_id: str) -> Optional[dict]:
+        """get()의 비동기 버전."""
+        return await asyncio.to_thread(self.get, problem_id)
+
+    async def alist(
+        self,
+        status: Optional[str] = None,
+        limit: int = DEFAULT_PAGE_SIZE,
+        cursor: Optional[str] = None,
+    ) -> Tuple[List[dict], Optional[str]]:
+        """list()의 비동기 버전."""
+        return await asyncio.to_thread(self.list, status, limit, cursor)
+
+    def close(self) -> None:
+        """열린 연결을 모두 닫습니다 (종료 시)."""
+        with self._lock:
+            for connection in self._connections:
+                connection.close()
+            self._connections.clear()
+            self._local = threading.local()
+
+    def _connection(self) -> sqlite3.Connection:
+        """현재 thread의 연결을 반환합니다 (처음이면 열고 schema 준비)."""
+        connection = getattr(self._local, "connection", None)
+        if connection is not None:
+            return connection
+
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        # isolation_level=None: 문장마다 autocommit (한 문장짜리 쓰기만 있음)
+        connection = sqlite3.connect(
+            self.db_path,
+            timeout=BUSY_TIMEOUT,
+            isolation_level=None,
+            check_same_thread=False,
+        )
+        connection.row_factory = sqlite3.Row
+        connection.execute("PRAGMA journal_mode=WAL")
+        # WAL에서는 NORMAL로도 DB가 깨지지 않음 (전원 장애 시 마지막 commit만 잃을 수 있음)
+        connection.execute("PRAGMA synchronous=NORMAL")
+        with self._lock:
+            if not self._initialized:
+                connection.executescript(_SCHEMA)
+                self._initialized = True
+            self._connections.append(connection)
+        self._local.connection = connection
+        return connection
@@ -0,0 +1,152 @@
+"""multipart 업로드 본문을 저장 위치로 바로 쓰는 streaming 수신.
+
+Starlette의 `UploadFile`은 큰 본문을 먼저 임시 파일에 spool하므로,
+그 파일을 다시 저장소로 복사하면 같은 사진을 디스크에 두 번 쓰게 됩니다.
+여기서는 요청 본문을 받는 대로 multipart parser에 넣고 파일 part의 내용을
+`BlobWriter`(저장소 아래 임시 파일 → 내용 해시 blob으로 rename)에 바로 넘깁니다.
+해시, 크기 제한, magic byte 검사도 같은 한 번의 흐름에서 처리합니다.
+"""
+
+import uuid
+from pathlib import Path
+from typing import Optional
+
+from starlette.concurrency import run_in_threadpool
+from starlette.requests import Request
+
+try:
+    from python_multipart.multipart import MultipartParser, parse_options_header
+except ImportError:  # 이전 이름 (python-multipart < 0.0.13)
+    from multipart.multipart import MultipartParser, parse_options_header
+
+from services.file_storage import CHUNK_SIZE, BlobWriter, store_blob
+
+
+class _FilePart:
+    """parser callback이 모으는 파일 part 상태."""
+
+    def __init__(self, field: str):
+        self.field = field
+        self.header_field = b""
+        self.header_value = b""
+        self.headers = {}
+        self.active = False  # 지금 읽는 part가 대상 파일 필드인지
+        self.found = False
+        self.done = False
+        self.content_type = None
+        self.filename = None
+        self.pending = bytearray()
+
+    def on_part_begin(self) -> None:
+        self.headers = {}
+
+    def on_header_field(self, data: bytes, start: int, end: int) -> None:
+        self.header_field += data[start:end]
+
+    def on_header_value(self, data: bytes, start: int, end: int) -> None:
+        self.header_value += data[start:end]
+
+    def on_header_end(self) -> None:
+        self.headers[self.header_field.lower()] = self.header_value
+        self.header_field = b""
+        self.header_value = b""
+
+    def on_headers_finished(self) -> None:
+        _, options = parse_options_header(self.headers.get(b"content-disposition", b""))
+        name = options.get(b"name", b"").decode("utf-8", "replace")
+        # 같은 이름의 파일 필드가 여러 개면 첫 번째만 사용
+        self.active = name == self.field and not self.found
+        if self.active:
+            self.found = True
+            content_type = self.headers.get(b"content-type", b"")
+            self.content_type = content_type.decode("latin-1").strip().lower()
+            filename = options.get(b"filename")
+            self.filename = None if filename is None else filename.decode("utf-8")
+
+    def on_part_data(self, data: bytes, start: int, end: int) -> None:
+        if self.active:
+            self.pending += memoryview(data)[start:end]
+
+    def on_part_end(self) -> None:
+        if self.active:
+            self.active = False
+            self.done = True
+
+
+async def ingest_multipart_upload(
+    request: Request,
+    field: str = "file",
+    upload_root: Optional[Path] = None,
+    file_id: Optional[str] = None,
+    max_size: Optional[int] = None,
+) -> dict:
+    """
+    multipart/form-data 요청 본문에서 파일 필드를 저장소로 바로 수신합니다.
+
+    파일 part 내용은 CHUNK_SIZE 단위로 모아서 thread에서 BlobWriter에 씁니다
+    (event loop에서 blocking 파일 IO를 하지 않음).
+
+    Args:
+        request: multipart/form-data 요청
+        field: 파일 필드 이름
+        upload_root: 저장 루트 (None이면 UPLOAD_ROOT)
+        file_id: 등록할 file_id (None이면 새로 발급)
+        max_size: 최대 크기 (None이면 MAX_UPLOAD_SIZE)
+
+    Returns:
+        save_upload_file과 같은 형식의 업로드 결과
+
+    Raises:
+        ValueError: multipart 요청이 아니거나 파일 필드가 없음, 허용하지 않는
+            content type 또는 내용
+        UploadTooLarge: 최대 크기 초과
+    """
+    content_type, options = parse_options_header(
+        request.headers.get("content-type", "")
+    )
+    boundary = options.get(b"boundary")
+    if content_type != b"multipart/form-data" or not boundary:
+        raise ValueError("Expected a multipart/form-data request")
+    if file_id is None:
+        file_id = str(uuid.uuid4())
+
+    part = _FilePart(field)
+    parser = MultipartParser(
+        boundary,
+        {
+            "on_part_begin": part.on_part_begin,
+            "on_header_field": part.on_header_field,
+            "on_header_value": part.on_header_value,
+            "on_header_end": part.on_header_end,
+            "on_headers_finished": part.on_headers_finished,
+            "on_part_data": part.on_part_data,
+            "on_part_end": part.on_part_end,
+        },
+    )
+
+    writer: Optional[BlobWriter] = None
+    try:
+        async for chunk in request.stream():
+            parser.write(chunk)
+            if part.found and writer is None:
+                # content type은 part header를 받자마자 검사
+                writer = await run_in_threadpool(
+                    BlobWriter, part.content_type, upload_root, max_size
+                )
+            if writer is not None and (
+                len(part.pending) >= CHUNK_SIZE or (part.done and part.pending)
+            ):
+                await run_in_threadpool(writer.write, part.pending)
+                part.pending.clear()
+            if part.done:
+                # 파일 이후의 본문은 읽을 필요 없음
+                break
+        if not part.found:
+            raise ValueError(f"Missing file field: {field}")
+        if not part.done:
+            raise ValueError("Incomplete multipart body")
+        return await run_in_threadpool(store_blob, writer, file_id, part.filename)
+    except BaseException:
+        if writer is not None:
+            await run_in_threadpool(writer.abort)
+        raise
@@ -1,3 +1,6 @@
+import asyncio
+
+import pytest
 from fastapi.testclient import TestClient
 from pathlib import Path
 from io import BytesIO
@@ -72,3 +75,26 @@ def test_analyze_with_invalid_file_id(tmp_path, monkeypatch):
 
     assert response.status_code == 404
     assert "not found" in response.json()["detail"].lower()
+
+
+@pytest.mark.parametrize(
+    "endpoint", ["/debug/extract_problem", "/debug/extract_answer"]
+)
+def test_debug_lookup_off_event_loop(endpoint, monkeypatch):
+    """debug endpoint가 image_id 조회(인덱스 읽기)를 이벤트 루프 밖에서 하는지 테스트."""
+    threads = []
+
+    def lookup(image_id):
+        try:
+            asyncio.get_running_loop()
+            threads.append("event loop")
+        except RuntimeError:
+            threads.append("worker")
+        return None
+
+    monkeypatch.setattr("backend.main.get_file_path_by_id", lookup)
+
+    response = client.post(endpoint, data={"image_id": "missing"})
+
+    assert response.status_code == 404
+    assert threads == ["worker"]
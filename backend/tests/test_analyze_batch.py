@@ -0,0 +1,93 @@
+"""일괄 분석(/analyze/batch) API 테스트."""
+
+import asyncio
+import json
+from io import BytesIO
+
+import httpx
+import pytest
+from PIL import Image
+
+import backend.main as main
+from backend.main import app
+
+
+def _png_bytes(color="white"):
+    img = Image.new("RGB", (100, 100), color=color)
+    buffer = BytesIO()
+    img.save(buffer, format="PNG")
+    return buffer.getvalue()
+
+
+async def _upload(ac, color="white"):
+    response = await ac.post(
+        "/upload", files={"file": ("test.png", _png_bytes(color), "image/png")}
+    )
+    return response.json()["file_id"]
+
+
+async def _batch(ac, body):
+    response = await ac.post("/analyze/batch", json=body)
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    return [json.loads(line) for line in response.text.splitlines()]
+
+
+@pytest.mark.asyncio
+async def test_batch_analyze(tmp_path, monkeypatch):
+    """여러 이미지의 결과가 한 줄씩 반환되고, 없는 파일은 오류 줄이 되는지 테스트."""
+    monkeypatch.setattr("services.file_storage.UPLOAD_ROOT", tmp_path)
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as ac:
+        first = await _upload(ac, "white")
+        second = await _upload(ac, "gray")
+        lines = await _batch(ac, {"file_ids": [first, "missing", second]})
+
+    by_index = {line["index"]: line for line in lines}
+    assert sorted(by_index) == [0, 1, 2]
+    assert by_index[0]["status"] == "completed"
+    assert by_index[0]["result"]["file_id"] == first
+    assert by_index[1]["status"] == "failed"
+    assert by_index[1]["status_code"] == 404
+    assert by_index[2]["result"]["file_id"] == second
+
+
+@pytest.mark.asyncio
+async def test_batch_streams_in_completion_order(tmp_path, monkeypatch):
+    """먼저 끝난 이미지의 결과가 먼저 나오고, 동시 실행 수가 제한되는지 테스트."""
+    monkeypatch.setattr("services.file_storage.UPLOAD_ROOT", tmp_path)
+    running = []
+    peak = []
+
+    async def fake_run_analysis(file_id, file_info, on_progress=None):
+        running.append(file_id)
+        peak.append(len(running))
+        await asyncio.sleep(0.3 if file_id == slow else 0.01)
+        running.remove(file_id)
+        return {"file_id": file_id}
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as ac:
+        slow = await _upload(ac)
+        fast = [await _upload(ac) for _ in range(3)]
+        monkeypatch.setattr(main, "_run_analysis", fake_run_analysis)
+        lines = await _batch(ac, {"file_ids": [slow, *fast], "concurrency": 2})
+
+    assert lines[-1]["file_id"] == slow
+    assert max(peak) == 2
+
+
+@pytest.mark.asyncio
+async def test_batch_validation(tmp_path, monkeypatch):
+    """빈 요청과 너무 큰 요청을 거절하는지 테스트."""
+    monkeypatch.setattr("services.file_storage.UPLOAD_ROOT", tmp_path)
+    monkeypatch.setattr(main, "ANALYZE_BATCH_MAX", 2)
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as ac:
+        empty = await ac.post("/analyze/batch", json={"file_ids": []})
+        too_many = await ac.post("/analyze/batch", json={"file_ids": ["a", "b", "c"]})
+
+    assert empty.status_code == 400
+    assert too_many.status_code == 400
@@ -0,0 +1,153 @@
+"""비동기 분석 작업(job) API 테스트."""
+
+import asyncio
+import json
+from io import BytesIO
+
+import httpx
+import pytest
+from PIL import Image
+
+from analyze.jobs import COMPLETED, FAILED, JobQueue, JobQueueFull
+from backend.main import app
+
+
+def _png_bytes():
+    img = Image.new("RGB", (100, 100), color="white")
+    buffer = BytesIO()
+    img.save(buffer, format="PNG")
+    return buffer.getvalue()
+
+
+async def _fake_analysis(value, delay=0.0, on_progress=None):
+    on_progress({"step": "fake", "status": "started", "index": 0, "total": 1})
+    await asyncio.sleep(delay)
+    if value == "fail":
+        raise RuntimeError("analysis broken")
+    on_progress({"step": "fake", "status": "completed", "index": 0, "total": 1})
+    return {"value": value}
+
+
+async def _wait_finished(job, timeout=5.0):
+    async def wait():
+        async for _ in job.stream():
+            pass
+
+    await asyncio.wait_for(wait(), timeout)
+
+
+class TestJobQueue:
+    """JobQueue 테스트."""
+
+    @pytest.mark.asyncio
+    async def test_job_completes(self):
+        """job이 실행되고 결과와 진행 이벤트가 기록되는지 테스트."""
+        queue = JobQueue(workers=1)
+        try:
+            job = queue.submit(_fake_analysis, "ok", file_id="f")
+            await _wait_finished(job)
+
+            data = queue.get(job.job_id).to_dict()
+            assert data["status"] == COMPLETED
+            assert data["file_id"] == "f"
+            assert data["result"] == {"value": "ok"}
+            assert [p["status"] for p in data["progress"]] == ["started", "completed"]
+        finally:
+            await queue.close()
+
+    @pytest.mark.asyncio
+    async def test_job_failure(self):
+        """실행 중 예외가 job 오류로 기록되는지 테스트."""
+        queue = JobQueue(workers=1)
+        try:
+            job = queue.submit(_fake_analysis, "fail")
+            await _wait_finished(job)
+
+            assert job.status == FAILED
+            assert job.error == "analysis broken"
+        finally:
+            await queue.close()
+
+    @pytest.mark.asyncio
+    async def test_bounded_workers_and_queue(self):
+        """동시 실행 수와 대기 job 수가 제한되는지 테스트."""
+        queue = JobQueue(workers=1, max_queue=1)
+        try:
+            running = queue.submit(_fake_analysis, "a", 0.2)
+            await asyncio.sleep(0.05)
+            waiting = queue.submit(_fake_analysis, "b")
+
+            with pytest.raises(JobQueueFull):
+                queue.submit(_fake_analysis, "c")
+
+            assert running.status == "running"
+            assert waiting.status == "queued"
+            await _wait_finished(waiting)
+            assert running.status == COMPLETED
+        finally:
+            await queue.close()
+
+    @pytest.mark.asyncio
+    async def test_forget_old_jobs(self):
+        """끝난 job은 최근 max_finished개만 보관하는지 테스트."""
+        queue = JobQueue(workers=1, max_finished=1)
+        try:
+            first = queue.submit(_fake_analysis, "a")
+            await _wait_finished(first)
+            second = queue.submit(_fake_analysis, "b")
+            await _wait_finished(second)
+
+            assert queue.get(first.job_id) is None
+            assert queue.get(second.job_id) is second
+        finally:
+            await queue.close()
+
+
+@pytest.mark.asyncio
+async def test_analyze_job_api(tmp_path, monkeypatch):
+    """job 생성 → 진행 이벤트 스트림 → 결과 조회 흐름 테스트."""
+    monkeypatch.setattr("services.file_storage.UPLOAD_ROOT", tmp_path)
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as ac:
+        upload = await ac.post(
+            "/upload", files={"file": ("test.png", _png_bytes(), "image/png")}
+        )
+        file_id = upload.json()["file_id"]
+
+        created = await ac.post("/analyze/jobs", json={"file_id": file_id})
+        assert created.status_code == 202
+        job_id = created.json()["job_id"]
+
+        events = []
+        async with ac.stream("GET", f"/analyze/jobs/{job_id}/events") as response:
+            assert response.headers["content-type"].startswith("text/event-stream")
+            async for line in response.aiter_lines():
+                if line.startswith("event: "):
+                    events.append(line[len("event: ") :])
+                elif line.startswith("data: ") and events[-1] == "done":
+                    done = json.loads(line[len("data: ") :])
+
+        assert events[-1] == "done"
+        assert done["status"] == COMPLETED
+
+        status = await ac.get(f"/analyze/jobs/{job_id}")
+
+    data = status.json()
+    assert data["status"] == COMPLETED
+    assert data["result"]["file_id"] == file_id
+    assert "answer" in data["result"]
+
+
+@pytest.mark.asyncio
+async def test_analyze_job_not_found(tmp_path, monkeypatch):
+    """없는 파일/job 요청 시 404를 반환하는지 테스트."""
+    monkeypatch.setattr("services.file_storage.UPLOAD_ROOT", tmp_path)
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as ac:
+        created = await ac.post("/analyze/jobs", json={"file_id": "missing"})
+        status = await ac.get("/analyze/jobs/missing")
+
+    assert created.status_code == 404
+    assert status.status_code == 404
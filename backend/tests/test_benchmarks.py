@@ -0,0 +1,85 @@
+"""벤치마크 harness 테스트 (작은 해상도로 한 번씩만 실행)."""
+
+import json
+
+import numpy as np
+
+import services.file_storage as file_storage
+from benchmarks.__main__ import main
+from benchmarks.bench import compare, run_benchmarks
+from benchmarks.synthetic import generate_page, resolution
+
+
+class TestSyntheticPage:
+    """합성 페이지 생성 테스트."""
+
+    def test_deterministic(self):
+        first = generate_page(320, 240, seed=1)
+        second = generate_page(320, 240, seed=1)
+
+        assert first.shape == (240, 320, 3)
+        assert first.dtype == np.uint8
+        assert np.array_equal(first, second)
+
+    def test_resolution(self):
+        assert resolution("12mp") == (4032, 3024)
+        assert resolution("640x480") == (640, 480)
+
+
+class TestBenchmarks:
+    """측정 결과 JSON / 기준 비교 테스트."""
+
+    def test_run_result_shape(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(file_storage, "UPLOAD_ROOT", tmp_path / "uploads")
+
+        result = run_benchmarks(
+            ["threshold_remover", "pipeline"], ["320x240"], repeat=2, warmup=0
+        )
+
+        assert [r["case"] for r in result["results"]] == [
+            "threshold_remover",
+            "pipeline",
+        ]
+        for row in result["results"]:
+            assert row["repeat"] == 2
+            assert row["throughput"] > 0
+            assert 0 < row["latency"]["p50"] <= row["latency"]["max"]
+            assert set(row["memory"]) == {"tracemalloc_peak"}
+            assert row["memory"]["tracemalloc_peak"] > 0
+        # JSON으로 저장 가능해야 함
+        json.dumps(result)
+
+    def test_compare_flags_regression(self):
+        def result(p50):
+            return {"results": [{"case": "c", "size": "s", "latency": {"p50": p50}}]}
+
+        rows = compare(result(0.13), result(0.1), threshold=0.2)
+        assert rows[0]["regression"] is True
+        assert (
+            compare(result(0.11), result(0.1), threshold=0.2)[0]["regression"] is False
+        )
+
+    def test_cli_exit_code_with_baseline(self, tmp_path):
+        output = tmp_path / "bench.json"
+        args = ["--cases", "threshold_remover", "--sizes", "320x240", "--repeat", "1"]
+
+        assert main(args + ["--output", str(output)]) == 0
+
+        # 기준 결과를 비현실적으로 빠르게 만들면 회귀로 판정
+        baseline = json.loads(output.read_text())
+        baseline["results"][0]["latency"]["p50"] = 1e-9
+        (tmp_path / "base.json").write_text(json.dumps(baseline))
+        assert main(args + ["--baseline", str(tmp_path / "base.json")]) == 1
+
+    def test_cli_zero_baseline(self, tmp_path, capsys):
+        """기준 p50이 0이면 비율 없이 출력하고 회귀로 보지 않음"""
+        output = tmp_path / "bench.json"
+        args = ["--cases", "threshold_remover", "--sizes", "320x240", "--repeat", "1"]
+        assert main(args + ["--output", str(output)]) == 0
+
+        baseline = json.loads(output.read_text())
+        baseline["results"][0]["latency"]["p50"] = 0.0
+        (tmp_path / "base.json").write_text(json.dumps(baseline))
+
+        assert main(args + ["--baseline", str(tmp_path / "base.json")]) == 0
+        assert "(xn/a)" in capsys.readouterr().out
@@ -0,0 +1,195 @@
+"""분석 결과 캐시 테스트."""
+
+import asyncio
+
+import pytest
+from PIL import Image
+
+from analyze.cache import AnalysisCache, make_cache_key
+from analyze.models import AnalyzeResult, AnswerResult, PipelineContext, PipelineResult
+from analyze.pipeline import AnalyzePipeline
+
+
+def _result(file_id="id", text="42"):
+    analysis = AnalyzeResult(
+        clean_problem_image_url="/files/p",
+        answer=AnswerResult(text=text, confidence=0.9),
+    )
+    context = PipelineContext(
+        file_id=file_id,
+        file_path="x.png",
+        postprocessed={"status": "completed", "result": analysis},
+    )
+    return PipelineResult(file_id=file_id, analysis=analysis, context=context)
+
+
+@pytest.fixture
+def uploads(tmp_path, monkeypatch):
+    """업로드 루트를 임시 디렉토리로 바꿈 (문제 이미지 저장 위치)."""
+    import services.file_storage as file_storage
+
+    root = tmp_path / "uploads"
+    monkeypatch.setattr(file_storage, "UPLOAD_ROOT", root)
+    return root
+
+
+class TestCacheKey:
+    """캐시 키 테스트."""
+
+    def test_same_input_same_key(self):
+        assert make_cache_key("abc", [["s", {"a": 1}]]) == make_cache_key(
+            "abc", [["s", {"a": 1}]]
+        )
+
+    def test_config_changes_key(self):
+        """설정이 바뀌면 키도 바뀌는지 테스트."""
+        assert make_cache_key("abc", {"remover": "threshold"}) != make_cache_key(
+            "abc", {"remover": "morphology"}
+        )
+
+    def test_content_changes_key(self):
+        assert make_cache_key("abc", {}) != make_cache_key("abd", {})
+
+
+class TestAnalysisCache:
+    """AnalysisCache 테스트."""
+
+    def test_get_returns_copy(self):
+        """반환값을 수정해도 캐시된 결과는 바뀌지 않는지 테스트."""
+        cache = AnalysisCache()
+        cache.put("k", _result())
+
+        first = cache.get("k")
+        first.file_id = "changed"
+
+        assert cache.get("k").file_id == "id"
+
+    def test_lru_eviction(self):
+        """최대 항목 수를 넘으면 가장 오래 쓰지 않은 항목이 제거되는지 테스트."""
+        cache = AnalysisCache(max_entries=2)
+        cache.put("a", _result())
+        cache.put("b", _result())
+        cache.get("a")
+        cache.put("c", _result())
+
+        assert cache.get("b") is None
+        assert cache.get("a") is not None
+        assert cache.get("c") is not None
+
+    def test_disk_survives_new_instance(self, tmp_path):
+        """디스크 캐시가 새 인스턴스(재시작)에서도 조회되는지 테스트."""
+        AnalysisCache(disk_dir=tmp_path).put("k", _result(text="7"))
+
+        cached = AnalysisCache(disk_dir=tmp_path).get("k")
+
+        assert cached.analysis.answer.text == "7"
+        assert isinstance(cached.context.postprocessed["result"], AnalyzeResult)
+
+    def test_discard(self, tmp_path):
+        cache = AnalysisCache(disk_dir=tmp_path)
+        cache.put("k", _result())
+        cache.discard("k")
+
+        assert cache.get("k") is None
+
+
+class TestPipelineCache:
+    """AnalyzePipeline 캐시 연동 테스트."""
+
+    @pytest.mark.asyncio
+    async def test_repeat_analyze_hits(self, tmp_path, uploads):
+        """같은 이미지를 다시 분석하면 pipeline을 건너뛰는지 테스트."""
+        image_path = tmp_path / "a.png"
+        Image.new("RGB", (60, 40), color="white").save(image_path)
+        pipeline = AnalyzePipeline(cache=AnalysisCache())
+
+        first = await pipeline.analyze("first", image_path)
+        assert first.context.metadata["cache"] == "miss"
+
+        calls = []
+        original = pipeline._analyze
+
+        async def counting(*args, **kwargs):
+            calls.append(args)
+            return await original(*args, **kwargs)
+
+        pipeline._analyze = counting
+        second = await pipeline.analyze("second", image_path)
+
+        assert calls == []
+        assert second.file_id == "second"
+        assert second.context.metadata["cache"] == "hit"
+        assert second.analysis == first.analysis
+
+    @pytest.mark.asyncio
+    async def test_missing_problem_image_is_miss(self, tmp_path, uploads):
+        """캐시된 문제 이미지가 지워졌으면 다시 분석하는지 테스트."""
+        image_path = tmp_path / "a.png"
+        Image.new("RGB", (60, 40), color="white").save(image_path)
+        pipeline = AnalyzePipeline(cache=AnalysisCache())
+
+        first = await pipeline.analyze("first", image_path)
+        for path in uploads.rglob("*.png"):
+            path.unlink()
+
+        second = await pipeline.analyze("second", image_path)
+
+        assert second.context.metadata["cache"] == "miss"
+        assert (
+            second.context.extracted_problem["problem_file_id"]
+            != first.context.extracted_problem["problem_file_id"]
+        )
+
+    @pytest.mark.asyncio
+    async def test_hit_check_off_event_loop(self, tmp_path, uploads, monkeypatch):
+        """캐시 hit 확인(문제 이미지 조회)을 이벤트 루프 밖에서 하는지 테스트."""
+        import analyze.pipeline as pipeline_module
+
+        image_path = tmp_path / "a.png"
+        Image.new("RGB", (60, 40), color="white").save(image_path)
+        pipeline = AnalyzePipeline(cache=AnalysisCache())
+        await pipeline.analyze("first", image_path)
+
+        threads = []
+        lookup = pipeline_module.get_file_path_by_id
+
+        def recording(file_id):
+            try:
+                asyncio.get_running_loop()
+                threads.append("event loop")
+            except RuntimeError:
+                threads.append("worker")
+            return lookup(file_id)
+
+        monkeypatch.setattr(pipeline_module, "get_file_path_by_id", recording)
+        second = await pipeline.analyze("second", image_path)
+
+        assert second.context.metadata["cache"] == "hit"
+        assert threads == ["worker"]
+
+    @pytest.mark.asyncio
+    async def test_file_check_off_event_loop(self, tmp_path, uploads, monkeypatch):
+        """캐시 키용 파일 확인(is_file)도 이벤트 루프 밖에서 하는지 테스트."""
+        from pathlib import Path
+
+        image_path = tmp_path / "a.png"
+        Image.new("RGB", (60, 40), color="white").save(image_path)
+        pipeline = AnalyzePipeline(cache=AnalysisCache())
+        await pipeline.analyze("first", image_path)
+
+        threads = []
+        is_file = Path.is_file
+
+        def recording(path):
+            try:
+                asyncio.get_running_loop()
+                threads.append("event loop")
+            except RuntimeError:
+                threads.append("worker")
+            return is_file(path)
+
+        monkeypatch.setattr(Path, "is_file", recording)
+        second = await pipeline.analyze("second", image_path)
+
+        assert second.context.metadata["cache"] == "hit"
+        assert threads and "event loop" not in threads
@@ -0,0 +1,234 @@
+"""가상 crop (/crop, 처음 사용할 때 파일로 만들기) 테스트."""
+
+import io
+
+import numpy as np
+import pytest
+from fastapi.testclient import TestClient
+from PIL import Image
+
+from backend.main import app
+from services import file_storage
+from services.file_index import get_file_index
+from services.file_storage import load_region
+
+client = TestClient(app)
+
+
+def _image(width=120, height=90):
+    """위치마다 값이 다른 RGB 이미지 (crop 위치 검증용)."""
+    ys, xs = np.mgrid[0:height, 0:width]
+    return np.stack([xs * 2 % 256, ys * 2 % 256, (xs + ys) % 256], -1).astype(np.uint8)
+
+
+def _encode(array, fmt="PNG"):
+    buffer = io.BytesIO()
+    Image.fromarray(array).save(buffer, format=fmt)
+    return buffer.getvalue()
+
+
+@pytest.fixture
+def uploaded(tmp_path, monkeypatch):
+    """PNG를 업로드하고 (file_id, 원본 배열, 업로드 루트)를 반환."""
+    monkeypatch.setattr("services.file_storage.UPLOAD_ROOT", tmp_path)
+    array = _image()
+    response = client.post(
+        "/upload", files={"file": ("page.png", _encode(array), "image/png")}
+    )
+    return response.json()["file_id"], array, tmp_path
+
+
+def _crop(image_id, x, y, w, h):
+    return client.post(
+        "/crop", json={"image_id": image_id, "crop": {"x": x, "y": y, "w": w, "h": h}}
+    )
+
+
+class TestVirtualCrop:
+    """/crop이 파일 없이 레코드만 만들고, 처음 사용할 때 파일로 만드는지 테스트."""
+
+    def test_crop_is_lazy(self, uploaded):
+        file_id, array, root = uploaded
+
+        response = _crop(file_id, 10, 20, 50, 30)
+
+        assert response.status_code == 200
+        crop_id = response.json()["file_id"]
+        assert response.json()["stored_path"] is None
+        assert not (root / "derived").exists()
+
+        served = client.get(f"/files/{crop_id}")
+
+        assert served.status_code == 200
+        assert served.headers["content-type"] == "image/png"
+        result = np.asarray(Image.open(io.BytesIO(served.content)))
+        assert np.array_equal(result, array[20:50, 10:60])
+
+        # 만든 파일은 인덱스에 기록되어 재사용
+        entry = get_file_index(root).get(crop_id)
+        assert entry["path"].startswith("derived/")
+        assert entry["parent_id"] == file_id
+
+    def test_crop_of_crop_uses_original(self, uploaded):
+        """crop을 다시 자르면 원본 기준 사각형으로 기록 (중간 파일 없음)."""
+        file_id, array, root = uploaded
+        first = _crop(file_id, 10, 20, 80, 60).json()["file_id"]
+
+        second = _crop(first, 5, 5, 20, 10).json()["file_id"]
+
+        entry = get_file_index(root).get(second)
+        assert entry["parent_id"] == file_id
+        assert entry["crop"] == {"x": 15, "y": 25, "w": 20, "h": 10}
+        assert not (root / "derived").exists()
+        served = client.get(f"/files/{second}")
+        result = np.asarray(Image.open(io.BytesIO(served.content)))
+        assert np.array_equal(result, array[25:35, 15:35])
+
+    def test_out_of_bounds(self, uploaded):
+        file_id, _, _ = uploaded
+
+        assert _crop(file_id, 100, 0, 50, 10).status_code == 400
+        assert _crop(file_id, 0, 0, 0, 10).status_code == 400
+
+    def test_non_numeric(self, uploaded):
+        """숫자가 아닌 좌표는 500이 아니라 400."""
+        file_id, _, _ = uploaded
+
+        assert _crop(file_id, "abc", 0, 10, 10).status_code == 400
+
+    def test_missing_parent(self, uploaded):
+        assert _crop("missing", 0, 0, 10, 10).status_code == 404
+
+    def test_rebuild_keeps_virtual_crops(self, uploaded):
+        """재시작 후에도 가상 crop 레코드가 유지됨."""
+        from services.file_index import FileIndex
+
+        file_id, _, root = uploaded
+        crop_id = _crop(file_id, 0, 0, 10, 10).json()["file_id"]
+
+        index = FileIndex(root)
+        index.rebuild()
+
+        assert index.get(crop_id)["crop"] == {"x": 0, "y": 0, "w": 10, "h": 10}
+
+
+class TestAnalyzeCrop:
+    """image_id + crop으로 crop 파일 없이 바로 분석하는 /analyze 테스트."""
+
+    def _analyze(self, image_id, crop, **extra):
+        return client.post(
+            "/analyze", json={"image_id": image_id, "crop": crop, **extra}
+        )
+
+    def test_analyzes_region_in_memory(self, uploaded, monkeypatch):
+        """영역은 원본에서 한 번만 읽고, 분석 중 파일을 다시 decode하지 않음."""
+        file_id, array, root = uploaded
+        reads = []
+        load_region_orig = file_storage.load_region
+        monkeypatch.setattr(
+            "services.file_storage.load_region",
+            lambda *args: reads.append(args) or load_region_orig(*args),
+        )
+
+        def fail(*args, **kwargs):
+            raise AssertionError("crop file decoded")
+
+        monkeypatch.setattr("analyze.image_buffer.decode_image", fail)
+        monkeypatch.setattr("analyze.steps.preprocess._normalize_image", fail)
+
+        response = self._analyze(file_id, {"x": 10, "y": 20, "w": 50, "h": 30})
+
+        assert response.status_code == 200
+        data = response.json()
+        assert data["original_image_id"] == file_id
+        assert data["crop"] == {"x": 10, "y": 20, "w": 50, "h": 30}
+        assert data["problem_image_file_id"] is not None
+        assert len(reads) == 1
+
+        # crop 파일은 응답 후 백그라운드에서 이미 읽은 영역으로 저장됨
+        entry = get_file_index(root).get(data["file_id"])
+        assert entry["parent_id"] == file_id
+        assert entry["path"].startswith("derived/")
+        assert len(reads) == 1
+        served = client.get(f"/files/{data['file_id']}")
+        result = np.asarray(Image.open(io.BytesIO(served.content)))
+        assert np.array_equal(result, array[20:50, 10:60])
+
+    def test_crop_skips_geometry(self, uploaded, monkeypatch):
+        """crop 분석(바로 분석 / 저장된 crop의 file_id)은 기하 보정을 하지 않음."""
+        file_id, _, _ = uploaded
+
+        def fail(*args, **kwargs):
+            raise AssertionError("geometry corrected on a crop")
+
+        monkeypatch.setattr("analyze.steps.preprocess.correct_document_geometry", fail)
+        crop = {"x": 0, "y": 0, "w": 40, "h": 40}
+
+        fused = self._analyze(file_id, crop)
+        crop_id = client.post("/crop", json={"image_id": file_id, "crop": crop})
+        separate = client.post("/analyze", json={"file_id": crop_id.json()["file_id"]})
+
+        assert fused.status_code == 200
+        assert separate.status_code == 200
+
+    def test_without_persist(self, uploaded):
+        """persist_crop=False면 파일 없이 가상 crop으로만 남음."""
+        file_id, array, root = uploaded
+
+        response = self._analyze(
+            file_id, {"x": 0, "y": 0, "w": 40, "h": 40}, persist_crop=False
+        )
+
+        assert response.status_code == 200
+        crop_id = response.json()["file_id"]
+        assert "path" not in get_file_index(root).get(crop_id)
+        assert not (root / "derived").exists()
+        # 나중에 필요하면 처음 사용할 때 파일로 만들어짐
+        assert client.get(f"/files/{crop_id}").status_code == 200
+
+    @pytest.mark.parametrize(
+        "image_id, crop, status",
+        [
+            ("missing", {"x": 0, "y": 0, "w": 5, "h": 5}, 404),
+            (None, {"x": 100, "y": 0, "w": 50, "h": 5}, 400),
+            (None, {"x": 0, "y": 0, "w": 0, "h": 5}, 400),
+            (None, {"x": "abc", "y": 0, "w": 5, "h": 5}, 400),
+            (None, {"x": 0, "y": 0, "w": "wide", "h": 5}, 400),
+        ],
+    )
+    def test_invalid_requests(self, uploaded, image_id, crop, status):
+        file_id, _, _ = uploaded
+
+        assert self._analyze(image_id or file_id, crop).status_code == status
+
+    def test_requires_file_id_or_crop(self):
+        assert client.post("/analyze", json={}).status_code == 400
+
+
+class TestLoadRegion:
+    """영역만 읽기 테스트."""
+
+    @pytest.mark.parametrize("fmt, suffix", [("PNG", ".png"), ("JPEG", ".jpg")])
+    def test_matches_full_decode(self, tmp_path, fmt, suffix):
+        path = tmp_path / f"page{suffix}"
+        path.write_bytes(_encode(_image(300, 200), fmt))
+        crop = {"x": 40, "y": 30, "w": 100, "h": 80}
+
+        region = load_region(path, crop)
+
+        with Image.open(path) as img:
+            expected = np.asarray(img.crop((40, 30, 140, 110)))
+        assert region.size == (100, 80)
+        assert np.array_equal(np.asarray(region), expected)
+
+    @pytest.mark.parametrize("fmt, suffix", [("PNG", ".png"), ("JPEG", ".jpg")])
+    def test_region_at_bottom_edge(self, tmp_path, fmt, suffix):
+        """이미지 아래쪽 끝까지 닿는 영역도 전체 decode 결과와 같아야 함"""
+        path = tmp_path / f"page{suffix}"
+        path.write_bytes(_encode(_image(300, 200), fmt))
+
+        region = load_region(path, {"x": 0, "y": 120, "w": 300, "h": 80})
+
+        with Image.open(path) as img:
+            expected = np.asarray(img.crop((0, 120, 300, 200)))
+        assert np.array_equal(np.asarray(region), expected)
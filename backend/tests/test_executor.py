@@ -0,0 +1,147 @@
+"""PipelineExecutor 테스트 - blocking 작업을 이벤트 루프 밖에서 실행."""
+
+import asyncio
+import time
+from io import BytesIO
+
+import httpx
+import numpy as np
+import pytest
+from PIL import Image
+
+from analyze.executor import PipelineExecutor
+from analyze.steps.image_processing import ThresholdBasedRemover
+from backend.main import app
+
+
+def _sum_array(array: np.ndarray, offset: int) -> int:
+    """Worker에서 실행할 함수 (process pool을 위해 모듈 수준)."""
+    return int(array.sum()) + offset
+
+
+def _identity(array: np.ndarray) -> np.ndarray:
+    return array
+
+
+def _slow_sum(array: np.ndarray, delay: float) -> int:
+    """attach 후 잠시 기다렸다가 배열을 읽음 (취소 중 cleanup 검증용)."""
+    time.sleep(delay)
+    return int(array.sum())
+
+
+class TestPipelineExecutor:
+    """PipelineExecutor 테스트."""
+
+    @pytest.mark.asyncio
+    async def test_thread_executor(self):
+        """Thread pool에서 함수가 실행되는지 테스트."""
+        executor = PipelineExecutor(kind="thread", max_workers=2)
+        try:
+            array = np.ones((10, 10), dtype=np.uint8)
+            assert await executor.run(_sum_array, array, 1) == 101
+        finally:
+            executor.shutdown()
+
+    @pytest.mark.asyncio
+    async def test_process_executor_shared_array(self):
+        """Process pool에 numpy 배열이 shared memory로 전달되는지 테스트."""
+        executor = PipelineExecutor(kind="process", max_workers=1)
+        try:
+            array = np.arange(1000, dtype=np.int64).reshape(10, 100)
+            assert await executor.run(_sum_array, array, 0) == int(array.sum())
+
+            # 입력 버퍼를 그대로 반환해도 안전하게 복사되어야 함
+            result = await executor.run(_identity, array)
+            np.testing.assert_array_equal(result, array)
+        finally:
+            executor.shutdown()
+
+    @pytest.mark.asyncio
+    async def test_cancel_keeps_segments_until_worker_done(self, monkeypatch):
+        """기다리던 task가 취소되어도 worker가 끝날 때까지 segment를 해제하지 않음."""
+        from analyze import executor as executor_module
+
+        released = []
+        release = executor_module._release_segments
+        monkeypatch.setattr(
+            executor_module,
+            "_release_segments",
+            lambda segments: released.append(len(segments)) or release(segments),
+        )
+        executor = PipelineExecutor(kind="process", max_workers=1)
+        try:
+            # worker 프로세스를 미리 띄움
+            await executor.run(_sum_array, np.ones(4), 0)
+            released.clear()
+
+            task = asyncio.create_task(executor.run(_slow_sum, np.ones(1000), 0.5))
+            await asyncio.sleep(0.2)
+            task.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await task
+
+            assert released == []
+            for _ in range(50):
+                if released:
+                    break
+                await asyncio.sleep(0.05)
+            assert released == [1]
+        finally:
+            executor.shutdown()
+
+    def test_invalid_kind(self):
+        """잘못된 executor 종류 테스트."""
+        with pytest.raises(ValueError, match="Invalid executor kind"):
+            PipelineExecutor(kind="gpu")
+
+
+def _png_bytes():
+    img = Image.new("RGB", (100, 100), color="white")
+    buffer = BytesIO()
+    img.save(buffer, format="PNG")
+    return buffer.getvalue()
+
+
+@pytest.mark.asyncio
+async def test_files_latency_flat_while_analyze_saturated(tmp_path, monkeypatch):
+    """/analyze가 몰려도 /files 응답 시간이 늘어나지 않는지 테스트."""
+    monkeypatch.setattr("services.file_storage.UPLOAD_ROOT", tmp_path)
+
+    # 필기 제거를 느린 blocking 작업으로 만듦 (큰 사진 처리 시뮬레이션)
+    original_remove = ThresholdBasedRemover.remove
+
+    def slow_remove(self, image):
+        time.sleep(0.5)
+        return original_remove(self, image)
+
+    monkeypatch.setattr(ThresholdBasedRemover, "remove", slow_remove)
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as ac:
+        upload = await ac.post(
+            "/upload", files={"file": ("test.png", _png_bytes(), "image/png")}
+        )
+        file_id = upload.json()["file_id"]
+
+        analyze_tasks = [
+            asyncio.create_task(ac.post("/analyze", json={"file_id": file_id}))
+            for _ in range(4)
+        ]
+        await asyncio.sleep(0.05)
+
+        latencies = []
+        for _ in range(5):
+            start = time.perf_counter()
+            response = await ac.get(f"/files/{file_id}")
+            latencies.append(time.perf_counter() - start)
+            assert response.status_code == 200
+            await asyncio.sleep(0.02)
+
+        # /files를 읽는 동안 /analyze는 아직 처리 중이어야 의미 있는 측정
+        assert not all(task.done() for task in analyze_tasks)
+
+        results = await asyncio.gather(*analyze_tasks)
+
+    assert all(r.status_code == 200 for r in results)
+    # 이벤트 루프가 막혔다면 최소 0.5초씩 걸림
+    assert max(latencies) < 0.25
@@ -170,3 +170,87 @@ class TestExtractProblemIntegration:
 
         # 크기는 같아야 함
         assert original_img.size == processed_img.size
+
+    @pytest.mark.asyncio
+    async def test_cascade_records_stage(self, tmp_path, monkeypatch):
+        """remover_level=0 (cascade)은 실제로 사용한 단계를 결과에 기록."""
+        monkeypatch.setattr("services.file_storage.UPLOAD_ROOT", tmp_path / "uploads")
+        from analyze.steps.extract_problem import ExtractProblemStep
+        from analyze.models import PipelineContext
+        from benchmarks.synthetic import generate_page
+
+        test_image_path = tmp_path / "page.png"
+        Image.fromarray(generate_page(640, 480, seed=2, strokes=30)[:, :, ::-1]).save(
+            test_image_path
+        )
+        context = PipelineContext(file_id="test-id", file_path=test_image_path)
+
+        result = await ExtractProblemStep(remover_level=0).execute(context)
+
+        removal = result.extracted_problem["removal"]
+        assert removal["stage"] == 2
+        assert removal["escalated"] is True
+        assert result.extracted_problem["separation_method"] == "morphology_based"
+        assert [a["method"] for a in removal["stages"]] == [
+            "grayscale_adaptive_threshold",
+            "morphology_based",
+        ]
+
+
+class TestSaveProblemImage:
+    """문제 이미지 저장 형식 테스트."""
+
+    @pytest.fixture
+    def bilevel(self):
+        """필기 제거 결과 같은 흑백 이미지."""
+        image = np.full((120, 200), 255, dtype=np.uint8)
+        image[30:60, 20:180] = 0
+        image[80:90, ::7] = 0
+        return image
+
+    def test_bilevel_saved_as_1bit_png(self, tmp_path, bilevel):
+        """흑백 결과는 확장자가 .jpg여도 1-bit PNG로 손실 없이 저장."""
+        from analyze.steps.extract_problem import save_problem_image
+
+        saved = save_problem_image(bilevel, str(tmp_path / "problem.jpg"))
+
+        path = Path(saved["path"])
+        assert path.suffix == ".png"
+        assert saved["bilevel"] is True
+        assert saved["content_type"] == "image/png"
+        assert saved["size"] == path.stat().st_size
+        with Image.open(path) as img:
+            assert img.mode == "1"
+            assert np.array_equal(np.asarray(img.convert("L")), bilevel)
+
+    def test_grayscale_keeps_extension(self, tmp_path, bilevel):
+        """회색조가 있는 결과는 원래 확장자 형식으로 저장."""
+        from analyze.steps.extract_problem import save_problem_image
+
+        bilevel[0, 0] = 128
+        saved = save_problem_image(bilevel, str(tmp_path / "problem.jpg"))
+
+        assert saved["path"].endswith(".jpg")
+        assert saved["bilevel"] is False
+
+    @pytest.mark.asyncio
+    async def test_step_registers_png(self, tmp_path, monkeypatch):
+        """JPEG 입력이어도 흑백 문제 이미지는 image/png로 등록."""
+        monkeypatch.setattr("services.file_storage.UPLOAD_ROOT", tmp_path / "uploads")
+        from analyze.steps.extract_problem import ExtractProblemStep
+        from analyze.models import PipelineContext
+        from services.file_storage import get_file_info_by_id
+
+        image_path = tmp_path / "photo.jpg"
+        Image.new("RGB", (100, 80), color="white").save(image_path)
+        context = PipelineContext(file_id="test-id", file_path=image_path)
+
+        result = await ExtractProblemStep().execute(context)
+
+        problem = result.extracted_problem
+        info = get_file_info_by_id(problem["problem_file_id"])
+        assert problem["bilevel"] is True
+        assert problem["problem_image_path"].endswith(".png")
+        assert info["content_type"] == "image/png"
+        assert info["path"] == Path(problem["problem_image_path"])
+        assert info["path"].is_relative_to(tmp_path / "uploads")
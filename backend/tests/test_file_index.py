@@ -0,0 +1,104 @@
+"""file_id 인덱스 테스트."""
+
+from services.file_index import FileIndex, get_file_index
+from services.file_storage import get_file_info_by_id, get_file_path_by_id
+
+
+def _write(path, data=b"data"):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(data)
+    return path
+
+
+class TestFileIndex:
+    """FileIndex 테스트."""
+
+    def test_add_and_get(self, tmp_path):
+        """등록한 파일을 조회할 수 있는지 테스트."""
+        index = FileIndex(tmp_path)
+        path = _write(tmp_path / "2024-01-01" / "abc.png", b"12345")
+
+        index.add("abc", path)
+
+        entry = index.get("abc")
+        assert entry["path"] == "2024-01-01/abc.png"
+        assert entry["size"] == 5
+        assert entry["content_type"] == "image/png"
+        assert index.resolve(entry) == path
+
+    def test_get_missing(self, tmp_path):
+        """없는 file_id는 None을 반환하는지 테스트."""
+        index = FileIndex(tmp_path)
+        assert index.get("missing") is None
+
+    def test_rebuild_from_log(self, tmp_path):
+        """새 인스턴스가 로그로부터 인덱스를 복원하는지 테스트."""
+        path = _write(tmp_path / "2024-01-01" / "abc.jpg")
+        FileIndex(tmp_path).add("abc", path, content_type="image/jpeg")
+
+        index = FileIndex(tmp_path)
+        index.rebuild()
+
+        assert index.get("abc")["content_type"] == "image/jpeg"
+
+    def test_rebuild_scans_unindexed_files(self, tmp_path):
+        """로그에 없는 기존 파일을 시작 시 보충하는지 테스트."""
+        _write(tmp_path / "2024-01-01" / "old.png")
+
+        index = FileIndex(tmp_path)
+        index.rebuild()
+
+        assert index.get("old")["path"] == "2024-01-01/old.png"
+        # 보충된 레코드는 로그에도 기록됨
+        assert "old" in (tmp_path / ".file_index.jsonl").read_text()
+
+    def test_rebuild_skips_blobs_and_tmp(self, tmp_path):
+        """blob 저장소와 임시 디렉토리는 file_id로 보충하지 않는지 테스트."""
+        _write(tmp_path / "blobs" / "ab" / "abcdef.png")
+        _write(tmp_path / ".tmp" / "tmpxyz")
+
+        index = FileIndex(tmp_path)
+        index.rebuild()
+
+        assert len(index) == 0
+
+    def test_rebuild_drops_deleted_files(self, tmp_path):
+        """디스크에서 사라진 파일은 인덱스에서 제거되는지 테스트."""
+        path = _write(tmp_path / "2024-01-01" / "gone.png")
+        FileIndex(tmp_path).add("gone", path)
+        path.unlink()
+
+        index = FileIndex(tmp_path)
+        index.rebuild()
+
+        assert index.get("gone") is None
+
+    def test_sees_records_from_other_writer(self, tmp_path):
+        """다른 프로세스(인스턴스)가 추가한 레코드를 조회할 수 있는지 테스트."""
+        reader = FileIndex(tmp_path)
+        reader.rebuild()
+        writer = FileIndex(tmp_path)
+
+        path = _write(tmp_path / "2024-01-01" / "new.png")
+        writer.add("new", path)
+
+        assert reader.get("new") is not None
+
+
+class TestFileStorageLookup:
+    """file_storage 조회 함수 테스트."""
+
+    def test_lookup_does_not_scan(self, tmp_path, monkeypatch):
+        """조회가 디렉토리 스캔 없이 인덱스로 처리되는지 테스트."""
+        path = _write(tmp_path / "2024-01-01" / "abc.png")
+        index = get_file_index(tmp_path)
+        index.add("abc", path)
+
+        def fail_scan():
+            raise AssertionError("directory scan on lookup")
+
+        monkeypatch.setattr(index, "_scan_disk", fail_scan)
+
+        assert get_file_path_by_id("abc", tmp_path) == path
+        assert get_file_info_by_id("abc", tmp_path)["size"] == 4
+        assert get_file_path_by_id("missing", tmp_path) is None
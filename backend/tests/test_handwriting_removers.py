@@ -1,5 +1,8 @@
 """HandwritingRemover 전략 패턴 테스트."""
 
+import tracemalloc
+
+import cv2
 import pytest
 import numpy as np
 from PIL import Image
@@ -7,7 +10,13 @@ from analyze.steps.image_processing import (
     ThresholdBasedRemover,
     MorphologyBasedRemover,
     AIBasedRemover,
+    CascadeRemover,
+    component_features,
+    detect_answer_regions,
+    removal_statistics,
+    remove_handwriting_from_pil,
 )
+from benchmarks.synthetic import generate_gray_page, generate_page
 
 
 class TestThresholdBasedRemover:
@@ -52,6 +61,52 @@ class TestThresholdBasedRemover:
         result = remover.remove(test_img)
         assert isinstance(result, np.ndarray)
 
+    def test_matches_reference_and_keeps_input(self, remover):
+        """in-place hot path 결과가 단계별 계산과 같고 입력을 수정하지 않음."""
+        gray = generate_gray_page(320, 240, seed=3)
+        original = gray.copy()
+        binary = cv2.adaptiveThreshold(
+            gray, 255, cv2.ADAPTIVE_THRESH_GAUSSIAN_C, cv2.THRESH_BINARY_INV, 11, 2
+        )
+        opened = cv2.morphologyEx(binary, cv2.MORPH_OPEN, np.ones((3, 3), np.uint8))
+        expected = cv2.bitwise_not(opened)
+
+        result = remover.remove(gray)
+
+        assert np.array_equal(result, expected)
+        assert np.array_equal(gray, original)
+        assert result is not gray
+
+    def test_out_buffer_reused(self, remover):
+        """out 버퍼를 넘기면 그 버퍼에 결과를 씀."""
+        gray = generate_gray_page(320, 240, seed=3)
+        out = np.empty_like(gray)
+
+        result = remover.remove(gray, out=out)
+
+        assert result is out
+        assert np.array_equal(out, remover.remove(gray))
+
+    def test_kernel_cached(self, remover):
+        """structuring element는 한 번만 만들고, 크기가 바뀌면 다시 만듦."""
+        assert remover.kernel is remover.kernel
+        remover.noise_kernel_size = 5
+        assert remover.kernel.shape == (5, 5)
+
+    def test_memory_bound(self, remover):
+        """Grayscale 입력 기준 할당량이 문서화된 상한 이내."""
+        gray = generate_gray_page(640, 480)
+        remover.remove(gray)  # warmup
+
+        tracemalloc.start()
+        try:
+            remover.remove(gray)
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+
+        assert peak <= remover.PEAK_BYTES_PER_PIXEL * gray.size
+
 
 class TestMorphologyBasedRemover:
     """MorphologyBasedRemover (Level 2) 테스트."""
@@ -68,19 +123,103 @@ class TestMorphologyBasedRemover:
         img[40:60, 40:60] = [0, 0, 0]
         return img
 
-    def test_remove_fallback(self, remover, test_image):
-        """현재는 fallback으로 동작하는지 테스트."""
+    @pytest.fixture
+    def worksheet(self):
+        """인쇄 텍스트 + 연필(옅은 회색) + 색연필(빨강) 획. (BGR, 인쇄 mask)"""
+        img = np.full((200, 400, 3), 245, dtype=np.uint8)
+        cv2.putText(
+            img, "x + 2 = 5", (20, 60), cv2.FONT_HERSHEY_SIMPLEX, 1.2, (20, 20, 20), 2
+        )
+        printed = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY) < 128
+        # 인쇄 글자와 떨어진 곳의 손글씨
+        curve = np.array([[40, 150], [90, 120], [140, 170], [190, 110], [240, 160]])
+        cv2.polylines(img, [curve], False, (160, 160, 160), 3, cv2.LINE_AA)
+        cv2.line(img, (260, 180), (380, 100), (40, 40, 210), 5, cv2.LINE_AA)
+        return img, printed
+
+    def test_remove_basic(self, remover, test_image):
+        """기본 필기 제거 테스트."""
         result = remover.remove(test_image)
         assert isinstance(result, np.ndarray)
         assert len(result.shape) == 2
+        assert result.dtype == np.uint8
+
+    def test_removes_handwriting_keeps_print(self, remover, worksheet):
+        """연필 / 색연필 획은 지우고 인쇄 텍스트는 남김."""
+        img, printed = worksheet
+
+        ink = remover.remove(img) < 128
+
+        assert ink[printed].mean() > 0.9
+        assert not ink[100:, :].any()
+
+    def test_keeps_print_crossed_by_colored_pencil(self, remover, worksheet):
+        """색연필이 인쇄 글자를 가로질러 한 요소로 붙어도 인쇄 잉크는 남김."""
+        img, printed = worksheet
+        covered = np.zeros(printed.shape, dtype=np.uint8)
+        cv2.line(covered, (10, 40), (300, 55), 255, 8)
+        cv2.line(img, (10, 40), (300, 55), (40, 40, 210), 4, cv2.LINE_AA)
+
+        ink = remover.remove(img) < 128
+
+        # 색연필에 덮인 픽셀은 제외하고 비교
+        assert ink[printed & (covered == 0)].mean() > 0.9
+        assert not ink[100:, :].any()
+
+    def test_proxy_analysis_for_large_images(self, worksheet):
+        """analysis_max_pixels보다 큰 이미지는 proxy에서 분류하고 원본 크기로 반환."""
+        img, printed = worksheet
+        img = cv2.resize(img, None, fx=4, fy=4, interpolation=cv2.INTER_LINEAR)
+        printed = cv2.resize(printed.astype(np.uint8), None, fx=4, fy=4) > 0
+        remover = MorphologyBasedRemover(analysis_max_pixels=200 * 400)
+
+        result = remover.remove(img)
+
+        assert result.shape == img.shape[:2]
+        ink = result < 128
+        assert ink[printed].mean() > 0.8
+        assert not ink[400:, :].any()
+
+    def test_grayscale_input(self, remover, worksheet):
+        """Grayscale 입력도 처리 (채도 특징 없이)."""
+        img, printed = worksheet
+
+        ink = remover.remove(cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)) < 128
+
+        assert ink[printed].mean() > 0.9
 
     def test_get_method_name(self, remover):
         """방법 이름 반환 테스트."""
         assert remover.get_method_name() == "morphology_based"
 
     def test_get_confidence(self, remover):
-        """신뢰도 반환 테스트 (아직 구현되지 않음)."""
-        assert remover.get_confidence() == 0.0
+        """신뢰도 반환 테스트."""
+        assert remover.get_confidence() == 0.8
+
+
+class TestComponentFeatures:
+    """연결 요소 특징 (vectorized) 테스트."""
+
+    def test_shape_features(self):
+        """수평 막대 / 대각선 / 두께가 변하는 획의 특징."""
+        binary = np.zeros((200, 300), dtype=np.uint8)
+        binary[20:26, 20:180] = 255  # 수평 막대
+        cv2.line(binary, (20, 60), (140, 180), 255, 3)  # 대각선
+        cv2.line(binary, (200, 40), (220, 180), 255, 2)  # 얇은 부분
+        cv2.line(binary, (220, 180), (240, 40), 255, 12)  # 굵은 부분 (붙어 있음)
+        gray = np.where(binary > 0, 40, 240).astype(np.uint8)
+
+        features = component_features(binary, gray)
+
+        labels = features["labels"]
+        bar, diagonal, uneven = labels[22, 100], labels[120, 80], labels[180, 220]
+        assert features["count"] == 4
+        assert features["slant"][bar] < 1
+        assert features["elongation"][bar] > 10
+        assert features["slant"][diagonal] > 40
+        assert features["width_cv"][uneven] > features["width_cv"][bar]
+        assert features["intensity"][bar] == pytest.approx(40)
+        assert features["area"][bar] == 6 * 160
 
 
 class TestAIBasedRemover:
@@ -99,7 +238,7 @@ class TestAIBasedRemover:
         return img
 
     def test_remove_fallback(self, remover, test_image):
-        """현재는 fallback으로 동작하는지 테스트."""
+        """모델이 없으면 fallback으로 동작하는지 테스트."""
         result = remover.remove(test_image)
         assert isinstance(result, np.ndarray)
         assert len(result.shape) == 2
@@ -109,8 +248,90 @@ class TestAIBasedRemover:
         assert remover.get_method_name() == "ai_based"
 
     def test_get_confidence(self, remover):
-        """신뢰도 반환 테스트 (아직 구현되지 않음)."""
-        assert remover.get_confidence() == 0.0
+        """신뢰도 반환 테스트 (모델이 없으면 Level 2 fallback의 신뢰도)."""
+        assert not remover.is_available()
+        assert remover.get_confidence() == MorphologyBasedRemover().get_confidence()
+
+    def test_get_confidence_unloadable_model(self, tmp_path, test_image):
+        """모델 파일이 있어도 로드할 수 없으면 fallback의 신뢰도."""
+        model_path = tmp_path / "broken.onnx"
+        model_path.write_bytes(b"not an onnx model")
+        remover = AIBasedRemover(model_path=str(model_path), backend="opencv")
+
+        assert remover.is_available()
+        assert remover.get_confidence() == MorphologyBasedRemover().get_confidence()
+        assert np.array_equal(
+            remover.remove(test_image), MorphologyBasedRemover().remove(test_image)
+        )
+
+
+class TestCascadeRemover:
+    """CascadeRemover (품질 기반 단계 상승) 테스트."""
+
+    @pytest.fixture
+    def remover(self):
+        """CascadeRemover 인스턴스."""
+        return CascadeRemover()
+
+    def test_clean_page_stays_on_level1(self, remover):
+        """필기가 없는 페이지는 Level 1 결과를 그대로 사용."""
+        page = generate_page(800, 600, seed=1, strokes=0)
+
+        result, info = remover.remove_with_info(page)
+
+        assert info["stage"] == 1
+        assert info["escalated"] is False
+        assert info["method"] == "grayscale_adaptive_threshold"
+        assert np.array_equal(
+            result,
+            ThresholdBasedRemover().remove(cv2.cvtColor(page, cv2.COLOR_BGR2GRAY)),
+        )
+
+    def test_handwritten_page_escalates(self, remover):
+        """Level 1 결과에 필기가 남으면 Level 2로 올림."""
+        page = generate_page(800, 600, seed=1, strokes=40)
+
+        result, info = remover.remove_with_info(page)
+
+        assert info["stage"] == 2
+        assert info["method"] == "morphology_based"
+        assert not info["stages"][0]["passed"]
+        assert np.array_equal(result, MorphologyBasedRemover().remove(page))
+        assert 0.0 < info["confidence"] <= MorphologyBasedRemover().get_confidence()
+
+    def test_last_stage_used_even_if_failing(self):
+        """마지막 단계는 품질 기준과 관계없이 사용."""
+        remover = CascadeRemover(
+            stages=[ThresholdBasedRemover()], max_large_ink_ratio=-1
+        )
+
+        _, info = remover.remove_with_info(generate_page(320, 240, strokes=0))
+
+        assert info["stage"] == 1
+        assert not info["stages"][0]["passed"]
+
+    def test_ai_stage_only_with_model(self):
+        """모델이 없는 AIBasedRemover는 단계에 넣지 않음."""
+        remover = CascadeRemover(ai_remover=AIBasedRemover())
+
+        assert len(remover.stages) == 2
+        assert remover.get_method_name() == "cascade"
+        assert [c["method"] for c in remover.get_config()["stages"]] == [
+            "grayscale_adaptive_threshold",
+            "morphology_based",
+        ]
+
+    def test_removal_statistics(self):
+        """글자 크기 요소만 있으면 large_ink_ratio 0, 긴 획은 비율에 반영."""
+        result = np.full((200, 300), 255, dtype=np.uint8)
+        for x in range(20, 280, 20):
+            result[20:30, x : x + 8] = 0
+        assert removal_statistics(result)["large_ink_ratio"] == 0.0
+
+        result[100:104, 10:290] = 0
+        statistics = removal_statistics(result)
+        assert statistics["large_ink_ratio"] > 0.5
+        assert statistics["components"] == 14
 
 
 class TestRemoverStrategy:
@@ -122,6 +343,7 @@ class TestRemoverStrategy:
             ThresholdBasedRemover(),
             MorphologyBasedRemover(),
             AIBasedRemover(),
+            CascadeRemover(),
         ]
 
         test_img = np.ones((50, 50, 3), dtype=np.uint8) * 255
@@ -138,3 +360,61 @@ class TestRemoverStrategy:
 
             confidence = remover.get_confidence()
             assert 0.0 <= confidence <= 1.0
+
+    def test_pil_helper_uses_remover_plane(self):
+        """PIL helper는 Grayscale remover에 RGB → Gray를 한 번만 적용."""
+        rgb = generate_gray_page(160, 120)
+        rgb = np.stack([rgb] * 3, axis=-1)
+        remover = ThresholdBasedRemover()
+
+        result = remove_handwriting_from_pil(Image.fromarray(rgb), remover)
+
+        expected = remover.remove(cv2.cvtColor(rgb, cv2.COLOR_RGB2GRAY))
+        assert np.array_equal(np.asarray(result), expected)
+
+
+class TestDetectAnswerRegions:
+    """손글씨 답 후보 영역 감지 테스트."""
+
+    @staticmethod
+    def _page(scale=1):
+        """인쇄 문제 줄 + 연필로 쓴 답 "42" (BGR, 답 위치)."""
+        img = np.full((480 * scale, 640 * scale, 3), 245, dtype=np.uint8)
+        for i in range(5):
+            cv2.putText(
+                img,
+                f"({i + 1}) x + {i} = {2 * i + 3}",
+                (30 * scale, (60 + 80 * i) * scale),
+                cv2.FONT_HERSHEY_SIMPLEX,
+                scale,
+                (20, 20, 20),
+                2 * scale,
+            )
+        cv2.putText(
+            img,
+            "42",
+            (450 * scale, 220 * scale),
+            cv2.FONT_HERSHEY_SCRIPT_SIMPLEX,
+            1.5 * scale,
+            (160, 160, 160),
+            3 * scale,
+            cv2.LINE_AA,
+        )
+        return img, (450 * scale, 200 * scale)
+
+    @pytest.mark.parametrize("scale", [1, 4])
+    def test_finds_pencil_answer(self, scale):
+        """연필 답 위치를 원본 좌표 box로 반환 (큰 이미지는 proxy에서 분석)."""
+        img, (x, y) = self._page(scale)
+
+        regions = detect_answer_regions(img, analysis_max_pixels=400_000)
+
+        assert len(regions) == 1
+        box = regions[0]
+        assert box["x"] <= x < box["x"] + box["width"]
+        assert box["y"] <= y < box["y"] + box["height"]
+        assert box["width"] * box["height"] < img.shape[0] * img.shape[1] / 20
+
+    def test_printed_only_page(self):
+        """인쇄 텍스트만 있으면 후보 없음."""
+        assert detect_answer_regions(generate_page(800, 600, strokes=0)) == []
@@ -0,0 +1,205 @@
+"""ImageBuffer 테스트 - 분석당 1회 디코딩 및 plane 캐시."""
+
+import numpy as np
+import pytest
+from PIL import Image
+
+import analyze.image_buffer as image_buffer
+import analyze.steps.preprocess as preprocess
+from analyze.image_buffer import ImageBuffer
+from analyze.models import PipelineContext
+from analyze.pipeline import AnalyzePipeline
+
+
+@pytest.fixture
+def decode_counter(monkeypatch):
+    """decode_image 호출 횟수를 센다."""
+    calls = []
+    original_decode = image_buffer.decode_image
+
+    def counting_decode(path):
+        calls.append(path)
+        return original_decode(path)
+
+    monkeypatch.setattr(image_buffer, "decode_image", counting_decode)
+    return calls
+
+
+@pytest.fixture
+def rgb_image_path(tmp_path):
+    path = tmp_path / "rgb.png"
+    img = Image.new("RGB", (60, 40), color="white")
+    img.putpixel((10, 10), (255, 0, 0))
+    img.save(path)
+    return path
+
+
+class TestImageBuffer:
+    """ImageBuffer 테스트."""
+
+    def test_lazy_decode_once(self, rgb_image_path, decode_counter):
+        """여러 plane을 요청해도 디코딩은 1회만 일어나는지 테스트."""
+        buf = ImageBuffer(rgb_image_path)
+        assert decode_counter == []
+
+        assert buf.original.shape == (40, 60, 3)
+        assert buf.gray.shape == (40, 60)
+        assert buf.bgr.shape == (40, 60, 3)
+        assert buf.gray is buf.gray
+
+        assert len(decode_counter) == 1
+
+    def test_bgr_channel_order(self, rgb_image_path):
+        """BGR plane의 채널 순서 테스트."""
+        buf = ImageBuffer(rgb_image_path)
+        assert tuple(buf.original[10, 10]) == (255, 0, 0)
+        assert tuple(buf.bgr[10, 10]) == (0, 0, 255)
+
+    def test_grayscale_source_shares_plane(self, tmp_path):
+        """Grayscale 원본이면 gray plane이 복사 없이 공유되는지 테스트."""
+        path = tmp_path / "gray.png"
+        Image.new("L", (20, 10), color=128).save(path)
+
+        buf = ImageBuffer(path)
+        assert buf.gray is buf.original
+        assert buf.width == 20
+        assert buf.height == 10
+
+    def test_derive_cached(self, rgb_image_path):
+        """파생 plane이 1회만 계산되는지 테스트."""
+        buf = ImageBuffer(rgb_image_path)
+        calls = []
+
+        def inverted(b):
+            calls.append(1)
+            return 255 - b.gray
+
+        first = buf.derive("inverted", inverted)
+        second = buf.derive("inverted", inverted)
+
+        assert first is second
+        assert len(calls) == 1
+        assert buf.get("inverted") is first
+
+    def test_unknown_plane(self, rgb_image_path):
+        """없는 plane 요청 테스트."""
+        with pytest.raises(KeyError):
+            ImageBuffer(rgb_image_path).get("missing")
+
+    def test_preloaded_original(self, tmp_path, decode_counter):
+        """이미 디코딩된 배열로 만들면 디코딩하지 않는지 테스트."""
+        array = np.zeros((5, 5), dtype=np.uint8)
+        buf = ImageBuffer(tmp_path / "unused.png", original=array)
+        assert buf.gray is array
+        assert decode_counter == []
+
+    def test_different_planes_computed_in_parallel(self, tmp_path):
+        """다른 plane 계산은 서로를 기다리지 않고, 같은 plane은 한 번만 계산."""
+        import threading
+        import time
+        from concurrent.futures import ThreadPoolExecutor
+
+        buf = ImageBuffer(tmp_path / "unused.png", original=np.zeros((4, 4), np.uint8))
+        running = []
+        peak = []
+        calls = []
+
+        def slow(name):
+            def compute(_):
+                calls.append(name)
+                running.append(name)
+                time.sleep(0.2)
+                peak.append(len(running))
+                running.remove(name)
+                return np.zeros(1)
+
+            return compute
+
+        barrier = threading.Barrier(3)
+
+        def load(name):
+            barrier.wait()
+            return buf.derive(name, slow(name))
+
+        with ThreadPoolExecutor(3) as pool:
+            results = list(pool.map(load, ["a", "b", "a"]))
+
+        assert max(peak) == 2
+        assert sorted(calls) == ["a", "b"]
+        assert results[0] is results[2]
+
+    @pytest.mark.asyncio
+    async def test_load(self, rgb_image_path):
+        """비동기 load 테스트."""
+        buf = ImageBuffer(rgb_image_path)
+        gray = await buf.load("gray")
+        assert gray is buf.gray
+
+    @pytest.mark.parametrize("kind", ["thread", "process"])
+    @pytest.mark.asyncio
+    async def test_load_uses_step_executor(self, rgb_image_path, kind):
+        """단계가 넘긴 executor의 thread에서 plane을 계산 (기본 thread pool 아님)."""
+        import threading
+
+        from analyze.executor import PipelineExecutor
+        from analyze.steps.extract_answer import ExtractAnswerStep
+
+        threads = []
+        buf = ImageBuffer(rgb_image_path)
+        step = ExtractAnswerStep()
+        step.executor = PipelineExecutor(kind=kind, max_workers=1)
+        context = PipelineContext(file_id="id", file_path=rgb_image_path)
+        context.image = buf
+        original_get = buf.get
+        buf.get = lambda plane: (
+            threads.append(threading.current_thread().name) or original_get(plane)
+        )
+        try:
+            gray = await step.load_plane(context, "gray")
+        finally:
+            step.executor.shutdown()
+
+        assert gray is buf.gray
+        assert threads[-1].startswith("pipeline")
+
+
+class TestContextImage:
+    """PipelineContext.get_image 테스트."""
+
+    def test_get_image_uses_processed_path(self, rgb_image_path, tmp_path):
+        """processed_path 기준으로 버퍼를 만들고 재사용하는지 테스트."""
+        context = PipelineContext(file_id="id", file_path=tmp_path / "raw.png")
+        context.preprocessed = {"processed_path": str(rgb_image_path)}
+
+        buf = context.get_image()
+        assert buf.path == rgb_image_path
+        assert context.get_image() is buf
+
+    def test_image_not_serialized(self, rgb_image_path):
+        """버퍼가 직렬화 결과에 포함되지 않는지 테스트."""
+        context = PipelineContext(file_id="id", file_path=rgb_image_path)
+        context.get_image()
+        assert "image" not in context.model_dump()
+
+    @pytest.mark.asyncio
+    async def test_pipeline_decodes_once(
+        self, rgb_image_path, decode_counter, tmp_path, monkeypatch
+    ):
+        """전체 pipeline에서 이미지가 1회만 디코딩되는지 테스트."""
+        monkeypatch.setattr("services.file_storage.UPLOAD_ROOT", tmp_path)
+
+        # 전처리 단계가 직접 디코딩하는 경우도 셈
+        preprocess_decodes = []
+        original_to_array = preprocess.image_to_array
+
+        def counting_to_array(img):
+            preprocess_decodes.append(img.size)
+            return original_to_array(img)
+
+        monkeypatch.setattr(preprocess, "image_to_array", counting_to_array)
+
+        result = await AnalyzePipeline().analyze("id", rgb_image_path)
+
+        assert result.context.extracted_problem["status"] == "completed"
+        assert result.context.extracted_answer["status"] == "completed"
+        assert len(decode_counter) + len(preprocess_decodes) == 1
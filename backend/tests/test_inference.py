@@ -0,0 +1,198 @@
+"""ONNX CPU 추론 backend / AIBasedRemover (Level 3) 테스트."""
+
+import pickle
+
+import cv2
+import numpy as np
+import pytest
+
+from analyze.inference import (
+    InferenceError,
+    clear_models,
+    load_model,
+    predict_tiled,
+)
+from analyze.steps.image_processing import AIBasedRemover, MorphologyBasedRemover
+
+onnx = pytest.importorskip("onnx")
+from onnx import TensorProto, helper  # noqa: E402
+
+try:
+    import onnxruntime  # noqa: F401
+
+    BACKENDS = ["onnxruntime", "opencv"]
+except ImportError:
+    BACKENDS = ["opencv"]
+
+
+def _save_model(path, nodes, initializers=(), shape=("N", 1, "H", "W")):
+    """테스트용 ONNX 모델 저장 (입력 "x", 출력 "y")."""
+    graph = helper.make_graph(
+        nodes,
+        "test",
+        [helper.make_tensor_value_info("x", TensorProto.FLOAT, list(shape))],
+        [helper.make_tensor_value_info("y", TensorProto.FLOAT, list(shape))],
+        initializer=list(initializers),
+    )
+    model = helper.make_model(graph, opset_imports=[helper.make_opsetid("", 13)])
+    model.ir_version = 8
+    onnx.save(model, str(path))
+    return path
+
+
+def _constant(name, value):
+    return helper.make_tensor(name, TensorProto.FLOAT, [], [value])
+
+
+@pytest.fixture
+def identity_model(tmp_path):
+    """입력을 그대로 돌려주는 모델 (tile 이어 붙이기 검증용)."""
+    return _save_model(
+        tmp_path / "identity.onnx", [helper.make_node("Identity", ["x"], ["y"])]
+    )
+
+
+@pytest.fixture
+def pencil_model(tmp_path):
+    """밝기 0.65 근처(연필)를 필기로 판정하는 segmentation 모델.
+
+    y = relu(1 - |x - 0.65| * 5)
+    """
+    nodes = [
+        helper.make_node("Sub", ["x", "center"], ["d"]),
+        helper.make_node("Abs", ["d"], ["a"]),
+        helper.make_node("Mul", ["a", "gain"], ["m"]),
+        helper.make_node("Sub", ["one", "m"], ["s"]),
+        helper.make_node("Relu", ["s"], ["y"]),
+    ]
+    initializers = [
+        _constant("center", 0.65),
+        _constant("gain", 5.0),
+        _constant("one", 1.0),
+    ]
+    return _save_model(tmp_path / "pencil.onnx", nodes, initializers)
+
+
+@pytest.fixture(autouse=True)
+def fresh_models():
+    clear_models()
+    yield
+    clear_models()
+
+
+@pytest.fixture
+def worksheet():
+    """인쇄 텍스트 + 연필 획 (BGR, 인쇄 mask, 연필 mask)."""
+    img = np.full((150, 300, 3), 245, dtype=np.uint8)
+    cv2.putText(
+        img, "x + 2 = 5", (10, 50), cv2.FONT_HERSHEY_SIMPLEX, 1.2, (20, 20, 20), 2
+    )
+    printed = img[:, :, 0] < 128
+    cv2.line(img, (20, 120), (280, 90), (165, 165, 165), 4)
+    pencil = np.abs(img[:, :, 0].astype(int) - 165) < 5
+    return img, printed, pencil
+
+
+class TestLoadModel:
+    """모델 로드 / 프로세스 내 캐시 테스트."""
+
+    @pytest.mark.parametrize("backend", BACKENDS)
+    def test_loaded_once(self, identity_model, backend):
+        first = load_model(identity_model, threads=1, backend=backend)
+        second = load_model(identity_model, threads=1, backend=backend)
+
+        assert first is second
+        assert first.get_name() == backend
+
+    def test_missing_model(self, tmp_path):
+        with pytest.raises(InferenceError):
+            load_model(tmp_path / "missing.onnx")
+
+    def test_invalid_backend(self, identity_model):
+        with pytest.raises(ValueError):
+            load_model(identity_model, backend="cuda")
+
+
+class TestPredictTiled:
+    """tile 분할 batch 추론 테스트."""
+
+    @pytest.mark.parametrize("backend", BACKENDS)
+    @pytest.mark.parametrize("size", [(50, 70), (300, 517)])
+    def test_identity_roundtrip(self, identity_model, backend, size):
+        """identity 모델이면 tile을 이어 붙인 결과가 입력과 같음."""
+        image = np.random.default_rng(0).random(size, dtype=np.float32)
+        model = load_model(identity_model, backend=backend)
+
+        result = predict_tiled(image, model, tile_size=64, overlap=8, batch_size=3)
+
+        assert result.shape == image.shape
+        np.testing.assert_allclose(result, image, atol=1e-6)
+
+    def test_fixed_shape_model(self, tmp_path):
+        """입력 크기 / batch가 고정된 모델은 그 크기로 tile을 만듦."""
+        path = _save_model(
+            tmp_path / "fixed.onnx",
+            [helper.make_node("Identity", ["x"], ["y"])],
+            shape=(2, 1, 32, 32),
+        )
+        model = load_model(
+            path, backend="onnxruntime" if "onnxruntime" in BACKENDS else None
+        )
+        if model.get_name() != "onnxruntime":
+            pytest.skip("fixed shape metadata is read from onnxruntime")
+        image = np.random.default_rng(1).random((45, 80), dtype=np.float32)
+
+        result = predict_tiled(image, model, tile_size=256, overlap=4)
+
+        assert (model.tile_size, model.max_batch) == (32, 2)
+        np.testing.assert_allclose(result, image, atol=1e-6)
+
+    def test_overlap_too_large(self, identity_model):
+        with pytest.raises(ValueError):
+            predict_tiled(
+                np.zeros((10, 10), np.float32), load_model(identity_model), 32, 16
+            )
+
+
+class TestAIBasedRemover:
+    """모델을 사용하는 Level 3 remover 테스트."""
+
+    @pytest.mark.parametrize("backend", BACKENDS)
+    def test_mask_model_removes_pencil(self, pencil_model, worksheet, backend):
+        img, printed, pencil = worksheet
+        remover = AIBasedRemover(
+            model_path=str(pencil_model), backend=backend, threads=1, tile_size=64
+        )
+
+        ink = remover.remove(img) < 128
+
+        assert ink[printed].mean() > 0.9
+        assert not ink[pencil].any()
+        assert remover.get_confidence() == 0.9
+
+    def test_image_model_output(self, identity_model, worksheet):
+        """ "image" 모델 출력은 Grayscale로 그대로 사용."""
+        img, _, _ = worksheet
+        remover = AIBasedRemover(model_path=str(identity_model), output="image")
+
+        result = remover.remove(img)
+
+        assert np.array_equal(result, cv2.cvtColor(img, cv2.COLOR_BGR2GRAY))
+
+    def test_fallback_without_model(self, worksheet):
+        """모델이 없으면 Level 2 결과와 같음."""
+        img, _, _ = worksheet
+        remover = AIBasedRemover(model_path="/nonexistent/model.onnx")
+
+        assert np.array_equal(remover.remove(img), MorphologyBasedRemover().remove(img))
+        assert remover.get_confidence() == MorphologyBasedRemover().get_confidence()
+
+    def test_picklable_after_use(self, pencil_model, worksheet):
+        """process executor로 보낼 수 있도록 세션은 인스턴스에 저장하지 않음."""
+        img, _, _ = worksheet
+        remover = AIBasedRemover(model_path=str(pencil_model))
+        remover.remove(img)
+
+        restored = pickle.loads(pickle.dumps(remover))
+
+        assert np.array_equal(restored.remove(img), remover.remove(img))
@@ -0,0 +1,217 @@
+"""JPEG 무손실 crop (MCU 정렬, DCT 영역 crop) 테스트."""
+
+import io
+import shutil
+
+import numpy as np
+import pytest
+from fastapi.testclient import TestClient
+from PIL import Image
+
+from backend.main import app
+from services import jpeg_crop
+from services.file_index import get_file_index
+from services.jpeg_crop import align_crop, crop_jpeg, lossless_backend, mcu_size
+
+client = TestClient(app)
+
+
+def _image(width=160, height=120):
+    """위치마다 값이 다른 RGB 이미지."""
+    ys, xs = np.mgrid[0:height, 0:width]
+    return np.stack([xs * 2 % 256, ys * 2 % 256, (xs + ys) % 256], -1).astype(np.uint8)
+
+
+def _backend_installed(name):
+    """무손실 crop backend가 이 환경에서 동작하는지 확인합니다."""
+    if name == "jpegtran":
+        return shutil.which(jpeg_crop.JPEGTRAN) is not None
+    try:
+        return jpeg_crop.TurboJPEG is not None and jpeg_crop._turbojpeg() is not None
+    except (OSError, RuntimeError):
+        return False
+
+
+def _save_jpeg(path, subsampling=2, mode="RGB"):
+    Image.fromarray(_image()).convert(mode).save(
+        path, format="JPEG", quality=90, subsampling=subsampling
+    )
+    return path
+
+
+class TestMcuAlignment:
+    """MCU 크기 / 사각형 정렬 테스트."""
+
+    @pytest.mark.parametrize(
+        "subsampling, mode, expected",
+        [
+            (2, "RGB", (16, 16)),
+            (1, "RGB", (16, 8)),
+            (0, "RGB", (8, 8)),
+            (2, "L", (8, 8)),
+        ],
+    )
+    def test_mcu_size(self, tmp_path, subsampling, mode, expected):
+        path = _save_jpeg(tmp_path / "page.jpg", subsampling, mode)
+
+        assert mcu_size(path) == expected
+
+    def test_not_jpeg(self, tmp_path):
+        path = tmp_path / "page.png"
+        Image.fromarray(_image()).save(path)
+
+        assert mcu_size(path) is None
+
+    def test_align_keeps_bottom_right(self):
+        crop = {"x": 21, "y": 35, "w": 50, "h": 30}
+
+        aligned = align_crop(crop, (16, 16))
+
+        assert aligned == {"x": 16, "y": 32, "w": 55, "h": 33}
+        assert align_crop(aligned, (16, 16)) == aligned
+
+
+class TestCropJpeg:
+    """DCT 영역 crop 테스트."""
+
+    def test_without_backend(self, tmp_path, monkeypatch):
+        """backend가 없으면 False (호출자가 pixel crop으로 처리)."""
+        monkeypatch.setattr(jpeg_crop, "lossless_backend", lambda: None)
+        path = _save_jpeg(tmp_path / "page.jpg")
+        output = tmp_path / "out.jpg"
+
+        assert crop_jpeg(path, {"x": 16, "y": 16, "w": 32, "h": 32}, output) is False
+
+    def test_unaligned_rejected(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(jpeg_crop, "lossless_backend", lambda: "jpegtran")
+        path = _save_jpeg(tmp_path / "page.jpg")
+        output = tmp_path / "out.jpg"
+
+        assert crop_jpeg(path, {"x": 5, "y": 16, "w": 32, "h": 32}, output) is False
+        assert not output.exists()
+
+    @pytest.mark.skipif(lossless_backend() is None, reason="no jpegtran / turbojpeg")
+    def test_lossless_matches_decoded_pixels(self, tmp_path):
+        """4:4:4 JPEG의 무손실 crop은 원본 decode 결과의 같은 영역과 같음."""
+        path = _save_jpeg(tmp_path / "page.jpg", subsampling=0)
+        output = tmp_path / "out.jpg"
+        crop = {"x": 16, "y": 24, "w": 70, "h": 50}
+
+        assert crop_jpeg(path, crop, output) is True
+
+        with Image.open(path) as img:
+            expected = np.asarray(img)[24:74, 16:86]
+        with Image.open(output) as img:
+            assert img.size == (70, 50)
+            assert np.array_equal(np.asarray(img), expected)
+
+    def test_turbojpeg_drops_markers(self, tmp_path, monkeypatch):
+        """turbojpeg crop은 EXIF 등 marker를 복사하지 않도록 호출."""
+        calls = []
+
+        class FakeTurboJPEG:
+            def crop(self, data, x, y, w, h, **kwargs):
+                calls.append(kwargs)
+                return b"cropped"
+
+        monkeypatch.setattr(jpeg_crop, "lossless_backend", lambda: "turbojpeg")
+        monkeypatch.setattr(jpeg_crop, "_turbojpeg", FakeTurboJPEG)
+        path = _save_jpeg(tmp_path / "page.jpg")
+        output = tmp_path / "out.jpg"
+
+        assert crop_jpeg(path, {"x": 16, "y": 16, "w": 32, "h": 32}, output) is True
+        assert calls == [{"copynone": True}]
+        assert output.read_bytes() == b"cropped"
+
+    @pytest.mark.parametrize("backend", ["turbojpeg", "jpegtran"])
+    def test_orientation_dropped(self, tmp_path, monkeypatch, backend):
+        """EXIF Orientation이 있는 JPEG를 잘라도 결과에 Orientation이 남지 않음."""
+        if not _backend_installed(backend):
+            pytest.skip(f"{backend} is not installed")
+        monkeypatch.setattr(jpeg_crop, "lossless_backend", lambda: backend)
+        path = tmp_path / "page.jpg"
+        exif = Image.Exif()
+        exif[0x0112] = 6  # 90도 회전
+        Image.fromarray(_image()).save(path, format="JPEG", exif=exif)
+        output = tmp_path / "out.jpg"
+
+        assert crop_jpeg(path, {"x": 16, "y": 16, "w": 32, "h": 32}, output) is True
+
+        with Image.open(output) as img:
+            assert img.getexif().get(0x0112) is None
+            assert img.size == (32, 32)
+
+
+class TestCropEndpoint:
+    """/crop이 JPEG 사각형을 MCU 경계로 맞추고 무손실 crop을 쓰는지 테스트."""
+
+    @pytest.fixture
+    def uploaded_jpeg(self, tmp_path, monkeypatch):
+        monkeypatch.setattr("services.file_storage.UPLOAD_ROOT", tmp_path)
+        buffer = io.BytesIO()
+        Image.fromarray(_image()).save(buffer, format="JPEG", subsampling=2)
+        response = client.post(
+            "/upload", files={"file": ("page.jpg", buffer.getvalue(), "image/jpeg")}
+        )
+        return response.json()["file_id"], tmp_path
+
+    @pytest.fixture
+    def fake_backend(self, monkeypatch):
+        """무손실 backend가 있는 것처럼 만들고 crop_jpeg 호출을 기록."""
+        calls = []
+
+        def fake_crop_jpeg(path, crop, output_path):
+            calls.append(crop)
+            with Image.open(path) as img:
+                region = img.crop(
+                    (crop["x"], crop["y"], crop["x"] + crop["w"], crop["y"] + crop["h"])
+                )
+                region.save(output_path, format="JPEG")
+            return True
+
+        monkeypatch.setattr("services.file_storage.lossless_backend", lambda: "fake")
+        monkeypatch.setattr("services.file_storage.crop_jpeg", fake_crop_jpeg)
+        return calls
+
+    def _crop(self, image_id, x, y, w, h):
+        return client.post(
+            "/crop",
+            json={"image_id": image_id, "crop": {"x": x, "y": y, "w": w, "h": h}},
+        )
+
+    def test_snapped_to_mcu(self, uploaded_jpeg, fake_backend):
+        file_id, root = uploaded_jpeg
+
+        response = self._crop(file_id, 21, 35, 50, 30)
+
+        assert response.status_code == 200
+        assert response.json()["crop"] == {"x": 16, "y": 32, "w": 55, "h": 33}
+        crop_id = response.json()["file_id"]
+        assert client.get(f"/files/{crop_id}").status_code == 200
+        assert fake_backend == [{"x": 16, "y": 32, "w": 55, "h": 33}]
+        entry = get_file_index(root).get(crop_id)
+        assert (entry["width"], entry["height"]) == (55, 33)
+
+    def test_crop_of_crop_aligned_in_original(self, uploaded_jpeg, fake_backend):
+        """crop의 crop도 원본 기준으로 정렬 (응답은 parent 좌표계)."""
+        file_id, root = uploaded_jpeg
+        first = self._crop(file_id, 16, 16, 100, 80).json()["file_id"]
+
+        response = self._crop(first, 10, 3, 20, 20)
+
+        assert response.json()["crop"] == {"x": 0, "y": 0, "w": 30, "h": 23}
+        entry = get_file_index(root).get(response.json()["file_id"])
+        assert entry["crop"] == {"x": 16, "y": 16, "w": 30, "h": 23}
+
+    def test_fallback_to_pixel_crop(self, uploaded_jpeg, monkeypatch):
+        """무손실 crop이 불가능하면 요청 사각형 그대로 decode → encode."""
+        file_id, _ = uploaded_jpeg
+        monkeypatch.setattr("services.file_storage.lossless_backend", lambda: None)
+        monkeypatch.setattr("services.file_storage.crop_jpeg", lambda *args: False)
+
+        response = self._crop(file_id, 21, 35, 50, 30)
+
+        assert response.json()["crop"] == {"x": 21, "y": 35, "w": 50, "h": 30}
+        served = client.get(f"/files/{response.json()['file_id']}")
+        assert served.headers["content-type"] == "image/jpeg"
+        assert Image.open(io.BytesIO(served.content)).size == (50, 30)
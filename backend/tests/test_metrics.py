@@ -0,0 +1,109 @@
+"""Pipeline 단계 계측 / Prometheus export 테스트."""
+
+import asyncio
+
+import pytest
+from fastapi.testclient import TestClient
+from PIL import Image
+
+from analyze.metrics import Counter, Histogram, StepMeasurement
+from analyze.models import PipelineContext
+from analyze.pipeline import AnalyzePipeline
+from backend.main import app
+
+
+class TestHistogram:
+    """Histogram/Counter 텍스트 형식 테스트."""
+
+    def test_render(self):
+        histogram = Histogram("test_seconds", "Test.", ["step"], buckets=(0.1, 1))
+        histogram.observe(0.05, step="a")
+        histogram.observe(0.5, step="a")
+
+        text = histogram.render()
+
+        assert "# TYPE test_seconds histogram" in text
+        assert 'test_seconds_bucket{step="a",le="0.1"} 1' in text
+        assert 'test_seconds_bucket{step="a",le="1"} 2' in text
+        assert 'test_seconds_bucket{step="a",le="+Inf"} 2' in text
+        assert 'test_seconds_count{step="a"} 2' in text
+        assert 'test_seconds_sum{step="a"} 0.55' in text
+
+    def test_label_escaping(self):
+        counter = Counter("test_total", "Test.", ["step"])
+        counter.inc(step='a"b')
+
+        assert 'test_total{step="a\\"b"} 1' in counter.render()
+
+
+class TestStepInstrumentation:
+    """Pipeline.run 단계 계측 테스트."""
+
+    @pytest.mark.asyncio
+    async def test_metadata_records_steps(self, tmp_path, monkeypatch):
+        """각 단계의 시간/자원/입력 크기가 metadata에 기록되는지 테스트."""
+        monkeypatch.setattr("services.file_storage.UPLOAD_ROOT", tmp_path)
+        image_path = tmp_path / "a.png"
+        Image.new("RGB", (120, 80), color="white").save(image_path)
+
+        result = await AnalyzePipeline().analyze("id", image_path)
+
+        steps = result.context.metadata["steps"]
+        assert set(steps) == {
+            "preprocess",
+            "extract_problem",
+            "extract_answer",
+            "postprocess",
+        }
+        for measured in steps.values():
+            assert measured["status"] == "completed"
+            assert measured["wall_time"] >= 0
+            assert measured["cpu_time"] >= 0
+            assert "process_peak_rss" in measured
+        assert steps["extract_problem"]["input_width"] == 120
+        assert steps["extract_problem"]["input_height"] == 80
+        assert "remove_time" in result.context.extracted_problem["timings"]
+
+    def test_input_size_without_file_access(self, tmp_path, monkeypatch):
+        """입력 크기는 컨텍스트 값만 사용 (이벤트 루프에서 파일을 열지 않음)."""
+        image_path = tmp_path / "a.png"
+        Image.new("RGB", (120, 80), color="white").save(image_path)
+
+        def fail_open(*args, **kwargs):
+            raise AssertionError("image opened on the event loop")
+
+        monkeypatch.setattr("PIL.Image.open", fail_open)
+        before = StepMeasurement(
+            "preprocess", PipelineContext(file_id="id", file_path=image_path)
+        )
+        after = StepMeasurement(
+            "extract_problem",
+            PipelineContext(
+                file_id="id",
+                file_path=image_path,
+                preprocessed={"width": 120, "height": 80},
+            ),
+        )
+
+        assert (before.input_width, before.input_height) == (None, None)
+        assert (after.input_width, after.input_height) == (120, 80)
+
+
+def test_metrics_endpoint(tmp_path, monkeypatch):
+    """/metrics가 단계별 / remover별 histogram을 노출하는지 테스트."""
+    monkeypatch.setattr("services.file_storage.UPLOAD_ROOT", tmp_path)
+    image_path = tmp_path / "b.png"
+    Image.new("RGB", (60, 40), color="white").save(image_path)
+
+    asyncio.run(AnalyzePipeline().analyze("id", image_path))
+    response = TestClient(app).get("/metrics")
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    assert 'analyze_step_duration_seconds_count{step="extract_problem"}' in (
+        response.text
+    )
+    assert (
+        'analyze_remover_duration_seconds_bucket{method="grayscale_adaptive_threshold"'
+        in (response.text)
+    )
@@ -0,0 +1,434 @@
+"""OCR 엔진 / 상주 OCR worker pool 테스트."""
+
+import asyncio
+import logging
+import os
+import pickle
+import sys
+import threading
+import time
+
+import cv2
+import numpy as np
+import pytest
+from PIL import Image
+
+from analyze.models import PipelineContext
+from analyze import ocr
+from analyze.ocr import (
+    OCREngine,
+    OCRError,
+    OCRQueueFull,
+    OCRTimeout,
+    OCRWorkerPool,
+    PytesseractEngine,
+    default_backend,
+    get_default_ocr_engine,
+    parse_tesseract_config,
+)
+from analyze.steps.extract_answer import ExtractAnswerStep
+
+
+class FakeEngine(OCREngine):
+    """worker pid와 이미지 크기를 돌려주는 테스트용 backend."""
+
+    def image_to_data(self, image, config, timeout=None):
+        if config == "sleep":
+            time.sleep(2)
+        if config == "fail":
+            raise ValueError("broken image")
+        return {
+            "text": [str(os.getpid()), f"{image.size[0]}x{image.size[1]}"],
+            "conf": [95, 85],
+        }
+
+    def image_to_string(self, image, config, timeout=None):
+        return f"{image.mode}:{os.getpid()}"
+
+
+class FixedEngine(OCREngine):
+    """항상 같은 인식 결과를 돌려주는 in-process 엔진."""
+
+    def __init__(self):
+        self.calls = 0
+
+    def image_to_data(self, image, config, timeout=None):
+        self.calls += 1
+        return {"text": ["", "42"], "conf": [-1, 90]}
+
+    def image_to_string(self, image, config, timeout=None):
+        return "42"
+
+
+class SizeEngine(OCREngine):
+    """OCR한 이미지 크기를 기록하는 in-process 엔진 (thread-safe)."""
+
+    def __init__(self):
+        self.sizes = []
+        self._lock = threading.Lock()
+
+    def image_to_data(self, image, config, timeout=None):
+        with self._lock:
+            self.sizes.append(image.size)
+        return {"text": ["42"], "conf": [90]}
+
+    def image_to_string(self, image, config, timeout=None):
+        return "42"
+
+
+class PsmEngine(OCREngine):
+    """설정마다 다른 결과를 돌려주는 in-process 엔진 (호출 기록)."""
+
+    def __init__(self, results, delays=None):
+        self.results = results
+        self.delays = delays or {}
+        self.configs = []
+        self.timeouts = {}
+        self._lock = threading.Lock()
+
+    def image_to_data(self, image, config, timeout=None):
+        with self._lock:
+            self.configs.append(config)
+            self.timeouts[config] = timeout
+        time.sleep(self.delays.get(config, 0))
+        text, conf = self.results[config]
+        return {
+            "text": [text],
+            "conf": [conf],
+            "left": [1],
+            "top": [2],
+            "width": [3],
+            "height": [4],
+        }
+
+    def image_to_string(self, image, config, timeout=None):
+        raise AssertionError("image_to_string should not be called")
+
+
+@pytest.fixture
+def pool():
+    pool = OCRWorkerPool(workers=1, max_queue=0, timeout=5, backend_factory=FakeEngine)
+    yield pool
+    pool.close()
+
+
+def _gray(width=20, height=10):
+    return np.full((height, width), 255, dtype=np.uint8)
+
+
+class TestParseTesseractConfig:
+    """tesseract 설정 파싱 테스트."""
+
+    def test_parse(self):
+        config = "--psm 6 --oem 1 -l kor -c tessedit_char_whitelist=0123+-="
+        lang, psm, oem, variables = parse_tesseract_config(config)
+
+        assert lang == "kor"
+        assert psm == 6
+        assert oem == 1
+        assert variables == {"tessedit_char_whitelist": "0123+-="}
+
+    def test_parse_empty(self):
+        assert parse_tesseract_config("") == ("eng", None, 3, {})
+
+
+class TestOCRWorkerPool:
+    """OCRWorkerPool 테스트."""
+
+    def test_worker_reused_across_calls(self, pool):
+        """같은 worker 프로세스가 재사용되는지 테스트 (호출마다 생성하지 않음)."""
+        first = pool.image_to_data(_gray(), "")
+        second = pool.image_to_data(Image.new("L", (30, 40)), "")
+
+        assert first["text"][0] == second["text"][0]
+        assert first["text"][0] != str(os.getpid())
+        assert second["text"][1] == "30x40"
+        assert pool.worker_pids == [int(first["text"][0])]
+
+    def test_start_prewarms(self, pool):
+        """start()가 worker를 미리 띄우는지 테스트."""
+        assert pool.worker_pids == []
+        pool.start()
+        assert len(pool.worker_pids) == 1
+
+    def test_image_to_string(self, pool):
+        """image_to_string 호출 테스트."""
+        assert pool.image_to_string(_gray(), "").startswith("L:")
+
+    def test_backend_error(self, pool):
+        """backend 예외가 OCRError로 전달되고 worker는 계속 쓰이는지 테스트."""
+        with pytest.raises(OCRError, match="broken image"):
+            pool.image_to_data(_gray(), "fail")
+        assert pool.image_to_data(_gray(), "")["text"]
+
+    def test_timeout_replaces_worker(self):
+        """제한 시간을 넘긴 worker가 교체되는지 테스트."""
+        pool = OCRWorkerPool(workers=1, timeout=0.5, backend_factory=FakeEngine)
+        try:
+            pool.start()
+            stuck_pid = pool.worker_pids[0]
+
+            with pytest.raises(OCRTimeout):
+                pool.image_to_data(_gray(), "sleep")
+
+            # 새 worker를 띄우는 시간까지 포함되도록 제한 시간을 늘림
+            pool.timeout = 30
+            result = pool.image_to_data(_gray(), "")
+            assert int(result["text"][0]) != stuck_pid
+        finally:
+            pool.close()
+
+    def test_call_timeout(self):
+        """호출별 제한 시간이 pool 기본값보다 짧으면 그 시간에 worker를 교체."""
+        pool = OCRWorkerPool(workers=1, timeout=30, backend_factory=FakeEngine)
+        try:
+            pool.start()
+            stuck_pid = pool.worker_pids[0]
+
+            start = time.monotonic()
+            with pytest.raises(OCRTimeout):
+                pool.image_to_data(_gray(), "sleep", timeout=0.3)
+
+            assert time.monotonic() - start < 1.5
+            assert stuck_pid not in pool.worker_pids
+        finally:
+            pool.close()
+
+    def test_queue_full(self, pool):
+        """대기 한도를 넘는 호출이 즉시 거절되는지 테스트."""
+        pool.start()
+        busy = threading.Thread(
+            target=lambda: pytest.raises(OCRError, pool.image_to_data, _gray(), "sleep")
+        )
+        pool.timeout = 0.5
+        busy.start()
+        time.sleep(0.1)
+        try:
+            with pytest.raises(OCRQueueFull):
+                pool.image_to_data(_gray(), "")
+        finally:
+            busy.join()
+
+    def test_pickle_does_not_share_workers(self, pool):
+        """pickle된 pool은 설정만 가지고 worker는 새로 띄우는지 테스트."""
+        pool.start()
+        clone = pickle.loads(pickle.dumps(pool))
+        try:
+            assert clone.workers == pool.workers
+            assert clone.worker_pids == []
+        finally:
+            clone.close()
+
+
+class TestDefaultEngine:
+    """tesserocr가 없을 때의 기본 엔진 선택 테스트."""
+
+    @pytest.fixture
+    def without_tesserocr(self, monkeypatch):
+        # sys.modules에 None이 있으면 import가 ImportError
+        monkeypatch.setitem(sys.modules, "tesserocr", None)
+        monkeypatch.setattr(ocr, "_default_engine", None)
+        monkeypatch.setattr(ocr, "_default_engine_pid", None)
+
+    def test_backend_fallback_warns(self, without_tesserocr, caplog):
+        with caplog.at_level(logging.WARNING, logger="analyze.ocr"):
+            engine = default_backend()
+
+        assert isinstance(engine, PytesseractEngine)
+        assert "tesserocr is not installed" in caplog.text
+
+    def test_no_worker_pool_without_tesserocr(self, without_tesserocr, caplog):
+        """pytesseract만 있으면 worker pool 없이 바로 호출 (경고는 한 번)."""
+        with caplog.at_level(logging.WARNING, logger="analyze.ocr"):
+            engine = get_default_ocr_engine()
+            again = get_default_ocr_engine()
+
+        assert isinstance(engine, PytesseractEngine)
+        assert again is engine
+        assert caplog.text.count("worker pool disabled") == 1
+
+    def test_backend_import_only_fallback(self, monkeypatch):
+        """tesserocr 초기화 실패는 숨기지 않음 (ImportError만 fallback)."""
+
+        def broken(*args, **kwargs):
+            raise RuntimeError("Failed to init API")
+
+        monkeypatch.setattr(ocr, "TesserocrEngine", broken)
+
+        with pytest.raises(RuntimeError):
+            default_backend()
+
+
+class TestExtractAnswerWithEngine:
+    """ExtractAnswerStep이 주입된 OCR 엔진을 사용하는지 테스트."""
+
+    @pytest.mark.asyncio
+    async def test_uses_engine(self, tmp_path):
+        image_path = tmp_path / "answer.png"
+        Image.new("RGB", (50, 30), color="white").save(image_path)
+        context = PipelineContext(file_id="id", file_path=image_path)
+
+        engine = FixedEngine()
+        step = ExtractAnswerStep(ocr_engine=engine)
+        result = await step.execute(context)
+
+        assert engine.calls == 1
+        assert result.extracted_answer["answer_text"] == "42"
+        assert result.extracted_answer["confidence"] == pytest.approx(0.9)
+
+    @pytest.mark.asyncio
+    async def test_ocr_only_answer_regions(self, tmp_path):
+        """손글씨 답 후보 영역만 OCR하고, 가장 좋은 후보와 box를 반환."""
+        img = np.full((480, 640, 3), 245, dtype=np.uint8)
+        for i in range(5):
+            cv2.putText(
+                img,
+                f"({i + 1}) x + {i} = {2 * i + 3}",
+                (30, 60 + 80 * i),
+                cv2.FONT_HERSHEY_SIMPLEX,
+                1.0,
+                (20, 20, 20),
+                2,
+            )
+        # 연필로 쓴 답 (문제 번호 옆)
+        cv2.putText(
+            img,
+            "42",
+            (450, 220),
+            cv2.FONT_HERSHEY_SCRIPT_SIMPLEX,
+            1.5,
+            (160, 160, 160),
+            3,
+            cv2.LINE_AA,
+        )
+        image_path = tmp_path / "page.png"
+        cv2.imwrite(str(image_path), img)
+        context = PipelineContext(file_id="id", file_path=image_path)
+
+        engine = SizeEngine()
+        result = await ExtractAnswerStep(ocr_engine=engine).execute(context)
+
+        answer = result.extracted_answer
+        box = answer["answer_box"]
+        assert box["x"] <= 450 < box["x"] + box["width"]
+        assert box["y"] <= 200 < box["y"] + box["height"]
+        # 페이지 전체가 아니라 작은 crop만 OCR
+        assert all(w * h < 640 * 480 / 10 for w, h in engine.sizes)
+        assert answer["answer_text"] == "42"
+
+    @pytest.mark.asyncio
+    async def test_full_page_without_regions_disabled(self, tmp_path):
+        """후보가 없고 fallback을 끄면 OCR 없이 빈 답."""
+        image_path = tmp_path / "blank.png"
+        Image.new("RGB", (50, 30), color="white").save(image_path)
+        context = PipelineContext(file_id="id", file_path=image_path)
+
+        engine = FixedEngine()
+        step = ExtractAnswerStep(ocr_engine=engine, full_page_fallback=False)
+        result = await step.execute(context)
+
+        assert engine.calls == 0
+        assert result.extracted_answer["answer_text"] == ""
+        assert result.extracted_answer["answer_box"] is None
+
+
+class TestSingleOCRPass:
+    """답 OCR이 인식을 한 번만 하고 재시도하지 않는지 테스트."""
+
+    @pytest.fixture
+    def context(self, tmp_path):
+        image_path = tmp_path / "answer.png"
+        Image.new("RGB", (50, 30), color="white").save(image_path)
+        return PipelineContext(file_id="id", file_path=image_path)
+
+    @pytest.mark.asyncio
+    async def test_low_confidence_not_retried(self, context):
+        """confidence가 낮거나 텍스트가 없어도 image_to_string 재시도 없음."""
+        engine = PsmEngine({"--psm 6": ("", -1)})
+        step = ExtractAnswerStep(tesseract_config="--psm 6", ocr_engine=engine)
+
+        result = await step.execute(context)
+
+        assert engine.configs == ["--psm 6"]
+        assert result.extracted_answer["answer_text"] == ""
+
+    @pytest.mark.asyncio
+    async def test_word_boxes(self, context):
+        """텍스트와 함께 단어 box / confidence를 같은 인식 결과에서 반환."""
+        engine = PsmEngine({"--psm 6": ("42", 90)})
+        step = ExtractAnswerStep(tesseract_config="--psm 6", ocr_engine=engine)
+
+        result = await step.execute(context)
+
+        (candidate,) = result.extracted_answer["candidates"]
+        assert candidate["words"] == [
+            {
+                "text": "42",
+                "confidence": 0.9,
+                "left": 1,
+                "top": 2,
+                "width": 3,
+                "height": 4,
+            }
+        ]
+
+    @pytest.mark.asyncio
+    async def test_alternate_config_in_parallel(self, context):
+        """alternate 설정은 동시에 실행하고 confidence가 높은 쪽을 사용."""
+        engine = PsmEngine(
+            {"--psm 6": ("4", 40), "--psm 7": ("42", 95)},
+            delays={"--psm 6": 0.3, "--psm 7": 0.3},
+        )
+        step = ExtractAnswerStep(
+            tesseract_config="--psm 6", alternate_config="--psm 7", ocr_engine=engine
+        )
+
+        start = time.monotonic()
+        result = await step.execute(context)
+
+        assert time.monotonic() - start < 0.55
+        assert sorted(engine.configs) == ["--psm 6", "--psm 7"]
+        assert result.extracted_answer["answer_text"] == "42"
+
+    @pytest.mark.asyncio
+    async def test_alternate_deadline(self, context):
+        """alternate가 제한 시간 안에 끝나지 않으면 기본 결과 사용."""
+        engine = PsmEngine(
+            {"--psm 6": ("4", 80), "--psm 7": ("42", 95)}, delays={"--psm 7": 1.0}
+        )
+        step = ExtractAnswerStep(
+            tesseract_config="--psm 6",
+            alternate_config="--psm 7",
+            alternate_timeout=0.1,
+            ocr_engine=engine,
+        )
+
+        result = await step.execute(context)
+
+        assert result.extracted_answer["answer_text"] == "4"
+        # 늦어진 alternate는 OCR 엔진이 끊도록 호출 자체에 제한 시간을 전달
+        assert engine.timeouts == {"--psm 6": None, "--psm 7": 0.1}
+
+    @pytest.mark.asyncio
+    async def test_alternate_cancelled_when_primary_fails(self, monkeypatch):
+        """기본 인식이 실패하면 끝나지 않은 alternate를 취소."""
+        step = ExtractAnswerStep(tesseract_config="--psm 6", alternate_config="--psm 7")
+        cancelled = []
+
+        async def fake_run_blocking(func, crop, config, engine, timeout=None):
+            if config == "--psm 6":
+                await asyncio.sleep(0.01)
+                raise OCRError("primary failed")
+            try:
+                await asyncio.sleep(10)
+            except asyncio.CancelledError:
+                cancelled.append(config)
+                raise
+
+        monkeypatch.setattr(step, "run_blocking", fake_run_blocking)
+
+        with pytest.raises(OCRError, match="primary failed"):
+            await step._recognize(np.zeros((10, 10), dtype=np.uint8))
+        await asyncio.sleep(0.01)
+
+        assert cancelled == ["--psm 7"]
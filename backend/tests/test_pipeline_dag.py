@@ -0,0 +1,163 @@
+"""Pipeline 의존성(DAG) 스케줄링 테스트."""
+
+import asyncio
+import time
+
+import pytest
+
+from analyze.base import Pipeline, PipelineStep
+from analyze.models import PipelineContext
+from analyze.pipeline import AnalyzePipeline
+
+
+class SleepStep(PipelineStep):
+    """지정한 시간만큼 기다린 뒤 출력 필드를 채우는 테스트용 단계."""
+
+    def __init__(self, name, inputs=(), outputs=(), delay=0.0, log=None):
+        self.name = name
+        self.inputs = inputs
+        self.outputs = outputs
+        self.delay = delay
+        self.log = log if log is not None else []
+
+    async def execute(self, context):
+        self.log.append(("start", self.name))
+        await asyncio.sleep(self.delay)
+        for field in self.outputs:
+            setattr(context, field, {"by": self.name})
+        self.log.append(("end", self.name))
+        return context
+
+    def get_name(self):
+        return self.name
+
+
+class FailingStep(SleepStep):
+    async def execute(self, context):
+        await asyncio.sleep(self.delay)
+        raise RuntimeError(f"{self.name} failed")
+
+
+class ReplacingStep(SleepStep):
+    """새 컨텍스트 객체를 반환하는 단계."""
+
+    async def execute(self, context):
+        new_context = context.model_copy()
+        for field in self.outputs:
+            setattr(new_context, field, {"by": self.name})
+        return new_context
+
+
+@pytest.fixture
+def context(tmp_path):
+    return PipelineContext(file_id="id", file_path=tmp_path / "x.png")
+
+
+class TestPipelineDAG:
+    """DAG 스케줄링 테스트."""
+
+    @pytest.mark.asyncio
+    async def test_independent_steps_run_concurrently(self, context):
+        """서로 독립적인 단계가 동시에 실행되는지 테스트."""
+        steps = [
+            SleepStep("pre", ("file_path",), ("preprocessed",)),
+            SleepStep("a", ("preprocessed",), ("extracted_problem",), 0.2),
+            SleepStep("b", ("preprocessed",), ("extracted_answer",), 0.2),
+            SleepStep(
+                "post",
+                ("extracted_problem", "extracted_answer"),
+                ("postprocessed",),
+            ),
+        ]
+
+        start = time.perf_counter()
+        result = await Pipeline(steps).run(context)
+        elapsed = time.perf_counter() - start
+
+        assert elapsed < 0.35  # 순차 실행이면 0.4초 이상
+        assert result.extracted_problem == {"by": "a"}
+        assert result.extracted_answer == {"by": "b"}
+        assert result.postprocessed == {"by": "post"}
+
+    @pytest.mark.asyncio
+    async def test_dependencies_respected(self, context):
+        """의존하는 단계는 앞 단계가 끝난 뒤 시작하는지 테스트."""
+        log = []
+        steps = [
+            SleepStep("pre", (), ("preprocessed",), 0.05, log),
+            SleepStep("a", ("preprocessed",), ("extracted_problem",), 0.05, log),
+            SleepStep("b", ("preprocessed",), ("extracted_answer",), 0.01, log),
+            SleepStep(
+                "post",
+                ("extracted_problem", "extracted_answer"),
+                ("postprocessed",),
+                0,
+                log,
+            ),
+        ]
+
+        await Pipeline(steps).run(context)
+
+        assert log.index(("end", "pre")) < log.index(("start", "a"))
+        assert log.index(("end", "pre")) < log.index(("start", "b"))
+        assert log.index(("end", "a")) < log.index(("start", "post"))
+        assert log.index(("end", "b")) < log.index(("start", "post"))
+
+    @pytest.mark.asyncio
+    async def test_undeclared_steps_run_in_order(self, context):
+        """입출력을 선언하지 않은 단계는 순서대로 실행되는지 테스트."""
+        log = []
+        steps = [
+            SleepStep("first", delay=0.05, log=log),
+            SleepStep("second", delay=0.0, log=log),
+        ]
+
+        await Pipeline(steps).run(context)
+
+        assert log == [
+            ("start", "first"),
+            ("end", "first"),
+            ("start", "second"),
+            ("end", "second"),
+        ]
+
+    @pytest.mark.asyncio
+    async def test_failure_cancels_other_steps(self, context):
+        """한 단계가 실패하면 예외가 전달되고 다른 단계가 취소되는지 테스트."""
+        log = []
+        steps = [
+            FailingStep("a", ("file_path",), ("extracted_problem",), 0.01),
+            SleepStep("b", ("file_path",), ("extracted_answer",), 1.0, log),
+        ]
+
+        with pytest.raises(RuntimeError, match="a failed"):
+            await Pipeline(steps).run(context)
+
+        assert ("end", "b") not in log
+
+    @pytest.mark.asyncio
+    async def test_returned_context_merged(self, context):
+        """새 컨텍스트를 반환한 단계의 출력이 병합되는지 테스트."""
+        steps = [
+            ReplacingStep("a", ("file_path",), ("extracted_problem",)),
+            SleepStep("b", ("file_path",), ("extracted_answer",)),
+        ]
+
+        result = await Pipeline(steps).run(context)
+
+        assert result is context
+        assert result.extracted_problem == {"by": "a"}
+        assert result.extracted_answer == {"by": "b"}
+
+    def test_analyze_pipeline_graph(self):
+        """AnalyzePipeline에서 문제/답안 추출이 서로 의존하지 않는지 테스트."""
+        pipeline = AnalyzePipeline()
+        names = [step.get_name() for step in pipeline.steps]
+        dependencies = pipeline._dependencies()
+
+        problem = names.index("extract_problem")
+        answer = names.index("extract_answer")
+        post = names.index("postprocess")
+
+        assert problem not in dependencies[answer]
+        assert set(dependencies[post]) >= {problem, answer}
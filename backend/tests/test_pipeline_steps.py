@@ -1,11 +1,25 @@
 """Pipeline 단계별 단위 테스트."""
 
+from pathlib import Path
+
+import cv2
+import numpy as np
 import pytest
+from PIL import Image
+from analyze.image_buffer import ImageBuffer
 from analyze.models import PipelineContext
 from analyze.steps.preprocess import PreprocessStep
+from analyze.steps.geometry import (
+    PROXY_MAX_SIDE,
+    build_proxy,
+    correct_document_geometry,
+    estimate_skew_angle,
+    rotate,
+)
 from analyze.steps.extract_problem import ExtractProblemStep
 from analyze.steps.extract_answer import ExtractAnswerStep
 from analyze.steps.postprocess import PostprocessStep
+from services.file_index import get_file_index
 
 
 class TestPreprocessStep:
@@ -89,6 +103,267 @@ class TestPreprocessStep:
         assert step.get_name() == "preprocess"
 
 
+class TestPreprocessNormalization:
+    """PreprocessStep 회전 보정 / 해상도 정규화 테스트."""
+
+    @pytest.fixture(autouse=True)
+    def uploads(self, tmp_path, monkeypatch):
+        monkeypatch.setattr("services.file_storage.UPLOAD_ROOT", tmp_path / "uploads")
+
+    @pytest.mark.asyncio
+    async def test_small_image_unchanged(self, tmp_path):
+        """보정할 것이 없는 이미지는 원본 경로를 그대로 넘기는지 테스트."""
+        image_path = tmp_path / "small.png"
+        Image.new("RGB", (40, 30), color="white").save(image_path)
+        context = PipelineContext(file_id="id", file_path=image_path)
+
+        result = await PreprocessStep().execute(context)
+
+        assert result.preprocessed["processed_path"] == str(image_path)
+        assert result.preprocessed["processed_file_id"] is None
+        assert result.preprocessed["width"] == 40
+        assert result.preprocessed["height"] == 30
+        assert result.preprocessed["resolution_normalized"] is False
+        # 기하 보정을 위해 디코딩한 결과는 다음 단계와 공유됨
+        assert result.image.path == image_path
+        assert result.image.has("original")
+
+    @pytest.mark.asyncio
+    async def test_without_geometry_skips_decode(self, tmp_path):
+        """기하 보정을 끄면 header만 읽고 디코딩하지 않는지 테스트."""
+        image_path = tmp_path / "small.png"
+        Image.new("RGB", (40, 30), color="white").save(image_path)
+        context = PipelineContext(file_id="id", file_path=image_path)
+
+        result = await PreprocessStep(correct_geometry=False).execute(context)
+
+        assert result.preprocessed["width"] == 40
+        assert result.image is None
+
+    @pytest.mark.asyncio
+    async def test_large_jpeg_downscaled_with_draft(self, tmp_path):
+        """큰 JPEG가 draft 디코딩으로 max_pixels 이하로 축소되는지 테스트."""
+        image_path = tmp_path / "large.jpg"
+        Image.new("RGB", (1600, 1200), color="white").save(image_path)
+        context = PipelineContext(file_id="id", file_path=image_path)
+
+        result = await PreprocessStep(max_pixels=120_000).execute(context)
+
+        preprocessed = result.preprocessed
+        assert preprocessed["resolution_normalized"] is True
+        assert preprocessed["draft_decoded"] is True
+        assert preprocessed["width"] * preprocessed["height"] <= 120_000
+        assert preprocessed["width"] == 400
+        assert preprocessed["original_width"] == 1600
+        # 축소된 이미지는 파일로 다시 인코딩하지 않고 공유 버퍼로 다음 단계에 전달됨
+        assert preprocessed["processed_path"] == str(image_path)
+        assert preprocessed["processed_file_id"] is None
+        assert result.get_image().original.shape[:2] == (300, 400)
+        assert not (tmp_path / "uploads").exists()
+
+    @pytest.mark.asyncio
+    async def test_target_dpi(self, tmp_path):
+        """DPI 정보가 목표보다 크면 목표 DPI로 축소하는지 테스트."""
+        image_path = tmp_path / "scan.png"
+        Image.new("L", (600, 400), color=255).save(image_path, dpi=(600, 600))
+        context = PipelineContext(file_id="id", file_path=image_path)
+
+        result = await PreprocessStep(target_dpi=300).execute(context)
+
+        assert (result.preprocessed["width"], result.preprocessed["height"]) == (
+            300,
+            200,
+        )
+
+    @pytest.mark.asyncio
+    async def test_exif_orientation_applied(self, tmp_path):
+        """EXIF orientation(90도 회전)이 적용되는지 테스트."""
+        image_path = tmp_path / "rotated.jpg"
+        exif = Image.Exif()
+        exif[0x0112] = 6
+        Image.new("RGB", (80, 40), color="white").save(image_path, exif=exif)
+        context = PipelineContext(file_id="id", file_path=image_path)
+
+        result = await PreprocessStep().execute(context)
+
+        assert result.preprocessed["rotation_corrected"] is True
+        assert (result.preprocessed["width"], result.preprocessed["height"]) == (
+            40,
+            80,
+        )
+        assert result.get_image().original.shape[:2] == (80, 40)
+
+    @pytest.mark.asyncio
+    async def test_save_processed_lossless(self, tmp_path):
+        """save_processed면 보정 결과를 derived 저장소에 PNG(무손실)로 남김."""
+        image_path = tmp_path / "large.jpg"
+        Image.new("RGB", (1600, 1200), color="white").save(image_path)
+        context = PipelineContext(file_id="id", file_path=image_path)
+
+        result = await PreprocessStep(max_pixels=120_000, save_processed=True).execute(
+            context
+        )
+
+        preprocessed = result.preprocessed
+        processed_path = Path(preprocessed["processed_path"])
+        assert processed_path.parent == tmp_path / "uploads" / "derived"
+        assert processed_path.suffix == ".png"
+        with Image.open(processed_path) as processed:
+            assert np.array_equal(np.asarray(processed), result.image.original)
+        entry = get_file_index(tmp_path / "uploads").get(
+            preprocessed["processed_file_id"]
+        )
+        assert entry["parent_id"] == "id"
+        assert result.get_image().path == processed_path
+
+    @pytest.mark.asyncio
+    async def test_invalid_image(self, tmp_path):
+        """이미지가 아닌 내용은 ValueError를 발생시키는지 테스트."""
+        image_path = tmp_path / "broken.png"
+        image_path.write_bytes(b"not an image")
+        context = PipelineContext(file_id="id", file_path=image_path)
+
+        with pytest.raises(ValueError, match="Invalid image file"):
+            await PreprocessStep().execute(context)
+
+    @pytest.mark.asyncio
+    async def test_in_memory_image(self, tmp_path):
+        """디코딩된 이미지가 있으면 파일 없이 그 배열을 처리하는지 테스트."""
+        image_path = tmp_path / "not-yet-saved.png"
+        image = np.full((400, 600, 3), 255, dtype=np.uint8)
+        context = PipelineContext(
+            file_id="id",
+            file_path=image_path,
+            image=ImageBuffer(image_path, original=image),
+        )
+
+        result = await PreprocessStep(max_pixels=60_000).execute(context)
+
+        preprocessed = result.preprocessed
+        assert preprocessed["processed_path"] == str(image_path)
+        assert preprocessed["processed_file_id"] is None
+        assert (preprocessed["width"], preprocessed["height"]) == (300, 200)
+        assert preprocessed["original_width"] == 600
+        assert result.image.original.shape[:2] == (200, 300)
+        assert not image_path.exists()
+        assert not (tmp_path / "uploads").exists()
+
+
+def _text_lines(width=1200, height=800):
+    """글자 줄처럼 보이는 가로 막대들이 있는 흰 이미지."""
+    image = np.full((height, width), 255, dtype=np.uint8)
+    for y in range(height // 8, height * 7 // 8, 40):
+        cv2.rectangle(image, (width // 8, y), (width * 7 // 8, y + 12), 0, -1)
+    return image
+
+
+def _problem_crop_with_box():
+    """문제 번호 / 문장 아래에 그림 박스가 있는 문제 crop (800x400)."""
+    image = np.full((400, 800, 3), 255, dtype=np.uint8)
+    cv2.putText(
+        image,
+        "5. Find the area of the rectangle.",
+        (20, 60),
+        cv2.FONT_HERSHEY_SIMPLEX,
+        1.0,
+        (0, 0, 0),
+        2,
+    )
+    cv2.rectangle(image, (100, 100), (600, 380), (0, 0, 0), 3)
+    return image
+
+
+class TestDocumentGeometry:
+    """문서 경계 검출 / 기울기 보정 테스트."""
+
+    def test_proxy_is_small(self):
+        proxy, ratio = build_proxy(np.zeros((3000, 4000), dtype=np.uint8))
+
+        assert max(proxy.shape) <= PROXY_MAX_SIDE
+        assert ratio == pytest.approx(4000 / proxy.shape[1])
+
+    @pytest.mark.parametrize("angle", [5.0, -7.0])
+    def test_deskew(self, angle):
+        """기울어진 글자 줄이 수평으로 보정되는지 테스트."""
+        corrected, info = correct_document_geometry(rotate(_text_lines(), angle))
+
+        assert info["page_detected"] is False
+        assert info["skew_angle"] == pytest.approx(angle, abs=0.5)
+        assert estimate_skew_angle(build_proxy(corrected)[0]) == pytest.approx(
+            0.0, abs=0.5
+        )
+
+    def test_straight_image_unchanged(self):
+        """기울지 않은 이미지는 그대로 반환되는지 테스트."""
+        image = _text_lines()
+        corrected, info = correct_document_geometry(image)
+
+        assert corrected is image
+        assert info["skew_angle"] == 0.0
+
+    def test_page_perspective_warp(self):
+        """어두운 배경 위의 기울어진 페이지를 찾아 페이지만 펴서 잘라내는지 테스트."""
+        photo = np.full((1500, 2000, 3), 60, dtype=np.uint8)
+        corners = np.array([[300, 200], [1700, 260], [1650, 1350], [350, 1300]])
+        cv2.fillConvexPoly(photo, corners.astype(np.int32), (245, 245, 245))
+
+        corrected, info = correct_document_geometry(photo)
+
+        assert info["page_detected"] is True
+        assert max(info["proxy_width"], info["proxy_height"]) <= PROXY_MAX_SIDE
+        height, width = corrected.shape[:2]
+        assert width == pytest.approx(1400, rel=0.03)
+        assert height == pytest.approx(1100, rel=0.03)
+        # 배경 없이 페이지만 남음
+        assert corrected.mean() > 230
+
+    def test_inner_box_is_not_page(self):
+        """문제 crop 안의 박스 / 표는 페이지로 보고 잘라내지 않는지 테스트."""
+        image = _problem_crop_with_box()
+
+        corrected, info = correct_document_geometry(image)
+
+        assert info["page_detected"] is False
+        assert corrected.shape == image.shape
+
+    @pytest.mark.asyncio
+    async def test_crop_skips_geometry_by_default(self, tmp_path, monkeypatch):
+        """crop 이미지는 기본 설정에서 기하 보정을 하지 않는지 테스트."""
+        monkeypatch.setattr("services.file_storage.UPLOAD_ROOT", tmp_path / "uploads")
+        image_path = tmp_path / "crop.png"
+        Image.fromarray(rotate(_text_lines(), 6.0)).save(image_path)
+
+        skipped = await PreprocessStep().execute(
+            PipelineContext(file_id="id", file_path=image_path, is_crop=True)
+        )
+        corrected = await PreprocessStep(correct_crop_geometry=True).execute(
+            PipelineContext(file_id="id", file_path=image_path, is_crop=True)
+        )
+
+        assert skipped.preprocessed["processed_path"] == str(image_path)
+        assert "page_detected" not in skipped.preprocessed
+        assert corrected.preprocessed["rotation_corrected"] is True
+
+    @pytest.mark.asyncio
+    async def test_preprocess_feeds_processed_image(self, tmp_path, monkeypatch):
+        """보정 결과가 파일 없이 공유 버퍼로 전달되는지 테스트."""
+        monkeypatch.setattr("services.file_storage.UPLOAD_ROOT", tmp_path / "uploads")
+        image_path = tmp_path / "skewed.png"
+        Image.fromarray(rotate(_text_lines(), 6.0)).save(image_path)
+        context = PipelineContext(file_id="id", file_path=image_path)
+
+        result = await PreprocessStep().execute(context)
+
+        preprocessed = result.preprocessed
+        assert preprocessed["rotation_corrected"] is True
+        assert preprocessed["processed_file_id"] is None
+        assert result.get_image() is result.image
+        assert estimate_skew_angle(
+            build_proxy(result.image.original)[0]
+        ) == pytest.approx(0.0, abs=0.5)
+        assert not (tmp_path / "uploads").exists()
+
+
 class TestExtractProblemStep:
     """ExtractProblemStep 테스트."""
 
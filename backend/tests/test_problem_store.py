@@ -0,0 +1,262 @@
+"""문제 저장소 (SQLite WAL) / /problems API 테스트."""
+
+import io
+import multiprocessing
+import sqlite3
+
+import pytest
+from fastapi.testclient import TestClient
+from PIL import Image
+
+from backend.main import app
+from services.problem_store import ProblemStore
+
+client = TestClient(app)
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = ProblemStore(tmp_path / "problems.db")
+    yield store
+    store.close()
+
+
+def _add_many(db_path, count):
+    """다른 프로세스에서 문제를 저장 (worker 프로세스 흉내)."""
+    store = ProblemStore(db_path)
+    for i in range(count):
+        store.add(f"image-{i}", str(i))
+    store.close()
+
+
+class TestProblemStore:
+    """ProblemStore 테스트."""
+
+    def test_add_and_get(self, store):
+        problem = store.add("image-1", "42")
+
+        assert store.get(problem["problem_id"]) == problem
+        assert problem["status"] == "pending"
+        assert store.get("missing") is None
+
+    def test_persisted(self, tmp_path, store):
+        """다른 인스턴스(재시작)에서도 저장된 문제를 읽을 수 있음."""
+        problem = store.add("image-1", "42")
+
+        reopened = ProblemStore(tmp_path / "problems.db")
+
+        assert reopened.get(problem["problem_id"]) == problem
+        reopened.close()
+
+    def test_wal_mode(self, store):
+        store.add("image-1", "42")
+
+        mode = store._connection().execute("PRAGMA journal_mode").fetchone()[0]
+
+        assert mode == "wal"
+
+    def test_cursor_pagination(self, store):
+        """cursor를 따라가면 빠짐 / 중복 없이 저장 순서대로 모두 나옴."""
+        added = [store.add(f"image-{i}", str(i))["problem_id"] for i in range(7)]
+
+        seen = []
+        cursor = None
+        pages = 0
+        while True:
+            problems, cursor = store.list(limit=3, cursor=cursor)
+            seen.extend(p["problem_id"] for p in problems)
+            pages += 1
+            if cursor is None:
+                break
+
+        assert seen == added
+        assert pages == 3
+
+    def test_status_filter(self, store):
+        store.add("image-1", "1")
+        done = store.add("image-2", "2", status="done")
+        store.add("image-3", "3")
+
+        problems, cursor = store.list(status="done")
+
+        assert [p["problem_id"] for p in problems] == [done["problem_id"]]
+        assert cursor is None
+
+    @pytest.mark.parametrize(
+        "where, params, index",
+        [
+            ("status = ? AND seq > ?", ("pending", 0), "idx_problems_status_seq"),
+            ("seq > ?", (0,), "INTEGER PRIMARY KEY"),
+        ],
+    )
+    def test_queries_use_indexes(self, store, where, params, index):
+        """상태 필터 / cursor 조회가 전체 테이블을 스캔하지 않음."""
+        store.add("image-1", "1")
+        connection = store._connection()
+
+        plan = " ".join(
+            row[3]
+            for row in connection.execute(
+                f"EXPLAIN QUERY PLAN SELECT * FROM problems WHERE {where}"
+                " ORDER BY seq LIMIT 10",
+                params,
+            )
+        )
+
+        assert index in plan
+        assert "TEMP B-TREE" not in plan
+
+    def test_order_ignores_clock(self, store):
+        """시계가 뒤로 가도 (다른 프로세스 / 시간대) 저장 순서대로 나옴."""
+        first = store.add("image-1", "1")["problem_id"]
+        second = store.add("image-2", "2")["problem_id"]
+        store._connection().execute(
+            "UPDATE problems SET created_at = ? WHERE problem_id = ?",
+            ("2030-01-01T00:00:00.000000+00:00", first),
+        )
+
+        page, cursor = store.list(limit=1)
+        rest, _ = store.list(limit=1, cursor=cursor)
+
+        assert [p["problem_id"] for p in page + rest] == [first, second]
+
+    def test_created_at_is_utc(self, store):
+        problem = store.add("image-1", "1")
+
+        assert problem["created_at"].endswith("+00:00")
+
+    def test_upgrades_old_indexes(self, tmp_path):
+        """예전 created_at 기준 index는 지우고 seq 기준 index를 만듦."""
+        db_path = tmp_path / "old.db"
+        connection = sqlite3.connect(db_path)
+        connection.executescript(
+            "CREATE TABLE problems (seq INTEGER PRIMARY KEY AUTOINCREMENT,"
+            " problem_id TEXT NOT NULL UNIQUE, problem_image_file_id TEXT NOT NULL,"
+            " answer_value TEXT NOT NULL, status TEXT NOT NULL,"
+            " created_at TEXT NOT NULL);"
+            "CREATE INDEX idx_problems_status ON problems (status, created_at, seq);"
+        )
+        connection.close()
+
+        store = ProblemStore(db_path)
+        indexes = {
+            row[0]
+            for row in store._connection().execute(
+                "SELECT name FROM sqlite_master WHERE type = 'index'"
+                " AND name LIKE 'idx_%'"
+            )
+        }
+        store.close()
+
+        assert indexes == {"idx_problems_status_seq"}
+
+    @pytest.mark.parametrize(
+        "kwargs",
+        [{"cursor": "not-a-cursor"}, {"limit": 0}, {"limit": 10_000}],
+    )
+    def test_invalid_arguments(self, store, kwargs):
+        with pytest.raises(ValueError):
+            store.list(**kwargs)
+
+    @pytest.mark.asyncio
+    async def test_async_interface(self, store):
+        problem = await store.aadd("image-1", "42")
+
+        problems, _ = await store.alist()
+
+        assert await store.aget(problem["problem_id"]) == problem
+        assert problems == [problem]
+
+    def test_multiple_processes(self, tmp_path):
+        """여러 프로세스가 동시에 써도 모두 저장됨."""
+        db_path = tmp_path / "problems.db"
+        context = multiprocessing.get_context("fork")
+        workers = [
+            context.Process(target=_add_many, args=(db_path, 50)) for _ in range(4)
+        ]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join(timeout=30)
+
+        assert all(worker.exitcode == 0 for worker in workers)
+        store = ProblemStore(db_path)
+        problems, _ = store.list(limit=200)
+        assert len(problems) == 200
+        assert len({p["problem_id"] for p in problems}) == 200
+        store.close()
+
+
+class TestProblemsEndpoint:
+    """/problems API 테스트."""
+
+    @pytest.fixture(autouse=True)
+    def isolated(self, tmp_path, monkeypatch):
+        monkeypatch.setattr("services.file_storage.UPLOAD_ROOT", tmp_path)
+        store = ProblemStore(tmp_path / "problems.db")
+        monkeypatch.setattr("backend.main.problem_store", store)
+        yield
+        store.close()
+
+    def _upload(self):
+        buffer = io.BytesIO()
+        Image.new("RGB", (10, 10), "white").save(buffer, format="PNG")
+        response = client.post(
+            "/upload", files={"file": ("p.png", buffer.getvalue(), "image/png")}
+        )
+        return response.json()["file_id"]
+
+    def test_create_and_list(self):
+        file_id = self._upload()
+        for answer in ("1", "2", "3"):
+            response = client.post(
+                "/problems",
+                json={"problem_image_file_id": file_id, "answer_value": answer},
+            )
+            assert response.status_code == 200
+
+        first = client.get("/problems", params={"limit": 2}).json()
+        second = client.get(
+            "/problems", params={"limit": 2, "cursor": first["next_cursor"]}
+        ).json()
+
+        assert [p["answer_value"] for p in first["problems"]] == ["1", "2"]
+        assert [p["answer_value"] for p in second["problems"]] == ["3"]
+        assert second["next_cursor"] is None
+        pending = client.get("/problems", params={"status": "pending"}).json()
+        assert pending["count"] == 3
+
+    def test_missing_image(self):
+        response = client.post(
+            "/problems",
+            json={"problem_image_file_id": "missing", "answer_value": "1"},
+        )
+
+        assert response.status_code == 404
+
+    def test_invalid_cursor(self):
+        response = client.get("/problems", params={"cursor": "bad"})
+
+        assert response.status_code == 400
+
+
+
+class TestProblemStoreLifecycle:
+    """문제 저장소 생성 시점 테스트."""
+
+    def test_opened_lazily_from_environment(self, tmp_path, monkeypatch):
+        """import 시점이 아니라 처음 사용할 때 PROBLEM_DB 위치로 생성"""
+        import backend.main as main
+
+        db_path = tmp_path / "lazy.db"
+        monkeypatch.setattr(main, "problem_store", None)
+        monkeypatch.setenv("PROBLEM_DB", str(db_path))
+
+        store = main.get_problem_store()
+        try:
+            assert store.db_path == db_path
+            assert main.get_problem_store() is store
+            assert client.get("/problems").status_code == 200
+            assert db_path.exists()
+        finally:
+            store.close()
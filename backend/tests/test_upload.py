@@ -1,3 +1,6 @@
+import os
+
+import pytest
 from fastapi.testclient import TestClient
 from pathlib import Path
 from backend.main import app
@@ -43,3 +46,107 @@ def test_upload_image_success(tmp_path, monkeypatch):
     # 실제 파일이 저장되었는지 확인
     saved_path = Path(data["stored_path"])
     assert saved_path.exists()
+
+
+def test_upload_duplicate_is_deduplicated(tmp_path, monkeypatch):
+    monkeypatch.setattr(
+        "services.file_storage.UPLOAD_ROOT",
+        tmp_path,
+    )
+    png_bytes = (
+        b"\x89PNG\r\n\x1a\n\x00\x00\x00\rIHDR\x00\x00\x00\x01"
+        b"\x00\x00\x00\x01\x08\x02\x00\x00\x00\x90wS\xde\x00\x00"
+        b"\x00\nIDATx\x9cc\x00\x01\x00\x00\x05\x00\x01\r\n-\xdb"
+        b"\x00\x00\x00\x00IEND\xaeB`\x82"
+    )
+
+    first = client.post(
+        "/upload",
+        files={"file": ("a.png", png_bytes, "image/png")},
+    ).json()
+    second = client.post(
+        "/upload",
+        files={"file": ("b.png", png_bytes, "image/png")},
+    ).json()
+
+    # file_id는 각각 발급되지만 같은 blob을 가리킴
+    assert first["file_id"] != second["file_id"]
+    assert first["stored_path"] == second["stored_path"]
+    assert len(list((tmp_path / "blobs").rglob("*.png"))) == 1
+
+    for file_id in (first["file_id"], second["file_id"]):
+        response = client.get(f"/files/{file_id}")
+        assert response.status_code == 200
+        assert response.content == png_bytes
+
+    # 임시 파일이 남지 않음
+    assert list((tmp_path / ".tmp").iterdir()) == []
+
+
+def _blob_files(root):
+    return [p for p in (root / "blobs").rglob("*") if p.is_file()]
+
+
+def test_upload_streams_to_storage(tmp_path, monkeypatch):
+    """큰 업로드도 Starlette 임시 파일 없이 저장소로 바로 받고 해시를 기록."""
+    import hashlib
+
+    monkeypatch.setattr("services.file_storage.UPLOAD_ROOT", tmp_path)
+
+    def no_spool(*args, **kwargs):
+        raise AssertionError("upload body should not be spooled")
+
+    monkeypatch.setattr("starlette.formparsers.SpooledTemporaryFile", no_spool)
+    body = b"\xff\xd8\xff\xe0" + os.urandom(3 * 1024 * 1024)
+
+    response = client.post("/upload", files={"file": ("photo.jpg", body, "image/jpeg")})
+
+    assert response.status_code == 200
+    data = response.json()
+    assert data["original_filename"] == "photo.jpg"
+    stored = Path(data["stored_path"])
+    assert stored.read_bytes() == body
+    assert stored.stem == hashlib.sha256(body).hexdigest()
+    assert list((tmp_path / ".tmp").iterdir()) == []
+
+
+@pytest.mark.parametrize(
+    "content, content_type",
+    [
+        (b"\xff\xd8\xff\xe0" + b"0" * 100, "image/png"),  # JPEG 내용, PNG type
+        (b"GIF89a" + b"0" * 100, "image/gif"),
+        (b"\x89PN", "image/png"),  # 시작 바이트보다 짧음
+    ],
+)
+def test_upload_rejects_invalid_content(tmp_path, monkeypatch, content, content_type):
+    """type이 허용되지 않거나 내용이 type과 맞지 않으면 400, 파일을 남기지 않음."""
+    monkeypatch.setattr("services.file_storage.UPLOAD_ROOT", tmp_path)
+
+    response = client.post("/upload", files={"file": ("x.png", content, content_type)})
+
+    assert response.status_code == 400
+    assert not (tmp_path / "blobs").exists() or _blob_files(tmp_path) == []
+    assert not (tmp_path / ".tmp").exists() or list((tmp_path / ".tmp").iterdir()) == []
+
+
+def test_upload_too_large(tmp_path, monkeypatch):
+    """최대 크기를 넘으면 413."""
+    monkeypatch.setattr("services.file_storage.UPLOAD_ROOT", tmp_path)
+    monkeypatch.setattr("services.file_storage.MAX_UPLOAD_SIZE", 1000)
+    body = b"\x89PNG\r\n\x1a\n" + b"0" * 2000
+
+    response = client.post("/upload", files={"file": ("big.png", body, "image/png")})
+
+    assert response.status_code == 413
+    assert list((tmp_path / ".tmp").iterdir()) == []
+
+
+def test_upload_missing_file_field(tmp_path, monkeypatch):
+    """file 필드가 없으면 400."""
+    monkeypatch.setattr("services.file_storage.UPLOAD_ROOT", tmp_path)
+
+    response = client.post(
+        "/upload", files={"image": ("a.png", b"\x89PNG\r\n\x1a\n", "image/png")}
+    )
+
+    assert response.status_code == 400